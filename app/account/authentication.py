@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import LazyTokenUser
+
+
+def state_key(user_id):
+    return f"user-active:{user_id}"
+
+
+def is_active(user_id):
+    """
+    Returns whether a user exists and is active, as of at most
+    JWT_USER_STATE_TIMEOUT seconds ago
+    """
+    key = state_key(user_id)
+    active = cache.get(key)
+
+    if active is None:
+        active = get_user_model().objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(key, active, settings.JWT_USER_STATE_TIMEOUT)
+
+    return active
+
+
+def forget_state(user_id):
+    """
+    Drops the cached state of a user that was deactivated or deleted, now
+    and again once the transaction commits, so it is read afresh
+    """
+    key = state_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Authenticates access tokens without loading their user.
+
+    The user is built from the user_id and is_active claims and only loaded
+    if a view reads its other fields. Whether the account is still active is
+    cached for a few seconds, so disabled accounts are refused within
+    JWT_USER_STATE_TIMEOUT seconds, or straight away when deactivated
+    through the ORM.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if not validated_token.get("is_active", True) or not is_active(user_id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return LazyTokenUser.from_claims(user_id)
@@ -0,0 +1,81 @@
+import math
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Blacklist:
+    """
+    Revoked token ids, kept until the tokens would have expired anyway.
+
+    Subclasses store the ids. Revoking is the only check: it adds the id
+    unless it is there already, atomically in the store, so a token is only
+    ever revoked once however many processes try, and a refresh costs one
+    round trip to the store whether its token was revoked or not.
+    """
+
+    def revoke(self, jti, exp):
+        """
+        Revokes the token with the given id and expiry timestamp, returning
+        False if it already was
+        """
+        ttl = math.ceil(exp - time.time())
+        if ttl <= 0:
+            # Expired tokens are refused without the blacklist.
+            return True
+
+        return self.add(jti, ttl)
+
+    def add(self, jti, ttl):
+        """
+        Stores a token id for ttl seconds, returning False if it was stored
+        """
+        raise NotImplementedError
+
+
+class RedisBlacklist(Blacklist):
+    """
+    Keeps revoked token ids in Redis, the server of the default cache
+    """
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection("default")
+
+    @staticmethod
+    def key(jti):
+        return f"token-blacklist:{jti}"
+
+    def add(self, jti, ttl):
+        return bool(self.redis.set(self.key(jti), 1, ex=ttl, nx=True))
+
+
+class LocalBlacklist(Blacklist):
+    """
+    Keeps revoked token ids in process memory, for tests and development
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.expiries = {}
+
+    def add(self, jti, ttl):
+        with self.lock:
+            if self.expiries.get(jti, 0) > time.monotonic():
+                return False
+            self.expiries[jti] = time.monotonic() + ttl
+            return True
+
+
+@lru_cache(maxsize=None)
+def load_blacklist(path):
+    # One instance per process, so a local blacklist outlives requests.
+    return import_string(path)()
+
+
+def get_blacklist():
+    return load_blacklist(settings.JWT_BLACKLIST_BACKEND)
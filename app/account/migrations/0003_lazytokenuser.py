@@ -0,0 +1,24 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_auto_20200417_0053'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LazyTokenUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('account.customuser',),
+        ),
+    ]
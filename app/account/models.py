@@ -53,3 +53,25 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         "Does the user have permissions to view the app `app_label`?"
         # Simplest possible answer: Yes, always
         return True
+
+
+class LazyTokenUser(CustomUser):
+    """
+    A user authenticated from the claims of an access token.
+
+    Only the id and is_active are set, so authenticating runs no query. The
+    first access to any other field loads all of them in one query.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, is_active=True):
+        return cls.from_db(None, ["id", "is_active"], [user_id, is_active])
+
+    def refresh_from_db(self, using=None, fields=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred:
+            fields = deferred.union(fields)
+        super().refresh_from_db(using, fields)
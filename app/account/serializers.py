@@ -1,6 +1,16 @@
+from functools import lru_cache
+
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import get_blacklist
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -36,14 +46,48 @@ class UserSerializer(serializers.ModelSerializer):
         return self.Meta.model.objects.create_user(**data)
 
 
+@lru_cache(maxsize=None)
+def token_claim_fields():
+    """
+    Returns the user fields copied into tokens: those UserSerializer
+    returns, except the id, which tokens carry as user_id already
+    """
+    return tuple(
+        name
+        for name, field in UserSerializer().fields.items()
+        if not field.write_only and name != "id"
+    )
+
+
 class LogInSerializer(TokenObtainPairSerializer):
     """ Serialize user data and add to token """
 
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        user_data = UserSerializer(user).data
-        for key, value in user_data.items():
-            if key != "id":
-                token[key] = value
+        # Read straight off the user; serializing it on each login is slow.
+        for field in token_claim_fields():
+            token[field] = getattr(user, field)
+        # Lets token authentication refuse disabled users without a lookup.
+        token["is_active"] = user.is_active
         return token
+
+
+class RefreshSerializer(TokenRefreshSerializer):
+    """ Rotate a refresh token, revoking the one given """
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs["refresh"])
+        jti = refresh[api_settings.JTI_CLAIM]
+        blacklist = get_blacklist()
+
+        # Revoking is the atomic check: of concurrent refreshes with the
+        # same token, only one gets new tokens.
+        if not blacklist.revoke(jti, refresh["exp"]):
+            raise TokenError("Token is blacklisted")
+
+        data = {"access": str(refresh.access_token)}
+        refresh.set_jti()
+        refresh.set_exp()
+        data["refresh"] = str(refresh)
+        return data
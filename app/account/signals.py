@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_state
+from .models import CustomUser, LazyTokenUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=LazyTokenUser)
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=LazyTokenUser)
+def refresh_state(sender, instance, **kwargs):
+    """
+    Makes token authentication see deactivated and deleted users at once
+    """
+    forget_state(instance.pk)
@@ -1,8 +1,8 @@
 from django.contrib.auth import get_user_model
 from rest_framework import generics
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .serializers import LogInSerializer, UserSerializer
+from .serializers import LogInSerializer, RefreshSerializer, UserSerializer
 
 
 class SignUpView(generics.CreateAPIView):
@@ -10,6 +10,7 @@ class SignUpView(generics.CreateAPIView):
 
     authentication_classes = ()
     permission_classes = ()
+    throttle_scope = "sign_up"
 
     queryset = get_user_model().objects.all()
     serializer_class = UserSerializer
@@ -20,5 +21,12 @@ class LogInView(TokenObtainPairView):
 
     authentication_classes = ()
     permission_classes = ()
+    throttle_scope = "login"
 
     serializer_class = LogInSerializer
+
+
+class RefreshView(TokenRefreshView):
+    """Rotate a refresh token, which can then not be used again"""
+
+    serializer_class = RefreshSerializer
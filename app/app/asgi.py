@@ -2,6 +2,7 @@
 ASGI config for app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests are served on a bounded pool of threads, see app.handlers.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
@@ -9,8 +10,11 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+from app.handlers import ThreadPoolASGIHandler  # noqa: E402
+
+application = ThreadPoolASGIHandler()
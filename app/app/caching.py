@@ -0,0 +1,105 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .conditional import ConditionalMixin
+
+
+def version_key(user_id):
+    return f"user-version:{user_id}"
+
+
+def get_version(user_id):
+    """
+    Returns the version of a user's data, starting a counter if none is cached
+    """
+    key = version_key(user_id)
+    version = cache.get(key)
+
+    if version is None:
+        # Start from the clock, so a counter that was evicted never comes
+        # back at a version whose responses may still be cached.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_versions(user_ids):
+    """
+    Invalidates the cached responses of users whose data changed.
+
+    Versions are bumped straight away and again once the transaction
+    commits, so a response cached by a read in between is not served after
+    the change is visible.
+    """
+    user_ids = set(user_ids)
+
+    def bump():
+        for user_id in user_ids:
+            try:
+                cache.incr(version_key(user_id))
+            except ValueError:
+                get_version(user_id)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def response_key(request, version):
+    """
+    Returns a digest identifying a user's response to a GET request
+    """
+    url = request.build_absolute_uri()
+    renderer = request.accepted_renderer.format
+
+    return hashlib.md5(
+        f"{request.user.pk}:{version}:{renderer}:{url}".encode()
+    ).hexdigest()
+
+
+class CachedResponseMixin(ConditionalMixin):
+    """
+    Caches successful GET responses per user and data version.
+
+    Saving or deleting any of a user's expenses or subscriptions bumps the
+    version, so stale responses are never served. The validators are cached
+    with the data, so a request whose If-None-Match still matches is
+    answered 304 without querying or serializing anything.
+    """
+
+    def get_validators(self):
+        version = get_version(self.request.user.pk)
+        self.cache_key = f"response:{response_key(self.request, version)}"
+        self.cached = cache.get(self.cache_key)
+
+        if self.cached is not None:
+            return self.cached[:2]
+
+        self.validators = super().get_validators()
+        return self.validators
+
+    def get_response(self, request, *args, **kwargs):
+        if self.cached is not None:
+            return Response(self.cached[2])
+
+        response = super().get_response(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                self.cache_key,
+                (*self.validators, response.data),
+                settings.RESPONSE_CACHE_TIMEOUT,
+            )
+
+        return response
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        # Clients may keep responses but must revalidate them with the ETag.
+        response["Cache-Control"] = "private, no-cache"
+        return response
@@ -0,0 +1,147 @@
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The resource was modified since it was fetched."
+    default_code = "precondition_failed"
+
+
+def version_etag(updated):
+    """
+    Returns the ETag of an object last updated at the given time
+    """
+    return quote_etag(str(int(updated.timestamp() * 1000000)))
+
+
+def list_etag(request, count, updated):
+    """
+    Returns the ETag of a page of a user's objects, given how many objects
+    match the request and when the latest of them was updated
+    """
+    version = int(updated.timestamp() * 1000000) if updated else 0
+    url = request.build_absolute_uri()
+    renderer = request.accepted_renderer.format
+
+    return quote_etag(
+        hashlib.md5(
+            f"{request.user.pk}:{count}:{version}:{renderer}:{url}".encode()
+        ).hexdigest()
+    )
+
+
+def set_validators(response, etag, last_modified):
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+class ConditionalMixin:
+    """
+    Adds validators from the `updated` timestamp to list and detail views.
+
+    GETs get an ETag, and details a Last-Modified too; If-None-Match and
+    If-Modified-Since are answered 304 after one small query, before
+    anything is serialized. Lists have no Last-Modified: deleting a row
+    leaves their latest `updated` as it was, while their ETag, which counts
+    the rows, changes.
+    PUT, PATCH and DELETE honour If-Match: the write only goes through if
+    the object is still at the version the client fetched, checked with a
+    compare-and-set UPDATE instead of a row lock held while validating.
+    """
+
+    def get_validators(self):
+        """
+        Returns the (etag, last_modified) of the user's response to a GET.
+
+        The view's queryset must only hold the user's own objects, so other
+        users' objects fall through to the view's 404.
+        """
+        queryset = self.get_queryset()
+
+        if self.lookup_url_kwarg in self.kwargs:
+            updated = (
+                queryset.filter(
+                    **{self.lookup_field: self.kwargs[self.lookup_url_kwarg]}
+                )
+                .values_list("updated", flat=True)
+                .first()
+            )
+            if updated is None:
+                return None, None
+            return version_etag(updated), updated
+
+        stats = (
+            self.filter_queryset(queryset)
+            .order_by()
+            .aggregate(count=Count("id"), updated=Max("updated"))
+        )
+        return list_etag(self.request, **stats), None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and int(last_modified.timestamp()),
+        )
+        if response is None:
+            response = self.get_response(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        return set_validators(response, etag, last_modified)
+
+    def get_response(self, request, *args, **kwargs):
+        """
+        Returns the full response to a GET that is not answered 304
+        """
+        return super().get(request, *args, **kwargs)
+
+    def claim(self, instance):
+        """
+        Checks an If-Match precondition against an object about to be
+        written, raising PreconditionFailed if it was changed since
+        """
+        etags = parse_etags(self.request.META.get("HTTP_IF_MATCH", ""))
+        if not etags or etags == ["*"]:
+            return
+
+        if version_etag(instance.updated) not in etags:
+            raise PreconditionFailed()
+
+        # Another write may have landed since the object was read; only one
+        # of them moves `updated` on from the version the client saw.
+        claimed = (
+            type(instance)
+            .objects.filter(pk=instance.pk, updated=instance.updated)
+            .update(updated=timezone.now())
+        )
+        if not claimed:
+            raise PreconditionFailed()
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        return set_validators(response, self.etag, None)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        self.claim(serializer.instance)
+        super().perform_update(serializer)
+        self.etag = version_etag(serializer.instance.updated)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        self.claim(instance)
+        super().perform_destroy(instance)
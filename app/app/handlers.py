@@ -0,0 +1,92 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core import signals
+from django.core.exceptions import RequestAborted
+from django.core.handlers.asgi import ASGIHandler
+from django.http import FileResponse
+from django.urls import set_script_prefix
+
+
+class ThreadPoolASGIHandler(ASGIHandler):
+    """
+    Serves each request on one thread of a pool of ASGI_THREADS threads.
+
+    Django 3.0 runs views on threads but streams responses, the exports
+    among them, from the event loop, where the ORM refuses to run, and may
+    start and finish a request on other threads than the view's, leaving
+    their database connections open. Here a request runs from start to
+    close on one thread, as under WSGI, while the event loop holds idle and
+    slow connections; the pool, and with it the number of database
+    connections, stays bounded however many clients are connected.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.executor = ThreadPoolExecutor(
+            settings.ASGI_THREADS, thread_name_prefix="asgi"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            raise ValueError(
+                f"Django can only handle ASGI/HTTP connections, not {scope['type']}."
+            )
+        try:
+            body_file = await self.read_body(receive)
+        except RequestAborted:
+            return
+
+        loop = asyncio.get_running_loop()
+
+        def send_blocking(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        await loop.run_in_executor(
+            self.executor, self.respond, scope, body_file, send_blocking
+        )
+
+    def respond(self, scope, body_file, send):
+        """
+        Serves a request whose body was read, sending the response with a
+        blocking send
+        """
+        set_script_prefix(self.get_script_prefix(scope))
+        signals.request_started.send(sender=self.__class__, scope=scope)
+
+        request, response = self.create_request(scope, body_file)
+        if request is not None:
+            response = self.get_response(request)
+        response._handler_class = self.__class__
+        if isinstance(response, FileResponse):
+            response.block_size = self.chunk_size
+
+        try:
+            self.write_response(response, send)
+        finally:
+            # Sends request_finished, closing this thread's connections.
+            response.close()
+
+    def write_response(self, response, send):
+        headers = [
+            (header.encode("ascii"), value.encode("latin1"))
+            for header, value in response.items()
+        ]
+        for cookie in response.cookies.values():
+            headers.append(
+                (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+            )
+        send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+
+        parts = response if response.streaming else (response.content,)
+        for part in parts:
+            for chunk, _ in self.chunk_bytes(part):
+                send({"type": "http.response.body", "body": chunk, "more_body": True})
+        send({"type": "http.response.body"})
@@ -0,0 +1,126 @@
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+from rest_framework.utils.urls import replace_query_param
+
+
+def keyset_after(ordering, position):
+    """
+    Returns a filter for the rows following a position in an ordering, the
+    row comparison ``(a, b) > (x, y)`` with each field's own direction
+    """
+    field, *rest = ordering
+    name = field.lstrip("-")
+    op = "lt" if field.startswith("-") else "gt"
+    value, *rest_position = position
+
+    if not rest:
+        return Q(**{f"{name}__{op}": value})
+
+    # The inclusive bound on the first field lets the index seek to it.
+    return Q(**{f"{name}__{op}e": value}) & (
+        Q(**{f"{name}__{op}": value}) | keyset_after(rest, rest_position)
+    )
+
+
+class OwnerCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a user's own objects.
+
+    The cursor holds every ordering value of the row it continues from, and
+    the ordering ends with the unique id, so pages are fetched with
+    ``WHERE (<ordering>) > (<cursor>)`` instead of an OFFSET. Every page
+    costs the same as the first one as long as the ordering is backed by an
+    index prefixed with ``created_by``.
+    """
+
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor and self.cursor.position
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(keyset_after(ordering, position))
+            except (ValidationError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.display_page_controls = self.has_next or self.has_previous
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = (
+            self.position_of(self.page[-1]) if self.page else self.cursor.position
+        )
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.position_of(self.page[0]) if self.page else self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def position_of(self, instance):
+        return [str(getattr(instance, field.lstrip("-"))) for field in self.ordering]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+            position = tokens.get("p")
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if position is not None and len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {"p": cursor.position}
+        if cursor.reverse:
+            tokens["r"] = "1"
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+
+class ExpenseCursorPagination(OwnerCursorPagination):
+    ordering = ("incurred_on", "id")
+
+
+class SubscriptionCursorPagination(OwnerCursorPagination):
+    ordering = ("start_date", "id")
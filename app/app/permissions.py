@@ -1,10 +1,13 @@
 from rest_framework import permissions
 
 
-class IsCreator(permissions.BasePermission):
+class IsCreator(permissions.IsAuthenticated):
     """
     Object-level permission to only allow creators of an object to edit it.
+
+    Views should also filter their queryset by owner, so other users' objects
+    are never loaded; comparing ids keeps this check from loading the user.
     """
 
     def has_object_permission(self, request, view, obj):
-        return obj.created_by == request.user
+        return obj.created_by_id == request.user.pk
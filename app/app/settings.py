@@ -46,6 +46,7 @@ INSTALLED_APPS = [
     "expense",
     "storages",
     "subscription",
+    "sync",
     "drf_yasg",
 ]
 
@@ -95,6 +96,23 @@ DATABASES = {
 }
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.0/topics/auth/passwords/
+# New passwords use the first hasher; the others verify older hashes, which
+# are rehashed with the first one when their user logs in. The Argon2 costs
+# (passes, KiB of memory, lanes) default to about 40ms per hash on one core,
+# against about 100ms for PBKDF2's 180000 iterations
+# (tests/benchmarks/test_bench_login.py).
+
+PASSWORD_HASHERS = [
+    "account.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get("PASSWORD_ARGON2_MEMORY_COST", 19456))
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get("PASSWORD_ARGON2_PARALLELISM", 1))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -132,17 +150,27 @@ AUTH_USER_MODEL = "account.CustomUser"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "account.authentication.StatelessJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_THROTTLE_CLASSES": ("app.throttling.ScopedBucketThrottle",),
+    # Per IP address for log in and sign up, per user for the rest.
+    "DEFAULT_THROTTLE_RATES": {
+        "login": os.environ.get("THROTTLE_RATE_LOGIN", "10/min"),
+        "sign_up": os.environ.get("THROTTLE_RATE_SIGN_UP", "20/hour"),
+        "list": os.environ.get("THROTTLE_RATE_LIST", "600/min"),
+        "write": os.environ.get("THROTTLE_RATE_WRITE", "120/min"),
+        "export": os.environ.get("THROTTLE_RATE_EXPORT", "10/min"),
+    },
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": datetime.timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": datetime.timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
-    "BLACKLIST_AFTER_ROTATION": False,
+    # Done by account.blacklist rather than simplejwt's database tables.
+    "BLACKLIST_AFTER_ROTATION": True,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": os.environ.get("J_SECRET_KEY"),
     "VERIFYING_KEY": None,
@@ -152,6 +180,14 @@ SIMPLE_JWT = {
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
 }
+# Seconds token authentication trusts a cached "user is active" lookup
+# (account.authentication); deactivating through the ORM applies at once.
+JWT_USER_STATE_TIMEOUT = int(os.environ.get("JWT_USER_STATE_TIMEOUT", 10))
+# Rotated refresh tokens (account.blacklist): the store of revoked token ids
+# (RedisBlacklist, or LocalBlacklist to run without Redis).
+JWT_BLACKLIST_BACKEND = os.environ.get(
+    "JWT_BLACKLIST_BACKEND", "account.blacklist.RedisBlacklist"
+)
 
 # aws settings
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID")
@@ -166,14 +202,56 @@ MEDIA_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/{PUBLIC_MEDIA_LOCATION}/"
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 AWS_S3_FILE_OVERWRITE = False
 
+# Receipt uploads: backend issuing upload URLs (expense.uploads), upload URL
+# lifetime in seconds and largest receipt accepted in bytes.
+EXPENSE_RECEIPT_UPLOAD_BACKEND = os.environ.get(
+    "EXPENSE_RECEIPT_UPLOAD_BACKEND", "expense.uploads.S3UploadBackend"
+)
+EXPENSE_RECEIPT_UPLOAD_EXPIRES = 15 * 60
+EXPENSE_RECEIPT_MAX_SIZE = 10 * 1024 * 1024
+
+# Delta sync (sync app): seconds a new watermark trails the clock, covering
+# transactions still open when it is taken, days deletions are kept, as
+# clients last synced before that get everything again, and objects of each
+# kind per response.
+SYNC_WATERMARK_LAG = int(os.environ.get("SYNC_WATERMARK_LAG", 60))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+SYNC_PAGE_SIZE = int(os.environ.get("SYNC_PAGE_SIZE", 500))
+
+# Cache: a database of the Redis server Celery uses. Set CACHE_BACKEND to
+# django.core.cache.backends.locmem.LocMemCache to run without Redis.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django_redis.cache.RedisCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "redis://redis:6379/1"),
+    }
+}
+# Threads each ASGI worker serves requests on (app.handlers); each may hold
+# a database connection.
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 8))
+
+# Store of the throttles' token buckets (app.throttling): RedisThrottleStore,
+# or LocalThrottleStore to run without Redis.
+THROTTLE_STORE = os.environ.get("THROTTLE_STORE", "app.throttling.RedisThrottleStore")
+# Seconds a user's list and detail responses stay cached (app.caching).
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", 60 * 60))
+
 CELERY_BROKER_URL = "redis://redis:6379"
 CELERY_RESULT_BACKEND = "redis://redis:6379"
 
 
 CELERY_BEAT_SCHEDULE = {
     "send_email_reminder": {
-        "task": "core.tasks.send_email_reminder",
-        "schedule": crontab(hour="*/24"),
+        "task": "app.tasks.send_email_reminder",
+        "schedule": crontab(minute=0, hour=0),
+    },
+    "drain_email_outbox": {
+        "task": "app.tasks.drain_email_outbox",
+        "schedule": crontab(),
+    },
+    "prune_tombstones": {
+        "task": "app.tasks.prune_tombstones",
+        "schedule": crontab(hour=3, minute=0),
     },
 }
 
@@ -181,4 +259,13 @@ CELERY_BEAT_SCHEDULE = {
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "noreply@email.com"
 
+# Outbox sender: e-mails claimed per batch, parallel mail connections,
+# e-mails per second (0 for no limit), attempts before giving up and the
+# first retry delay in seconds, doubled on each further attempt.
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", 200))
+EMAIL_OUTBOX_CONCURRENCY = int(os.environ.get("EMAIL_OUTBOX_CONCURRENCY", 4))
+EMAIL_OUTBOX_RATE_LIMIT = float(os.environ.get("EMAIL_OUTBOX_RATE_LIMIT", 10))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.environ.get("EMAIL_OUTBOX_RETRY_DELAY", 60))
+
 LOGIN_URL = "log_in"
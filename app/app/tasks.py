@@ -1,8 +1,91 @@
-from celery import shared_task
-from django.core.management import call_command
+from datetime import date, timedelta
+
+from celery import chord, shared_task
+from django.db import DatabaseError
+from django.utils import timezone
+
+USERS_PER_CHUNK = 1000
 
 
 @shared_task
-def send_email_reminder():
-    call_command("email_reminder",)
+def send_email_reminder(users_per_chunk=USERS_PER_CHUNK):
+    """
+    Partitions users with upcoming renewals into id ranges and queues their
+    reminders from one task per range, finishing the run once all are done
+    """
+    # Imported here: settings import this module before apps are loaded.
+    from subscription import reminders
+
+    today = timezone.localdate()
+    last_run = reminders.last_processed(today, catch_up=True)
+    chunks = [
+        send_reminder_chunk.s(
+            first_user, last_user, today.isoformat(), last_run.isoformat()
+        )
+        for first_user, last_user in reminders.due_user_ranges(today, users_per_chunk)
+    ]
+
+    if chunks:
+        chord(chunks)(finish_reminder_run.s(today.isoformat()))
+    else:
+        finish_reminder_run([], today.isoformat())
+
     return True
+
+
+@shared_task(autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=5)
+def send_reminder_chunk(first_user, last_user, today, last_run):
+    """
+    Queues the reminders of users with ids in [first_user, last_user].
+
+    Queued reminders are recorded per (user, renewal date), so a retry
+    only queues what the failed attempt did not.
+    """
+    from subscription import reminders
+    from subscription.models import Subscription
+
+    return reminders.process_reminders(
+        Subscription.objects.filter(
+            created_by__gte=first_user, created_by__lte=last_user
+        ),
+        date.fromisoformat(today),
+        date.fromisoformat(last_run),
+        catch_up=True,
+        chunk_size=2000,
+        batch_size=500,
+    )
+
+
+@shared_task
+def finish_reminder_run(queued, today):
+    """
+    Moves the watermark once every chunk has succeeded, starts sending the
+    queued e-mails and returns how many were queued
+    """
+    from subscription import reminders
+
+    reminders.mark_processed(date.fromisoformat(today))
+    drain_email_outbox.delay()
+    return sum(queued)
+
+
+@shared_task
+def drain_email_outbox():
+    """
+    Sends due outbox e-mails and forgets those sent over a week ago
+    """
+    from subscription import outbox
+
+    stats = outbox.drain()
+    outbox.prune(timezone.now() - timedelta(weeks=1))
+    return stats
+
+
+@shared_task
+def prune_tombstones():
+    """
+    Forgets deletions older than sync clients are expected to catch up on
+    """
+    from sync import changes
+
+    return changes.prune(changes.retained_since())[0]
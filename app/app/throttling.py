@@ -0,0 +1,157 @@
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Token bucket: refills `rate` tokens a second up to `capacity`, and each
+# request takes one. Returns 0 if the request is allowed, otherwise the
+# seconds until a token is back, as a string as Lua numbers are truncated.
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call("HMGET", KEYS[1], "tokens", "at")
+local tokens = tonumber(state[1]) or capacity
+local at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HMSET", KEYS[1], "tokens", tokens, "at", now)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate))
+return tostring(wait)
+"""
+
+# Spacing: reserves the first free slot at or after now and moves the next
+# one `interval` seconds past it. Returns the seconds until the slot.
+RESERVE_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local now = tonumber(ARGV[2])
+local start = math.max(tonumber(redis.call("GET", KEYS[1])) or now, now)
+redis.call("SET", KEYS[1], tostring(start + interval), "EX", math.ceil(start + interval - now) + 1)
+return tostring(start - now)
+"""
+
+
+class RedisThrottleStore:
+    """
+    Keeps token buckets and spacings in Redis, the server of the default
+    cache, with one script call per request
+    """
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        redis = get_redis_connection("default")
+        self.script = redis.register_script(TAKE_SCRIPT)
+        self.reserve_script = redis.register_script(RESERVE_SCRIPT)
+
+    def take(self, key, capacity, rate, now):
+        """
+        Takes a token from a bucket, returning 0 or the seconds to wait
+        """
+        return float(self.script(keys=[key], args=[capacity, rate, now]))
+
+    def reserve(self, key, interval, now):
+        """
+        Reserves the next slot of a spacing, returning the seconds to wait
+        """
+        return float(self.reserve_script(keys=[key], args=[interval, now]))
+
+
+class LocalThrottleStore:
+    """
+    Keeps token buckets and spacings in process memory, for tests and
+    development
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.slots = {}
+
+    def take(self, key, capacity, rate, now):
+        with self.lock:
+            tokens, at = self.buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0, now - at) * rate)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self.buckets[key] = (tokens, now)
+            return wait
+
+    def reserve(self, key, interval, now):
+        with self.lock:
+            start = max(self.slots.get(key, now), now)
+            self.slots[key] = start + interval
+            return start - now
+
+
+@lru_cache(maxsize=None)
+def load_store(path):
+    return import_string(path)()
+
+
+def get_store():
+    return load_store(settings.THROTTLE_STORE)
+
+
+def parse_rate(rate):
+    """
+    Returns the number of requests and the seconds of a rate like "10/min"
+    """
+    num, period = rate.split("/")
+    return int(num), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+
+class ScopedBucketThrottle(BaseThrottle):
+    """
+    Limits requests per scope, with token buckets in a store shared by all
+    processes.
+
+    The scope is the view's `throttle_scope`, or "list" for reads and
+    "write" for other methods. Rates come from DEFAULT_THROTTLE_RATES;
+    scopes without one are not limited. Users are limited by their id,
+    anonymous requests by their IP address. A limited request gets a 429
+    with a Retry-After header.
+    """
+
+    timer = time.time
+
+    def get_scope(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if scope:
+            return scope
+        return "list" if request.method in ("GET", "HEAD", "OPTIONS") else "write"
+
+    def get_ident(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{super().get_ident(request)}"
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+
+        capacity, duration = parse_rate(rate)
+        self.retry_after = get_store().take(
+            f"throttle:{scope}:{self.get_ident(request)}",
+            capacity,
+            capacity / duration,
+            self.timer(),
+        )
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
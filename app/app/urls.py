@@ -1,13 +1,29 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
-from rest_framework_simplejwt.views import TokenRefreshView
 
-from account.views import LogInView, SignUpView
-from expense.views import ExpenseDetail, ExpenseList
-from subscription.views import SubscriptionDetail, SubscriptionList
+from account.views import LogInView, RefreshView, SignUpView
+from expense.views import (
+    ExpenseBulk,
+    ExpenseDetail,
+    ExpenseExport,
+    ExpenseImport,
+    ExpenseList,
+    ExpenseReceipt,
+    ExpenseReceiptUpload,
+    ExpenseSummary,
+    LocalReceiptUpload,
+)
+from subscription.views import (
+    OutboxMetrics,
+    SubscriptionDetail,
+    SubscriptionExport,
+    SubscriptionForecast,
+    SubscriptionList,
+)
+from sync.views import Sync
 
 schema_view = get_schema_view(
     openapi.Info(title="Subscription/Expense Tracking API", default_version="v1",),
@@ -23,14 +39,53 @@ urlpatterns = [
         SubscriptionDetail.as_view(),
         name="subscription_detail",
     ),
+    path(
+        "api/subscription/forecast/",
+        SubscriptionForecast.as_view(),
+        name="subscription_forecast",
+    ),
+    path(
+        "api/subscription/outbox/metrics/",
+        OutboxMetrics.as_view(),
+        name="outbox_metrics",
+    ),
+    re_path(
+        r"^api/subscription/export\.(?P<file_format>csv|ndjson)$",
+        SubscriptionExport.as_view(),
+        name="subscription_export",
+    ),
     path("api/subscription/", SubscriptionList.as_view(), name="subscription"),
     path(
         "api/expense/<int:expense_id>", ExpenseDetail.as_view(), name="expense_detail"
     ),
+    path(
+        "api/expense/<int:expense_id>/receipt/upload/",
+        ExpenseReceiptUpload.as_view(),
+        name="expense_receipt_upload",
+    ),
+    path(
+        "api/expense/<int:expense_id>/receipt/",
+        ExpenseReceipt.as_view(),
+        name="expense_receipt",
+    ),
+    path(
+        "api/expense/receipt/<str:token>",
+        LocalReceiptUpload.as_view(),
+        name="expense_receipt_put",
+    ),
+    path("api/expense/summary/", ExpenseSummary.as_view(), name="expense_summary"),
+    path("api/expense/bulk/", ExpenseBulk.as_view(), name="expense_bulk"),
+    path("api/expense/import/", ExpenseImport.as_view(), name="expense_import"),
+    re_path(
+        r"^api/expense/export\.(?P<file_format>csv|ndjson)$",
+        ExpenseExport.as_view(),
+        name="expense_export",
+    ),
     path("api/expense/", ExpenseList.as_view(), name="expense"),
+    path("api/sync/", Sync.as_view(), name="sync"),
     path("api/sign_up/", SignUpView.as_view(), name="sign_up"),
     path("api/log_in/", LogInView.as_view(), name="log_in"),
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/token/refresh/", RefreshView.as_view(), name="token_refresh"),
     path(
         "swagger-docs/",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ExpenseConfig(AppConfig):
     name = "expense"
+
+    def ready(self):
+        from . import signals  # noqa: F401
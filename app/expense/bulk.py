@@ -0,0 +1,154 @@
+from django.db import router, transaction
+from django.db.models import prefetch_related_objects
+from django.db.models.deletion import Collector
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from app import caching
+
+from . import rollup
+from .models import Expense
+from .serializers import BulkExpenseSerializer
+from .signals import expenses_deleted, rollup_row
+
+MAX_ITEMS = 1000
+
+
+def validate_items(items):
+    """
+    Checks a batch is a list of 1 to MAX_ITEMS entries
+    """
+    if not isinstance(items, list) or not items:
+        raise ValidationError({"non_field_errors": ["Expected a non-empty list."]})
+    if len(items) > MAX_ITEMS:
+        raise ValidationError(
+            {"non_field_errors": [f"Ensure there are at most {MAX_ITEMS} items."]}
+        )
+
+
+def item_ids(items):
+    """
+    Returns the ids of a batch and the per-item errors of invalid ones
+    """
+    ids = []
+    errors = []
+
+    for item in items:
+        item_id = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(item_id, int) or isinstance(item_id, bool):
+            errors.append({"id": ["A valid integer is required."]})
+        elif item_id in ids:
+            errors.append({"id": ["Duplicate id."]})
+        else:
+            errors.append({})
+        ids.append(item_id)
+
+    return ids, errors
+
+
+@transaction.atomic
+def create(user, items):
+    """
+    Creates a batch of expenses with one INSERT per database batch
+    """
+    validate_items(items)
+    serializer = BulkExpenseSerializer(data=items, many=True)
+    serializer.is_valid(raise_exception=True)
+
+    expenses = Expense.objects.bulk_create(
+        Expense(created_by=user, **data) for data in serializer.validated_data
+    )
+    # bulk_create sends no signals; keep the rollup in step here.
+    rollup.add([rollup_row(expense) for expense in expenses])
+    caching.bump_versions([user.pk])
+    # Receipts are serialized too; load them in one query, not one each.
+    prefetch_related_objects(expenses, "receipt")
+
+    return expenses
+
+
+@transaction.atomic
+def update(user, items):
+    """
+    Partially updates a batch of the user's expenses keyed by id
+    """
+    validate_items(items)
+    ids, errors = item_ids(items)
+    expenses = (
+        Expense.objects.select_for_update()
+        .filter(created_by=user)
+        .in_bulk([item_id for item_id, error in zip(ids, errors) if not error])
+    )
+    serializers = []
+
+    for item_id, item, error in zip(ids, items, errors):
+        if error:
+            continue
+        if item_id not in expenses:
+            error["id"] = ["Not found."]
+            continue
+
+        serializer = BulkExpenseSerializer(expenses[item_id], data=item, partial=True)
+        if serializer.is_valid():
+            serializers.append(serializer)
+        else:
+            error.update(serializer.errors)
+
+    if any(errors):
+        raise ValidationError(errors)
+
+    previous = [rollup_row(expense) for expense in expenses.values()]
+    fields = {"updated"}
+    now = timezone.now()
+
+    for serializer in serializers:
+        for field, value in serializer.validated_data.items():
+            setattr(serializer.instance, field, value)
+            fields.add(field)
+        serializer.instance.updated = now
+
+    updated = [serializer.instance for serializer in serializers]
+    Expense.objects.bulk_update(updated, sorted(fields))
+    # bulk_update sends no signals; keep the rollup in step here.
+    rollup.remove(previous)
+    rollup.add([rollup_row(expense) for expense in updated])
+    caching.bump_versions([user.pk])
+    prefetch_related_objects(updated, "receipt")
+
+    return updated
+
+
+@transaction.atomic
+def delete(user, ids):
+    """
+    Deletes a batch of the user's expenses by id
+    """
+    validate_items(ids)
+    ids, errors = item_ids([{"id": item_id} for item_id in ids])
+    valid = [item_id for item_id, error in zip(ids, errors) if not error]
+    owned = set(
+        Expense.objects.filter(created_by=user, id__in=valid).values_list(
+            "id", flat=True
+        )
+    )
+
+    for item_id, error in zip(ids, errors):
+        if not error and item_id not in owned:
+            error["id"] = ["Not found."]
+
+    if any(errors):
+        raise ValidationError(errors)
+
+    expenses = list(Expense.objects.filter(id__in=owned))
+    deleted_ids = [expense.pk for expense in expenses]
+    for expense in expenses:
+        # Their rollup, files, responses and tombstones are updated once
+        # for the batch below, not by post_delete one at a time.
+        expense._deleted_in_batch = True
+
+    collector = Collector(using=router.db_for_write(Expense))
+    collector.collect(expenses)
+    collector.delete()
+    expenses_deleted.send(sender=Expense, ids=deleted_ids, expenses=expenses)
+
+    return ids
@@ -0,0 +1,126 @@
+from django.db.models import Q
+from rest_framework import filters, serializers
+
+# Query parameters consumed by pagination and content negotiation.
+PASSTHROUGH_PARAMS = {"cursor", "page_size", "format"}
+
+
+class ExpenseRangeSerializer(serializers.Serializer):
+    """ Validate expense category and date range query parameters """
+
+    category = serializers.ListField(
+        child=serializers.CharField(max_length=30), required=False
+    )
+    incurred_on_after = serializers.DateField(required=False)
+    incurred_on_before = serializers.DateField(required=False)
+
+    def validate(self, data):
+        unknown = set(self.initial_data) - set(self.fields) - PASSTHROUGH_PARAMS
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unsupported query parameters: {', '.join(sorted(unknown))}."
+            )
+
+        after = data.get("incurred_on_after")
+        before = data.get("incurred_on_before")
+        if after and before and after > before:
+            raise serializers.ValidationError(
+                "incurred_on_after must not be later than incurred_on_before."
+            )
+        return data
+
+
+class ExpenseQuerySerializer(ExpenseRangeSerializer):
+    """ Validate expense list query parameters """
+
+    # Every ordering is backed by a (created_by, <field>, id) index.
+    ORDERING = ("incurred_on", "-incurred_on", "amount", "-amount")
+
+    amount_min = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    amount_max = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False
+    )
+    q = serializers.CharField(min_length=3, max_length=100, required=False)
+    ordering = serializers.ChoiceField(choices=ORDERING, required=False)
+
+    def validate(self, data):
+        data = super().validate(data)
+
+        amount_min = data.get("amount_min")
+        amount_max = data.get("amount_max")
+        if amount_min is not None and amount_max is not None:
+            if amount_min > amount_max:
+                raise serializers.ValidationError(
+                    "amount_min must not be greater than amount_max."
+                )
+        return data
+
+
+def filter_range(queryset, params):
+    """
+    Applies validated category and date range parameters to expenses
+    """
+    if "category" in params:
+        queryset = queryset.filter(category__in=params["category"])
+    if "incurred_on_after" in params:
+        queryset = queryset.filter(incurred_on__gte=params["incurred_on_after"])
+    if "incurred_on_before" in params:
+        queryset = queryset.filter(incurred_on__lte=params["incurred_on_before"])
+    return queryset
+
+
+def filter_months(queryset, params):
+    """
+    Applies validated category and whole-month range parameters to
+    MonthlySpend rows
+    """
+    if "category" in params:
+        queryset = queryset.filter(category__in=params["category"])
+    if "incurred_on_after" in params:
+        queryset = queryset.filter(year_month__gte=params["incurred_on_after"])
+    if "incurred_on_before" in params:
+        queryset = queryset.filter(year_month__lte=params["incurred_on_before"])
+    return queryset
+
+
+class ExpenseFilter(filters.BaseFilterBackend):
+    """
+    Filters and orders a user's expenses in the database.
+
+    Each filter narrows the (created_by, ...) index range the owner filter
+    already selects, so no accepted combination scans the whole table.
+    Invalid or unsupported parameters are rejected with a 400 response.
+    """
+
+    def get_params(self, request):
+        serializer = ExpenseQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def filter_queryset(self, request, queryset, view):
+        params = self.get_params(request)
+
+        queryset = filter_range(queryset, params)
+        if "amount_min" in params:
+            queryset = queryset.filter(amount__gte=params["amount_min"])
+        if "amount_max" in params:
+            queryset = queryset.filter(amount__lte=params["amount_max"])
+        if "q" in params:
+            queryset = queryset.filter(
+                Q(title__icontains=params["q"]) | Q(notes__icontains=params["q"])
+            )
+        return queryset
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns the requested ordering with id as the keyset tie-breaker,
+        falling back to the view's or its pagination's default ordering.
+        """
+        ordering = self.get_params(request).get("ordering")
+        if ordering is None:
+            return getattr(view, "ordering", None) or view.pagination_class.ordering
+
+        tie_breaker = "-id" if ordering.startswith("-") else "id"
+        return (ordering, tie_breaker)
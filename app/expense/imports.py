@@ -0,0 +1,88 @@
+import csv
+import io
+from itertools import islice
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from app import caching
+
+from . import rollup
+from .models import Expense
+from .serializers import ExpenseSerializer
+from .signals import rollup_row
+
+REQUIRED_COLUMNS = ("title", "amount", "category", "incurred_on")
+COLUMNS = REQUIRED_COLUMNS + ("notes",)
+CHUNK_SIZE = 1000
+MAX_ERRORS = 1000
+
+
+def read_rows(file):
+    """
+    Returns a (line number, row) iterator over a binary CSV file.
+
+    Rows are decoded as they are read, so only the current one is held in
+    memory. Only the import columns are kept; others, such as the id and
+    updated columns of an export, are ignored.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    missing = [
+        column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())
+    ]
+    if missing:
+        raise ValidationError({"file": [f"Missing CSV columns: {', '.join(missing)}."]})
+
+    for row in reader:
+        yield reader.line_num, {
+            column: row[column] for column in COLUMNS if row.get(column) is not None
+        }
+
+
+@transaction.atomic
+def save_chunk(user, rows):
+    """
+    Inserts validated rows with one bulk INSERT and adds them to the rollup
+    """
+    expenses = Expense.objects.bulk_create(
+        Expense(created_by=user, **data) for data in rows
+    )
+    # bulk_create sends no signals; keep the rollup in step here.
+    rollup.add([rollup_row(expense) for expense in expenses])
+    caching.bump_versions([user.pk])
+
+    return len(expenses)
+
+
+def import_expenses(user, file, chunk_size=CHUNK_SIZE):
+    """
+    Imports expenses from a CSV file in chunks of chunk_size rows.
+
+    Rows are validated with ExpenseSerializer's rules; valid rows of each
+    chunk are saved in one transaction, invalid ones are reported by line
+    number. Returns the created and failed counts and the first MAX_ERRORS
+    errors.
+    """
+    rows = read_rows(file)
+    serializer = ExpenseSerializer()
+    result = {"created": 0, "failed": 0, "errors": []}
+
+    try:
+        chunk = list(islice(rows, chunk_size))
+        while chunk:
+            valid = []
+            for line, row in chunk:
+                try:
+                    valid.append(serializer.run_validation(row))
+                except ValidationError as exc:
+                    result["failed"] += 1
+                    if len(result["errors"]) < MAX_ERRORS:
+                        result["errors"].append({"line": line, "errors": exc.detail})
+
+            if valid:
+                result["created"] += save_chunk(user, valid)
+            chunk = list(islice(rows, chunk_size))
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ValidationError({"file": [f"Invalid CSV file: {exc}"]})
+
+    return result
@@ -0,0 +1,93 @@
+from django.core.files.storage import default_storage
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from app import caching
+from expense.models import Expense, Receipt, StoredFile
+from expense.storage import stream_digest
+
+
+class Command(BaseCommand):
+    help = "Merge expense files with identical content and recount their users"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report duplicates without merging them",
+        )
+
+    def merge(self, duplicate, name):
+        """
+        Points everything using a duplicate file at the stored copy and
+        deletes the duplicate once that is committed
+        """
+        with transaction.atomic():
+            expenses = Expense.objects.filter(file=duplicate)
+            caching.bump_versions(expenses.values_list("created_by_id", flat=True))
+            expenses.update(file=name, updated=timezone.now())
+            Receipt.objects.filter(source=duplicate).update(source=name)
+            transaction.on_commit(lambda: default_storage.delete(duplicate))
+
+    def recount(self):
+        """
+        Sets every stored file's reference count from the expenses using it
+        """
+        users = (
+            Expense.objects.filter(file=OuterRef("name"))
+            .order_by()
+            .values("file")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        StoredFile.objects.update(references=Coalesce(Subquery(users), 0))
+
+    def handle(self, *args, **options):
+        """
+        Hashes each expense file not stored by content yet, merging it into
+        the stored file with the same digest if there is one
+        """
+        dry_run = options["dry_run"]
+        stored = dict(StoredFile.objects.values_list("name", "sha256"))
+        names_by_digest = {sha256: name for name, sha256 in stored.items()}
+        merged = 0
+        freed = 0
+
+        names = (
+            Expense.objects.exclude(file__isnull=True)
+            .exclude(file="")
+            .order_by("file")
+            .values_list("file", flat=True)
+            .distinct()
+        )
+
+        for name in names.iterator():
+            if name in stored:
+                continue
+            if not default_storage.exists(name):
+                self.stderr.write(f"Missing file {name}.")
+                continue
+
+            with default_storage.open(name, "rb") as file:
+                sha256, size = stream_digest(file)
+
+            if sha256 not in names_by_digest:
+                names_by_digest[sha256] = name
+                if not dry_run:
+                    StoredFile.objects.create(name=name, sha256=sha256, size=size)
+                continue
+
+            merged += 1
+            freed += size
+            if not dry_run:
+                self.merge(name, names_by_digest[sha256])
+
+        if dry_run:
+            self.stdout.write(f"Found {merged} duplicate files, {freed} bytes.")
+            return
+
+        self.recount()
+        self.stdout.write(f"Merged {merged} duplicate files, freeing {freed} bytes.")
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from expense import imports
+
+
+class Command(BaseCommand):
+    help = "Import a user's expenses from a CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import")
+        parser.add_argument(
+            "--user", required=True, help="E-mail of the user owning the expenses"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=imports.CHUNK_SIZE,
+            help="Number of rows validated and inserted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Streams the file into the user's expenses and reports failed rows
+        """
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+
+        with open(options["path"], "rb") as file:
+            try:
+                result = imports.import_expenses(user, file, options["chunk_size"])
+            except ValidationError as exc:
+                raise CommandError(exc.detail["file"][0])
+
+        for error in result["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+
+        self.stdout.write(
+            f"Imported {result['created']} expenses, {result['failed']} rows failed."
+        )
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+
+from expense import rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly spend rollup from expenses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of users rebuilt per transaction",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Recomputes the rollup of every user, one batch of users at a time
+        """
+        batch_size = options["batch_size"]
+        user_ids = get_user_model().objects.order_by("id").values_list("id", flat=True)
+        batch = []
+        rebuilt = 0
+
+        for user_id in user_ids.iterator(chunk_size=batch_size):
+            batch.append(user_id)
+            if len(batch) == batch_size:
+                rollup.rebuild(batch)
+                rebuilt += len(batch)
+                batch = []
+
+        if batch:
+            rollup.rebuild(batch)
+            rebuilt += len(batch)
+
+        self.stdout.write(f"Rebuilt monthly spend for {rebuilt} users.")
@@ -0,0 +1,17 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0002_expense_file'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['created_by', 'incurred_on', 'id'], name='expense_owner_incurred_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0003_owner_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['created_by', 'category'], name='expense_owner_category_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:13
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def populate_monthly_spend(apps, schema_editor):
+    Expense = apps.get_model('expense', 'Expense')
+    MonthlySpend = apps.get_model('expense', 'MonthlySpend')
+
+    spend = (
+        Expense.objects.annotate(year_month=TruncMonth('incurred_on'))
+        .values('created_by_id', 'year_month', 'category')
+        .annotate(total=Sum('amount'), count=Count('id'), min=Min('amount'), max=Max('amount'))
+        .order_by()
+    )
+    MonthlySpend.objects.bulk_create(
+        (
+            MonthlySpend(
+                user_id=row['created_by_id'],
+                year_month=row['year_month'],
+                category=row['category'],
+                total=row['total'],
+                count=row['count'],
+                min=row['min'],
+                max=row['max'],
+            )
+            for row in spend.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expense', '0005_amount_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySpend',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year_month', models.DateField()),
+                ('category', models.CharField(max_length=30)),
+                ('total', models.DecimalField(decimal_places=2, default=0.0, max_digits=12)),
+                ('count', models.IntegerField(default=0)),
+                ('min', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('max', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'year_month', 'category')},
+            },
+        ),
+        migrations.RunPython(populate_monthly_spend, migrations.RunPython.noop),
+    ]
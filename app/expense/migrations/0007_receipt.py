@@ -0,0 +1,30 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0006_monthlyspend'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Receipt',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100)),
+                ('content_type', models.CharField(max_length=100)),
+                ('size', models.PositiveIntegerField()),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('width', models.PositiveIntegerField(null=True)),
+                ('height', models.PositiveIntegerField(null=True)),
+                ('thumbnail', models.FileField(max_length=200, null=True, upload_to='')),
+                ('web', models.FileField(max_length=200, null=True, upload_to='')),
+                ('processed_at', models.DateTimeField(auto_now=True)),
+                ('expense', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='receipt', to='expense.Expense')),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:39
+
+from django.db import migrations, models
+import expense.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0007_receipt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.PositiveIntegerField()),
+                ('references', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='file',
+            field=models.FileField(null=True, storage=expense.storage.DedupedStorage(), upload_to=''),
+        ),
+    ]
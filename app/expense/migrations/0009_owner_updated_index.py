@@ -0,0 +1,17 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0008_storedfile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['created_by', 'updated'], name='expense_owner_updated_idx'),
+        ),
+    ]
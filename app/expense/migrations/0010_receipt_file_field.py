@@ -0,0 +1,19 @@
+# Generated by Django 3.0.5 on 2026-10-18 08:40
+
+from django.db import migrations
+import expense.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0009_owner_updated_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='expense',
+            name='file',
+            field=expense.storage.ReceiptFileField(null=True, storage=expense.storage.DedupedStorage(), upload_to=''),
+        ),
+    ]
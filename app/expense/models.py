@@ -1,5 +1,7 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+
+from .storage import ReceiptFileField, receipt_storage
 
 
 class Expense(models.Model):
@@ -12,7 +14,101 @@ class Expense(models.Model):
     notes = models.TextField(blank=True)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     updated = models.DateTimeField(auto_now=True)
-    file = models.FileField(null=True)
+    file = ReceiptFileField(null=True, storage=receipt_storage)
+
+    class Meta:
+        indexes = [
+            # Backs the (incurred_on, id) keyset pagination of ExpenseList;
+            # its (created_by, incurred_on) prefix serves date-range reports.
+            models.Index(
+                fields=["created_by", "incurred_on", "id"],
+                name="expense_owner_incurred_idx",
+            ),
+            models.Index(
+                fields=["created_by", "category"], name="expense_owner_category_idx"
+            ),
+            # Backs amount range filters and ordering by amount.
+            models.Index(
+                fields=["created_by", "amount", "id"], name="expense_owner_amount_idx"
+            ),
+            # Backs delta sync: changes of an owner since a watermark.
+            models.Index(
+                fields=["created_by", "updated"], name="expense_owner_updated_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # A new file's upload counts this expense as using it; the count
+        # must not outlive a failed save.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.title}"
+
+
+class MonthlySpend(models.Model):
+    """
+    Per-user rollup of expenses by month and category.
+
+    Kept in step with Expense by expense.rollup so reports read one row per
+    (month, category) instead of every expense.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # First day of the month the expenses were incurred in.
+    year_month = models.DateField()
+    category = models.CharField(max_length=30)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    count = models.IntegerField(default=0)
+    min = models.DecimalField(max_digits=10, decimal_places=2)
+    max = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        unique_together = ("user", "year_month", "category")
+
+    def __str__(self):
+        return f"{self.year_month:%Y-%m} {self.category}"
+
+
+class Receipt(models.Model):
+    """
+    Metadata and downsized variants of an expense's receipt file.
+
+    Written by expense.receipts after each upload, so lists can show the
+    small thumbnail instead of the original.
+    """
+
+    expense = models.OneToOneField(
+        Expense, on_delete=models.CASCADE, related_name="receipt"
+    )
+    # Expense.file name the metadata and variants were made from.
+    source = models.CharField(max_length=100)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64, db_index=True)
+    width = models.PositiveIntegerField(null=True)
+    height = models.PositiveIntegerField(null=True)
+    thumbnail = models.FileField(max_length=200, null=True)
+    web = models.FileField(max_length=200, null=True)
+    processed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}"
+
+
+class StoredFile(models.Model):
+    """
+    A file in storage, shared by every expense with the same content.
+
+    Saved by expense.storage.DedupedStorage; `references` counts the
+    expenses using it so the object is deleted with the last of them.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveIntegerField()
+    references = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}"
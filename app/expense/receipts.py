@@ -0,0 +1,145 @@
+import hashlib
+import mimetypes
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from app import caching
+
+from .models import Expense, Receipt
+
+# Longest side in pixels and JPEG quality of each variant.
+VARIANTS = {"thumbnail": (200, 70), "web": (1280, 80)}
+
+
+def digest(file):
+    """
+    Returns the SHA-256 hex digest and byte size of a file, read in chunks
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+
+    for chunk in file.chunks():
+        sha256.update(chunk)
+        size += len(chunk)
+
+    return sha256.hexdigest(), size
+
+
+def open_image(file):
+    """
+    Returns the upright RGB image in a file, or None if it is not an image
+    """
+    try:
+        image = Image.open(file)
+        image.load()
+    except (OSError, SyntaxError):
+        return None, None
+
+    image_format = image.format
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        # JPEG has no alpha channel; flatten transparency onto white.
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    return image, image_format
+
+
+def render_variant(image, longest_side, quality):
+    """
+    Returns a downsized, recompressed JPEG of an image without its EXIF data
+    """
+    variant = image.copy()
+    variant.thumbnail((longest_side, longest_side), Image.LANCZOS)
+    buffer = BytesIO()
+    variant.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+
+    return ContentFile(buffer.getvalue())
+
+
+def variant_key(sha256, name):
+    """
+    Returns the content-addressed key of a receipt variant
+    """
+    return f"{settings.PUBLIC_MEDIA_LOCATION}/receipts/variants/{sha256}/{name}.jpg"
+
+
+def save_variant(sha256, name, content):
+    key = variant_key(sha256, name)
+    # Same source bytes, same variant: reuse what an earlier run stored.
+    if default_storage.exists(key):
+        return key
+    return default_storage.save(key, content)
+
+
+def process_receipt(expense_id):
+    """
+    Records the metadata of an expense's receipt and stores its variants.
+
+    Images get a thumbnail and a web-size JPEG, both stripped of EXIF data;
+    other files, such as PDFs, only get their metadata recorded. Returns the
+    Receipt, or None if the expense or its file changed in the meantime.
+    """
+    expense = Expense.objects.filter(pk=expense_id).first()
+    if expense is None:
+        return None
+    if not expense.file:
+        if Receipt.objects.filter(expense_id=expense_id).delete()[0]:
+            caching.bump_versions([expense.created_by_id])
+        return None
+
+    source = expense.file.name
+    variants = {}
+
+    with expense.file.open("rb") as file:
+        sha256, size = digest(file)
+        file.seek(0)
+        image, image_format = open_image(file)
+
+    if image is not None:
+        content_type = Image.MIME.get(image_format, "application/octet-stream")
+        for name, (longest_side, quality) in VARIANTS.items():
+            content = render_variant(image, longest_side, quality)
+            variants[name] = save_variant(sha256, name, content)
+    else:
+        content_type = mimetypes.guess_type(source)[0] or "application/octet-stream"
+
+    with transaction.atomic():
+        current = (
+            Expense.objects.select_for_update()
+            .filter(pk=expense_id)
+            .values_list("file", flat=True)
+            .first()
+        )
+        if current != source:
+            # Replaced or deleted while processing; its own run takes over.
+            return None
+
+        receipt, _ = Receipt.objects.update_or_create(
+            expense_id=expense_id,
+            defaults={
+                "source": source,
+                "content_type": content_type,
+                "size": size,
+                "sha256": sha256,
+                "width": image.width if image else None,
+                "height": image.height if image else None,
+                "thumbnail": variants.get("thumbnail"),
+                "web": variants.get("web"),
+            },
+        )
+        # The receipt is serialized with its expense, so the expense changed.
+        Expense.objects.filter(pk=expense_id).update(updated=timezone.now())
+        caching.bump_versions([expense.created_by_id])
+
+    return receipt
@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.db.models import Avg, Count, DecimalField, F, Func, Max, Min, Sum, Window
+from django.db.models.functions import ExtractYear, TruncMonth
+
+
+class SumOver(Func):
+    """
+    SUM() usable as a window over an already grouped aggregate
+    """
+
+    function = "SUM"
+    window_compatible = True
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # SQLite's CAST(... AS NUMERIC) wrapper is invalid before OVER().
+        return self.as_sql(compiler, connection, **extra_context)
+
+
+def spend_aggregates():
+    """
+    Returns the aggregates reported for every group of expenses
+    """
+    return {
+        "total": Sum("amount"),
+        "count": Count("id"),
+        "average": Avg("amount"),
+        "min": Min("amount"),
+        "max": Max("amount"),
+    }
+
+
+def summarize(queryset):
+    """
+    Groups expenses by category, month and year in the database
+    """
+    by_category = (
+        queryset.order_by()
+        .values("category")
+        .annotate(**spend_aggregates())
+        .order_by("category")
+    )
+    by_month = (
+        queryset.order_by()
+        .annotate(month=TruncMonth("incurred_on"))
+        .values("month")
+        .annotate(
+            **spend_aggregates(),
+            running_total=Window(
+                SumOver(Sum("amount"), output_field=DecimalField()),
+                order_by=F("month").asc(),
+            ),
+        )
+        .order_by("month")
+    )
+    by_year = (
+        queryset.order_by()
+        .annotate(year=ExtractYear("incurred_on"))
+        .values("year")
+        .annotate(**spend_aggregates())
+        .order_by("year")
+    )
+
+    return {
+        "overall": queryset.aggregate(**spend_aggregates()),
+        "by_category": by_category,
+        "by_month": by_month,
+        "by_year": by_year,
+    }
+
+
+def covers_whole_months(params):
+    """
+    Returns whether a date range starts and ends on month boundaries
+    """
+    after = params.get("incurred_on_after")
+    before = params.get("incurred_on_before")
+
+    return (after is None or after.day == 1) and (
+        before is None or (before + timedelta(days=1)).day == 1
+    )
+
+
+def with_average(row):
+    row["count"] = row["count"] or 0
+    row["average"] = row["total"] / row["count"] if row["count"] else None
+    return row
+
+
+def summarize_rollup(queryset):
+    """
+    Groups MonthlySpend rows the way summarize() groups expenses.
+
+    Reads one row per month and category, so it costs O(months) no matter
+    how many expenses the user has.
+    """
+    aggregates = {
+        "total": Sum("total"),
+        "count": Sum("count"),
+        "min": Min("min"),
+        "max": Max("max"),
+    }
+
+    by_category = (
+        queryset.order_by()
+        .values("category")
+        .annotate(**aggregates)
+        .order_by("category")
+    )
+    by_month = (
+        queryset.order_by()
+        # The aggregates' names shadow the columns; window over an alias.
+        .annotate(month=F("year_month"), spent=F("total"))
+        .values("month")
+        .annotate(
+            **aggregates,
+            running_total=Window(
+                SumOver(Sum("spent"), output_field=DecimalField()),
+                order_by=F("year_month").asc(),
+            ),
+        )
+        .order_by("month")
+    )
+    by_year = (
+        queryset.order_by()
+        .annotate(year=ExtractYear("year_month"))
+        .values("year")
+        .annotate(**aggregates)
+        .order_by("year")
+    )
+
+    return {
+        "overall": with_average(queryset.aggregate(**aggregates)),
+        "by_category": [with_average(row) for row in by_category],
+        "by_month": [with_average(row) for row in by_month],
+        "by_year": [with_average(row) for row in by_year],
+    }
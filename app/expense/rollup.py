@@ -0,0 +1,145 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Expense, MonthlySpend
+
+
+def bucket_of(user_id, incurred_on, category):
+    """
+    Returns the (user, year_month, category) rollup key of an expense
+    """
+    return (user_id, incurred_on.replace(day=1), category)
+
+
+def group_rows(rows):
+    """
+    Sums (user_id, incurred_on, category, amount) rows per rollup key
+    """
+    buckets = {}
+
+    for user_id, incurred_on, category, amount in rows:
+        key = bucket_of(user_id, incurred_on, category)
+        total, count, low, high = buckets.get(key, (0, 0, amount, amount))
+        buckets[key] = (total + amount, count + 1, min(low, amount), max(high, amount))
+
+    return buckets
+
+
+def locked_bucket(key):
+    user_id, year_month, category = key
+    return (
+        MonthlySpend.objects.select_for_update()
+        .filter(user_id=user_id, year_month=year_month, category=category)
+        .first()
+    )
+
+
+def bucket_expenses(key):
+    user_id, year_month, category = key
+    return Expense.objects.filter(
+        created_by_id=user_id,
+        category=category,
+        incurred_on__year=year_month.year,
+        incurred_on__month=year_month.month,
+    )
+
+
+@transaction.atomic
+def add(rows):
+    """
+    Adds expense rows, already saved, to the rollup
+    """
+    for key, (total, count, low, high) in group_rows(rows).items():
+        bucket = locked_bucket(key)
+
+        if bucket is None:
+            user_id, year_month, category = key
+            try:
+                with transaction.atomic():
+                    MonthlySpend.objects.create(
+                        user_id=user_id,
+                        year_month=year_month,
+                        category=category,
+                        total=total,
+                        count=count,
+                        min=low,
+                        max=high,
+                    )
+                continue
+            except IntegrityError:
+                # Created concurrently; fall through and add to it.
+                bucket = locked_bucket(key)
+
+        bucket.total += total
+        bucket.count += count
+        bucket.min = min(bucket.min, low)
+        bucket.max = max(bucket.max, high)
+        bucket.save()
+
+
+@transaction.atomic
+def remove(rows):
+    """
+    Removes expense rows, already deleted or changed, from the rollup
+    """
+    for key, (total, count, low, high) in group_rows(rows).items():
+        bucket = locked_bucket(key)
+
+        if bucket is None:
+            continue
+
+        bucket.count -= count
+        if bucket.count <= 0:
+            bucket.delete()
+            continue
+
+        bucket.total -= total
+        if low <= bucket.min or high >= bucket.max:
+            # An extreme left the bucket; only its remaining rows can tell.
+            spend = bucket_expenses(key).aggregate(min=Min("amount"), max=Max("amount"))
+            if spend["min"] is None:
+                # A queryset delete took the other counted rows too; they
+                # are removed next, and find the bucket gone.
+                bucket.delete()
+                continue
+            bucket.min = spend["min"]
+            bucket.max = spend["max"]
+        bucket.save()
+
+
+def recompute(user_ids):
+    """
+    Returns MonthlySpend rows computed from scratch for the given users
+    """
+    spend = (
+        Expense.objects.filter(created_by_id__in=user_ids)
+        .annotate(year_month=TruncMonth("incurred_on"))
+        .values("created_by_id", "year_month", "category")
+        .annotate(
+            total=Sum("amount"), count=Count("id"), min=Min("amount"), max=Max("amount")
+        )
+        .order_by()
+    )
+
+    return [
+        MonthlySpend(
+            user_id=row["created_by_id"],
+            year_month=row["year_month"],
+            category=row["category"],
+            total=row["total"],
+            count=row["count"],
+            min=row["min"],
+            max=row["max"],
+        )
+        for row in spend
+    ]
+
+
+@transaction.atomic
+def rebuild(user_ids):
+    """
+    Replaces the rollup of the given users with a full recompute
+    """
+    MonthlySpend.objects.filter(user_id__in=user_ids).delete()
+    MonthlySpend.objects.bulk_create(recompute(user_ids))
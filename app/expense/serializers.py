@@ -1,14 +1,120 @@
+from django.conf import settings
 from rest_framework import serializers
 
-from .models import Expense
+from .models import Expense, Receipt
+from .uploads import RECEIPT_CONTENT_TYPES
+
+
+class ReceiptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Receipt
+        fields = (
+            "thumbnail",
+            "web",
+            "width",
+            "height",
+            "size",
+            "content_type",
+            "sha256",
+        )
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
+    receipt = ReceiptSerializer(read_only=True)
+
     class Meta:
         model = Expense
-        fields = ("id", "title", "amount", "category", "incurred_on", "notes", "file")
+        fields = (
+            "id",
+            "title",
+            "amount",
+            "category",
+            "incurred_on",
+            "notes",
+            "file",
+            "receipt",
+        )
 
         extra_kwargs = {
             "created_by": {"read_only": True},
             "updated": {"read_only": True},
         }
+
+
+class BulkExpenseSerializer(ExpenseSerializer):
+    """
+    Validate an expense of a bulk request, which saves without signals, so
+    files are only changed one expense at a time
+    """
+
+    class Meta(ExpenseSerializer.Meta):
+        read_only_fields = ("file",)
+
+
+class ExpenseImportSerializer(serializers.Serializer):
+    """ Validate an expense CSV import upload """
+
+    file = serializers.FileField()
+
+
+class ReceiptUploadRequestSerializer(serializers.Serializer):
+    """ Validate a request for a receipt upload URL """
+
+    filename = serializers.CharField(max_length=100)
+    content_type = serializers.ChoiceField(choices=RECEIPT_CONTENT_TYPES)
+    size = serializers.IntegerField(min_value=1)
+
+    def validate_size(self, value):
+        if value > settings.EXPENSE_RECEIPT_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Ensure the receipt is at most {settings.EXPENSE_RECEIPT_MAX_SIZE} bytes."
+            )
+        return value
+
+
+class ReceiptUploadSerializer(serializers.Serializer):
+    """ Serialize where and how to upload a receipt """
+
+    key = serializers.CharField()
+    method = serializers.CharField()
+    url = serializers.URLField()
+    fields = serializers.DictField(child=serializers.CharField())
+    expires_in = serializers.IntegerField()
+
+
+class ReceiptAttachSerializer(serializers.Serializer):
+    """ Validate the key of an uploaded receipt """
+
+    key = serializers.CharField(max_length=100)
+
+
+class SpendSerializer(serializers.Serializer):
+    """ Serialize aggregated spend for a group of expenses """
+
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    count = serializers.IntegerField()
+    average = serializers.DecimalField(max_digits=12, decimal_places=2)
+    min = serializers.DecimalField(max_digits=10, decimal_places=2)
+    max = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class CategorySpendSerializer(SpendSerializer):
+    category = serializers.CharField()
+
+
+class MonthlySpendSerializer(SpendSerializer):
+    month = serializers.DateField(format="%Y-%m")
+    running_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class YearlySpendSerializer(SpendSerializer):
+    year = serializers.IntegerField()
+
+
+class ExpenseSummarySerializer(serializers.Serializer):
+    """ Serialize an expense summary """
+
+    overall = SpendSerializer()
+    by_category = CategorySpendSerializer(many=True)
+    by_month = MonthlySpendSerializer(many=True)
+    by_year = YearlySpendSerializer(many=True)
@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from app import caching
+
+from . import rollup, storage, tasks
+from .models import Expense
+
+ROLLUP_FIELDS = ("created_by_id", "incurred_on", "category", "amount")
+
+# Sent with the `ids` and instances of `expenses` deleted together by a bulk
+# delete, whose post_delete handlers leave their work for the whole batch.
+expenses_deleted = Signal()
+
+
+def rollup_row(expense):
+    """
+    Returns the (user_id, incurred_on, category, amount) row of an expense
+    """
+    field = Expense._meta.get_field
+
+    return (
+        expense.created_by_id,
+        field("incurred_on").to_python(expense.incurred_on),
+        expense.category,
+        field("amount").to_python(expense.amount),
+    )
+
+
+@receiver(pre_save, sender=Expense)
+def load_rollup_row(sender, instance, raw=False, **kwargs):
+    # Remember what the stored row contributed, so an update can move it,
+    # and which file it had, so a new upload is processed.
+    instance._rollup_row = None
+    instance._previous_file = None
+    if not raw and instance.pk is not None:
+        stored = (
+            Expense.objects.filter(pk=instance.pk)
+            .values_list(*ROLLUP_FIELDS, "file")
+            .first()
+        )
+        if stored is not None:
+            instance._rollup_row = stored[:-1]
+            instance._previous_file = stored[-1] or None
+
+
+@receiver(post_save, sender=Expense)
+def update_rollup(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    row = rollup_row(instance)
+    previous = instance._rollup_row
+
+    if row != previous:
+        if previous is not None:
+            rollup.remove([previous])
+        rollup.add([row])
+
+
+@receiver(post_save, sender=Expense)
+def update_file(sender, instance, raw=False, **kwargs):
+    # Uploading a file counted the expense as using it already.
+    retained = instance.__dict__.pop("_retained_file", None)
+    if raw or (instance.file.name or None) == instance._previous_file:
+        # The same content uploaded again is counted twice.
+        storage.release(retained)
+        return
+
+    if instance.file.name != retained:
+        storage.retain(instance.file.name)
+    storage.release(instance._previous_file)
+
+    expense_id = instance.pk
+    transaction.on_commit(lambda: tasks.process_receipt.delay(expense_id))
+
+
+@receiver(post_save, sender=Expense)
+def invalidate_responses(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    user_ids = {instance.created_by_id}
+    if instance._rollup_row is not None:
+        # Moved to another user; their old owner's responses are stale too.
+        user_ids.add(instance._rollup_row[0])
+    caching.bump_versions(user_ids)
+
+
+@receiver(post_delete, sender=Expense)
+def remove_from_rollup(sender, instance, **kwargs):
+    if not getattr(instance, "_deleted_in_batch", False):
+        rollup.remove([rollup_row(instance)])
+
+
+@receiver(post_delete, sender=Expense)
+def release_file(sender, instance, **kwargs):
+    if not getattr(instance, "_deleted_in_batch", False):
+        storage.release(instance.file.name)
+
+
+@receiver(post_delete, sender=Expense)
+def invalidate_deleted(sender, instance, **kwargs):
+    if not getattr(instance, "_deleted_in_batch", False):
+        caching.bump_versions([instance.created_by_id])
+
+
+@receiver(expenses_deleted, sender=Expense)
+def remove_deleted_batch(sender, expenses, **kwargs):
+    rollup.remove([rollup_row(expense) for expense in expenses])
+    storage.release(*(expense.file.name for expense in expenses))
+    caching.bump_versions({expense.created_by_id for expense in expenses})
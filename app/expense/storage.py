@@ -0,0 +1,183 @@
+import hashlib
+import os
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.files.storage import Storage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.fields.files import FieldFile, FileField
+from django.utils.deconstruct import deconstructible
+
+
+def content_key(sha256, name):
+    """
+    Returns the content-addressed key of a file with the given digest
+    """
+    extension = os.path.splitext(name)[1].lower()[:10]
+    return (
+        f"{settings.PUBLIC_MEDIA_LOCATION}/receipts/"
+        f"{sha256[:2]}/{sha256}{extension}"
+    )
+
+
+def stream_digest(content):
+    """
+    Returns the SHA-256 hex digest and size of a file, read in chunks and
+    rewound so it can be read again
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+        size += len(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+
+    return sha256.hexdigest(), size
+
+
+@deconstructible
+class DedupedStorage(Storage):
+    """
+    Stores each distinct file content once, on top of the default storage.
+
+    Saving reads the upload once to hash it and names the object after its
+    digest. When an object with the same content is already stored it is
+    reused and nothing is uploaded; otherwise the upload is read a second
+    time to store it, as its key is only known once it has been hashed.
+    Either way saving counts one more expense using the object, under a
+    lock on its StoredFile row held until the saving transaction ends, so
+    release() cannot delete it in between. release() counts one fewer, and
+    the object is deleted with the last one.
+    """
+
+    def save(self, name, content, max_length=None):
+        # Deferred: models import this module to declare Expense.file.
+        from .models import StoredFile
+
+        if name is None:
+            name = content.name
+        sha256, size = stream_digest(content)
+
+        with transaction.atomic():
+            stored = StoredFile.objects.filter(sha256=sha256)
+            if stored.update(references=F("references") + 1):
+                return stored.get().name
+
+        # Objects are deleted before their row, so one left without a row
+        # is not about to be: only a save that rolled back leaves them.
+        key = content_key(sha256, name)
+        if not default_storage.exists(key):
+            key = default_storage.save(key, content, max_length=max_length)
+
+        with transaction.atomic():
+            stored, created = StoredFile.objects.select_for_update().get_or_create(
+                sha256=sha256, defaults={"name": key, "size": size, "references": 1}
+            )
+            if not created:
+                stored.references = F("references") + 1
+                stored.save(update_fields=["references"])
+        return stored.name
+
+    def _open(self, name, mode="rb"):
+        return default_storage.open(name, mode)
+
+    def delete(self, name):
+        default_storage.delete(name)
+
+    def exists(self, name):
+        return default_storage.exists(name)
+
+    def size(self, name):
+        return default_storage.size(name)
+
+    def url(self, name):
+        return default_storage.url(name)
+
+    def listdir(self, path):
+        return default_storage.listdir(path)
+
+    def path(self, name):
+        return default_storage.path(name)
+
+    def get_modified_time(self, name):
+        return default_storage.get_modified_time(name)
+
+
+receipt_storage = DedupedStorage()
+
+
+class ReceiptFieldFile(FieldFile):
+    """
+    An expense's file, remembering which file saving it counted the
+    expense as a user of
+    """
+
+    def save(self, name, content, save=True):
+        # The reference taken by the storage is only kept with the expense.
+        with transaction.atomic():
+            super().save(name, content, save=False)
+            self.instance._retained_file = self.name
+            if save:
+                self.instance.save()
+
+
+class ReceiptFileField(FileField):
+    attr_class = ReceiptFieldFile
+
+
+def retain(name):
+    """
+    Counts one more expense using a stored file
+    """
+    from .models import StoredFile
+
+    if name:
+        StoredFile.objects.filter(name=name).update(references=F("references") + 1)
+
+
+@transaction.atomic
+def release(*names):
+    """
+    Counts one expense fewer using each of the given stored files, once per
+    time a name is given, deleting the files nothing else uses once the
+    transaction commits.
+
+    Files stored before deduplication, or uploaded directly, have no
+    StoredFile row and are left alone.
+    """
+    from .models import StoredFile
+
+    counts = Counter(name for name in names if name)
+    names_by_count = defaultdict(list)
+    for name, count in counts.items():
+        names_by_count[count].append(name)
+
+    # One UPDATE per distinct count; a batch usually has one.
+    for count, released in names_by_count.items():
+        StoredFile.objects.filter(name__in=released).update(
+            references=Greatest(F("references") - count, 0)
+        )
+    if counts:
+        transaction.on_commit(lambda: collect(*counts))
+
+
+@transaction.atomic
+def collect(*names):
+    """
+    Deletes stored files no expense uses, then their rows, holding the rows'
+    locks so a save reusing a file waits and finds it gone
+    """
+    from .models import StoredFile
+
+    unused = list(
+        StoredFile.objects.select_for_update().filter(name__in=names, references=0)
+    )
+    for stored in unused:
+        default_storage.delete(stored.name)
+    StoredFile.objects.filter(pk__in=[stored.pk for stored in unused]).delete()
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from . import receipts
+
+
+@shared_task(autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def process_receipt(expense_id):
+    """
+    Makes the variants and metadata of an expense's receipt after upload
+    """
+    receipt = receipts.process_receipt(expense_id)
+    return receipt.id if receipt else None
@@ -0,0 +1,137 @@
+import os
+import posixpath
+import uuid
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.module_loading import import_string
+from django.utils.text import get_valid_filename
+
+from .models import Expense
+
+RECEIPT_CONTENT_TYPES = (
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "application/pdf",
+)
+UPLOAD_SALT = "expense.receipt-upload"
+
+
+def receipt_prefix(expense):
+    """
+    Returns the key prefix receipts of an expense are uploaded under
+    """
+    return (
+        f"{settings.PUBLIC_MEDIA_LOCATION}/receipts/"
+        f"{expense.created_by_id}/{expense.id}/"
+    )
+
+
+def is_receipt_key(expense, key):
+    """
+    Returns whether a key is one receipts of an expense are uploaded to
+    """
+    # Without normalising, "<prefix>../" would lead out of the prefix.
+    return posixpath.normpath(key) == key and key.startswith(receipt_prefix(expense))
+
+
+def receipt_key(expense, filename):
+    """
+    Returns a new, unguessable key for a receipt of an expense
+    """
+    prefix = f"{receipt_prefix(expense)}{uuid.uuid4().hex}/"
+    name = get_valid_filename(os.path.basename(filename)) or "receipt"
+    # Keep the end of long names, extension included, within Expense.file.
+    room = Expense._meta.get_field("file").max_length - len(prefix)
+    return prefix + name[-room:]
+
+
+class S3UploadBackend:
+    """
+    Issues presigned S3 POSTs, so receipt bytes go from the client straight
+    to the bucket of the S3 default storage
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage or default_storage
+
+    @property
+    def client(self):
+        return self.storage.bucket.meta.client
+
+    def presign(self, request, key, content_type, max_size):
+        fields = {"Content-Type": content_type}
+        conditions = [
+            {"Content-Type": content_type},
+            ["content-length-range", 1, max_size],
+        ]
+        if self.storage.default_acl:
+            fields["acl"] = self.storage.default_acl
+            conditions.append({"acl": self.storage.default_acl})
+
+        post = self.client.generate_presigned_post(
+            Bucket=self.storage.bucket_name,
+            Key=key,
+            Fields=fields,
+            Conditions=conditions,
+            ExpiresIn=settings.EXPENSE_RECEIPT_UPLOAD_EXPIRES,
+        )
+
+        return {"method": "POST", "url": post["url"], "fields": post["fields"]}
+
+    def uploaded_size(self, key):
+        """
+        Returns the size of an uploaded object, or None if it is missing
+        """
+        try:
+            head = self.client.head_object(Bucket=self.storage.bucket_name, Key=key)
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return None
+            raise
+        return head["ContentLength"]
+
+
+class LocalUploadBackend:
+    """
+    Stand-in for S3 in development and tests: uploads are PUT to a signed
+    URL served by ReceiptUpload and saved to the default storage
+    """
+
+    def __init__(self, storage=None):
+        self.storage = storage or default_storage
+
+    def presign(self, request, key, content_type, max_size):
+        token = signing.dumps(
+            {"key": key, "content_type": content_type, "max_size": max_size},
+            salt=UPLOAD_SALT,
+        )
+        url = request.build_absolute_uri(
+            reverse("expense_receipt_put", kwargs={"token": token})
+        )
+
+        return {"method": "PUT", "url": url, "fields": {}}
+
+    def uploaded_size(self, key):
+        if not self.storage.exists(key):
+            return None
+        return self.storage.size(key)
+
+
+def load_upload_token(token):
+    """
+    Returns the key, content type and size limit a local upload URL was
+    issued for, raising signing.BadSignature if it is invalid or expired
+    """
+    return signing.loads(
+        token, salt=UPLOAD_SALT, max_age=settings.EXPENSE_RECEIPT_UPLOAD_EXPIRES
+    )
+
+
+def get_backend():
+    return import_string(settings.EXPENSE_RECEIPT_UPLOAD_BACKEND)()
@@ -1,35 +1,269 @@
-from rest_framework import generics
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from app.caching import CachedResponseMixin
+from app.export import ExportContentNegotiation, export_response
+from app.pagination import ExpenseCursorPagination
 from app.permissions import IsCreator
 
-from .models import Expense
-from .serializers import ExpenseSerializer
+from . import bulk, imports, uploads
+from .filters import (
+    ExpenseFilter,
+    ExpenseRangeSerializer,
+    filter_months,
+    filter_range,
+)
+from .models import Expense, MonthlySpend
+from .reports import covers_whole_months, summarize, summarize_rollup
+from .serializers import (
+    ExpenseImportSerializer,
+    ExpenseSerializer,
+    ExpenseSummarySerializer,
+    ReceiptAttachSerializer,
+    ReceiptUploadRequestSerializer,
+    ReceiptUploadSerializer,
+)
 
 
-class ExpenseList(generics.ListCreateAPIView):
+class ExpenseList(CachedResponseMixin, generics.ListCreateAPIView):
     """
     Lists and creates tasks.
     """
 
     serializer_class = ExpenseSerializer
     permission_classes = (IsCreator,)
+    pagination_class = ExpenseCursorPagination
+    filter_backends = (ExpenseFilter,)
 
     # Ensure a user sees only own Expense objects.
     def get_queryset(self):
         user = self.request.user
-        return Expense.objects.filter(created_by=user)
+        return Expense.objects.filter(created_by=user).select_related("receipt")
 
     # Set user as owner of a Expense object.
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
-class ExpenseDetail(generics.RetrieveUpdateDestroyAPIView):
+class ExpenseBulk(generics.GenericAPIView):
+    """
+    Creates, updates and deletes up to bulk.MAX_ITEMS expenses per request.
+
+    Each batch runs in one transaction: if any item is invalid nothing is
+    saved and the errors are returned in item order.
+    """
+
+    serializer_class = ExpenseSerializer
+
+    def post(self, request):
+        expenses = bulk.create(request.user, request.data)
+        serializer = self.get_serializer(expenses, many=True)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        expenses = bulk.update(request.user, request.data)
+        serializer = self.get_serializer(expenses, many=True)
+
+        return Response(serializer.data)
+
+    def delete(self, request):
+        ids = bulk.delete(request.user, request.data)
+
+        return Response([{"id": expense_id, "deleted": True} for expense_id in ids])
+
+
+class ExpenseImport(generics.GenericAPIView):
+    """
+    Imports expenses from an uploaded CSV file.
+
+    Valid rows are saved in chunks; invalid ones are reported by line
+    number without stopping the import.
+    """
+
+    serializer_class = ExpenseImportSerializer
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = imports.import_expenses(
+            request.user, serializer.validated_data["file"].file
+        )
+
+        return Response(result)
+
+
+class ExpenseDetail(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Returns a single Expense and allows updates and deletion of a Task
     """
 
-    queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
     permission_classes = (IsCreator,)
     lookup_url_kwarg = "expense_id"
+
+    # Look expenses up among the user's own, so others' are a 404.
+    def get_queryset(self):
+        user = self.request.user
+        return Expense.objects.filter(created_by=user).select_related("receipt")
+
+
+class ExpenseSummary(generics.GenericAPIView):
+    """
+    Returns a user's spend grouped by category, month and year.
+
+    Whole-month ranges are answered from the MonthlySpend rollup; ranges
+    that split a month are aggregated from the expenses themselves.
+    """
+
+    serializer_class = ExpenseSummarySerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        return Expense.objects.filter(created_by=user)
+
+    def get(self, request):
+        params = ExpenseRangeSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        params = params.validated_data
+
+        if covers_whole_months(params):
+            spend = MonthlySpend.objects.filter(user=request.user)
+            summary = summarize_rollup(filter_months(spend, params))
+        else:
+            summary = summarize(filter_range(self.get_queryset(), params))
+
+        serializer = self.get_serializer(summary)
+
+        return Response(serializer.data)
+
+
+class ExpenseExport(generics.GenericAPIView):
+    """
+    Streams a user's filtered expenses as CSV or NDJSON
+    """
+
+    fields = ("id", "title", "amount", "category", "incurred_on", "notes", "updated")
+    ordering = ExpenseCursorPagination.ordering
+    filter_backends = (ExpenseFilter,)
+    content_negotiation_class = ExportContentNegotiation
+    throttle_scope = "export"
+
+    def get_queryset(self):
+        user = self.request.user
+        return Expense.objects.filter(created_by=user)
+
+    def get(self, request, file_format):
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = ExpenseFilter().get_ordering(request, queryset, self)
+
+        return export_response(
+            request, queryset.order_by(*ordering), self.fields, file_format, "expenses"
+        )
+
+
+class ExpenseReceiptUpload(generics.GenericAPIView):
+    """
+    Issues a URL the client uploads a receipt of an expense to directly,
+    without the file passing through the API
+    """
+
+    serializer_class = ReceiptUploadSerializer
+    lookup_url_kwarg = "expense_id"
+
+    def get_queryset(self):
+        user = self.request.user
+        return Expense.objects.filter(created_by=user)
+
+    def post(self, request, expense_id):
+        expense = self.get_object()
+        params = ReceiptUploadRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        key = uploads.receipt_key(expense, params.validated_data["filename"])
+        upload = uploads.get_backend().presign(
+            request,
+            key,
+            params.validated_data["content_type"],
+            settings.EXPENSE_RECEIPT_MAX_SIZE,
+        )
+        serializer = self.get_serializer(
+            {
+                "key": key,
+                "expires_in": settings.EXPENSE_RECEIPT_UPLOAD_EXPIRES,
+                **upload,
+            }
+        )
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ExpenseReceipt(generics.GenericAPIView):
+    """
+    Attaches a receipt uploaded through ExpenseReceiptUpload to its expense
+    once the upload is confirmed
+    """
+
+    serializer_class = ExpenseSerializer
+    lookup_url_kwarg = "expense_id"
+
+    def get_queryset(self):
+        user = self.request.user
+        return Expense.objects.filter(created_by=user)
+
+    def put(self, request, expense_id):
+        expense = self.get_object()
+        params = ReceiptAttachSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        key = params.validated_data["key"]
+        if not uploads.is_receipt_key(expense, key):
+            raise ValidationError({"key": ["Not a receipt upload of this expense."]})
+
+        size = uploads.get_backend().uploaded_size(key)
+        if size is None:
+            raise ValidationError({"key": ["Upload not found."]})
+        if size > settings.EXPENSE_RECEIPT_MAX_SIZE:
+            raise ValidationError({"key": ["Upload is too large."]})
+
+        expense.file.name = key
+        expense.save(update_fields=("file", "updated"))
+
+        return Response(self.get_serializer(expense).data)
+
+
+class LocalReceiptUpload(APIView):
+    """
+    Receives receipt uploads for expense.uploads.LocalUploadBackend.
+
+    The signed token in the URL authorizes the upload, as a presigned URL
+    does for S3.
+    """
+
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+
+    def put(self, request, token):
+        try:
+            upload = uploads.load_upload_token(token)
+        except signing.BadSignature:
+            raise PermissionDenied("Invalid or expired upload URL.")
+
+        if request.content_type != upload["content_type"]:
+            raise ValidationError({"content_type": ["Does not match the upload URL."]})
+        body = request.body
+        if not 0 < len(body) <= upload["max_size"]:
+            raise ValidationError({"size": ["Not allowed by the upload URL."]})
+
+        uploads.LocalUploadBackend().storage.save(upload["key"], ContentFile(body))
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
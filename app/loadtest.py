@@ -0,0 +1,175 @@
+"""
+Load test of concurrent connections against one or more running servers.
+
+Each connection sends GET requests one after another for the given time,
+optionally waiting between them as real clients do, keeping the connection
+alive unless the server closes it. For each number of connections the
+requests per second, latency percentiles and failed requests of every
+server are printed, so the WSGI and ASGI services can be compared at equal
+worker and core counts:
+
+    python loadtest.py --email user@example.com --password ... \\
+        wsgi=http://localhost:8001 asgi=http://localhost:8002
+
+Raise THROTTLE_RATE_LIST on the servers first, as all requests are one
+user's.
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+
+def log_in(url, email, password):
+    """
+    Returns an access token of a user
+    """
+    request = Request(
+        f"{url}/api/log_in/",
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urlopen(request) as response:
+        return json.load(response)["access"]
+
+
+async def read_response(reader):
+    """
+    Reads a response, returning its status and whether the connection
+    stays open
+    """
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError("connection closed")
+    status = int(line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        return status, False
+
+    return status, headers.get("connection") != "close"
+
+
+async def connection(url, path, token, think, deadline, results):
+    """
+    Sends requests on one connection until the deadline, reconnecting when
+    the server closes it
+    """
+    host, port = url.hostname, url.port or 80
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Authorization: Bearer {token}\r\n\r\n"
+    ).encode()
+    reader = writer = None
+
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            if writer is not None:
+                try:
+                    writer.write(request)
+                    status, keep_alive = await read_response(reader)
+                except ConnectionResetError:
+                    # The server closed the idle connection; open a new one.
+                    writer.close()
+                    writer = None
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(request)
+                status, keep_alive = await asyncio.wait_for(
+                    read_response(reader), deadline - started + 10
+                )
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            results["errors"] += 1
+            keep_alive = False
+            await asyncio.sleep(0.1)
+        else:
+            if status == 200:
+                results["latencies"].append(time.monotonic() - started)
+            else:
+                results["errors"] += 1
+
+        if not keep_alive and writer is not None:
+            writer.close()
+            writer = None
+        await asyncio.sleep(think)
+
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, path, token, connections, think, duration):
+    results = {"latencies": [], "errors": 0}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(
+        *(
+            connection(url, path, token, think, deadline, results)
+            for _ in range(connections)
+        )
+    )
+    return results
+
+
+def percentile(latencies, fraction):
+    if not latencies:
+        return float("nan")
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("servers", nargs="+", metavar="NAME=URL")
+    parser.add_argument("--path", default="/api/expense/")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--connections", default="10,100,500,1000")
+    parser.add_argument(
+        "--think", type=float, default=0, help="seconds between requests"
+    )
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+
+    servers = [server.split("=", 1) for server in args.servers]
+    tokens = {name: log_in(url, args.email, args.password) for name, url in servers}
+
+    print("connections server    rps     p50 ms   p99 ms   errors")
+    for connections in map(int, args.connections.split(",")):
+        for name, url in servers:
+            results = asyncio.run(
+                run(
+                    urlsplit(url),
+                    args.path,
+                    tokens[name],
+                    connections,
+                    args.think,
+                    args.duration,
+                )
+            )
+            latencies = results["latencies"]
+            print(
+                f"{connections:<11} {name:<9} {len(latencies) / args.duration:<7.0f} "
+                f"{percentile(latencies, 0.5) * 1000:<8.1f} "
+                f"{percentile(latencies, 0.99) * 1000:<8.1f} {results['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
-from .models import Subscription
+from .models import OutboxEmail, Subscription
 
 admin.site.register(Subscription)
+admin.site.register(OutboxEmail)
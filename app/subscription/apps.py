@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SubscriptionConfig(AppConfig):
     name = "subscription"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,39 @@
+from rest_framework import serializers
+
+
+class SubscriptionQuerySerializer(serializers.Serializer):
+    """ Validate subscription renewal date and cycle query parameters """
+
+    start_date_after = serializers.DateField(required=False)
+    start_date_before = serializers.DateField(required=False)
+    renewal_cycle_days = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+
+    def validate(self, data):
+        unknown = set(self.initial_data) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unsupported query parameters: {', '.join(sorted(unknown))}."
+            )
+
+        after = data.get("start_date_after")
+        before = data.get("start_date_before")
+        if after and before and after > before:
+            raise serializers.ValidationError(
+                "start_date_after must not be later than start_date_before."
+            )
+        return data
+
+
+def filter_subscriptions(queryset, params):
+    """
+    Applies validated renewal date and cycle parameters to subscriptions
+    """
+    if "start_date_after" in params:
+        queryset = queryset.filter(start_date__gte=params["start_date_after"])
+    if "start_date_before" in params:
+        queryset = queryset.filter(start_date__lte=params["start_date_before"])
+    if "renewal_cycle_days" in params:
+        queryset = queryset.filter(renewal_cycle_days__in=params["renewal_cycle_days"])
+    return queryset
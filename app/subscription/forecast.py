@@ -0,0 +1,80 @@
+from datetime import date
+
+
+def add_months(day, months):
+    """
+    Returns the first day of the month `months` after `day`'s month
+    """
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def charges_before(start_date, cycle_days, day):
+    """
+    Returns how many renewals on start_date + k * cycle_days fall before day
+    """
+    if day <= start_date:
+        return 0
+    # Ceiling division: renewals k = 0 .. ceil((day - start) / cycle) - 1.
+    return -(-(day - start_date).days // cycle_days)
+
+
+def forecast(subscriptions, start, months):
+    """
+    Buckets subscription renewals from `start` to the end of the
+    `months`-th month by month and by subscription.
+
+    Each subscription renews on start_date + k * renewal_cycle_days. The
+    number of renewals inside a month is the difference of two closed-form
+    counts, so the work is O(subscriptions * months) regardless of how many
+    days the horizon spans.
+    """
+    boundaries = [start] + [
+        add_months(start, offset) for offset in range(1, months + 1)
+    ]
+    month_totals = [0] * months
+    month_counts = [0] * months
+    per_subscription = []
+
+    for sub in subscriptions:
+        counts = [
+            charges_before(sub.start_date, sub.renewal_cycle_days, boundary)
+            for boundary in boundaries
+        ]
+        monthly = []
+
+        for index in range(months):
+            charges = counts[index + 1] - counts[index]
+            month_counts[index] += charges
+            month_totals[index] += charges * sub.price
+            monthly.append(
+                {
+                    "month": boundaries[index].replace(day=1),
+                    "charges": charges,
+                    "total": charges * sub.price,
+                }
+            )
+
+        per_subscription.append(
+            {
+                "id": sub.id,
+                "title": sub.title,
+                "total": sum(month["total"] for month in monthly),
+                "months": monthly,
+            }
+        )
+
+    return {
+        "start": start,
+        "end": boundaries[-1],
+        "total": sum(month_totals),
+        "by_month": [
+            {
+                "month": boundaries[index].replace(day=1),
+                "charges": month_counts[index],
+                "total": total,
+            }
+            for index, total in enumerate(month_totals)
+        ],
+        "by_subscription": per_subscription,
+    }
@@ -0,0 +1,57 @@
+from django.db.models import DateField, F, Func, IntegerField, Value
+
+
+class AddDays(Func):
+    """
+    Adds a number of days, given as an integer expression, to a date
+    """
+
+    arg_joiner = " + "
+    template = "(%(expressions)s)"
+    output_field = DateField()
+
+    def __init__(self, date, days, **extra):
+        super().__init__(date, days, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        date, days = self.get_source_expressions()
+        date_sql, date_params = compiler.compile(date)
+        days_sql, days_params = compiler.compile(days)
+
+        sql = f"date({date_sql}, '+' || ({days_sql}) || ' days')"
+        return sql, (*date_params, *days_params)
+
+
+class DaysBetween(Func):
+    """
+    Whole days from a start date to an end date
+    """
+
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def __init__(self, start, end, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        end, start = self.get_source_expressions()
+        end_sql, end_params = compiler.compile(end)
+        start_sql, start_params = compiler.compile(start)
+
+        sql = f"CAST(julianday({end_sql}) - julianday({start_sql}) AS INTEGER)"
+        return sql, (*end_params, *start_params)
+
+
+def next_renewal_after(day):
+    """
+    Returns the first renewal date of a subscription later than `day`.
+
+    Only valid for subscriptions with start_date on or before `day`: the
+    renewals start_date + k * renewal_cycle_days that were skipped are
+    jumped in one step instead of one cycle at a time.
+    """
+    cycle = F("renewal_cycle_days")
+    elapsed = DaysBetween(F("start_date"), Value(day, output_field=DateField()))
+
+    return AddDays(F("start_date"), cycle * (elapsed / cycle + 1))
@@ -1,71 +1,66 @@
-from datetime import timedelta, datetime
-
-from django.core.mail import send_mail
 from django.core.management import BaseCommand
+from django.utils import timezone
 
+from app.tasks import USERS_PER_CHUNK
+from subscription import outbox, reminders
 from subscription.models import Subscription
 
 
 class Command(BaseCommand):
     help = "Send subscription reminder"
 
-    def check_subscriptions(self, upcoming_subscriptions):
-        """
-        Checks and maps upcoming subscriptions by user
-        """
-        subscriptions = {}
-
-        for sub in upcoming_subscriptions:
-            subscriptions[sub.created_by.email] = (
-                subscriptions.get(sub.created_by.email, "")
-                + f"Your {sub.title} will be renewed on {sub.start_date} \n"
-            )
-
-        return subscriptions
-
-    def update_subscription_date(self, upcoming_subscriptions):
-        """
-        Updates subscription date for subscriptions that are two days away
-        """
-        for sub in upcoming_subscriptions:
-            next_renew_date = sub.start_date + timedelta(days=sub.renewal_cycle_days)
-            sub.start_date = next_renew_date
-
-            sub.save()
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of subscriptions fetched per database round trip",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of users whose reminders are queued per batch",
+        )
+        parser.add_argument(
+            "--catch-up",
+            action="store_true",
+            help="Process every renewal due since the last run, not just today's",
+        )
+        parser.add_argument(
+            "--queue-only",
+            action="store_true",
+            help="Queue reminders in the outbox and leave sending to the sender",
+        )
 
     def handle(self, *args, **options):
         """
         Sends email to each user with upcoming subscription payments
         """
+        catch_up = options["catch_up"]
+        date_now = timezone.localdate()
+        last_run = reminders.last_processed(date_now, catch_up)
+
+        # One transaction per range of users, as the task sends them.
+        for first_user, last_user in reminders.due_user_ranges(
+            date_now, USERS_PER_CHUNK
+        ):
+            reminders.process_reminders(
+                Subscription.objects.filter(
+                    created_by__gte=first_user, created_by__lte=last_user
+                ),
+                date_now,
+                last_run,
+                catch_up,
+                options["chunk_size"],
+                options["batch_size"],
+            )
 
-        date_now = datetime.now()
-        date_one_week = date_now + timedelta(weeks=1)
-        date_two_days = date_now + timedelta(days=2)
-        subscriptions_week_away = Subscription.objects.filter(start_date=date_one_week)
-        subscriptions_two_days_away = Subscription.objects.filter(
-            start_date=date_two_days
-        )
-
-        subs_week_away = self.check_subscriptions(subscriptions_week_away)
-
-        for email in subs_week_away.keys():
-            message = "Upcoming payment dates: \n" + subs_week_away[email]
-
-            subject = "Upcoming subscription renewals in one week!"
-
-            send_mail(subject, message, "noreply@email.com", [email])
-
-            self.stdout.write("E-mail Report was sent.")
-
-        subs_two_days_away = self.check_subscriptions(subscriptions_two_days_away)
-
-        self.update_subscription_date(subscriptions_two_days_away)
-
-        for email in subs_two_days_away.keys():
-            message = "Upcoming payment dates: \n" + subs_two_days_away[email]
-
-            subject = "REMINDER!!! Upcoming subscription renewals in two days!"
+        if catch_up:
+            reminders.mark_processed(date_now)
 
-            send_mail(subject, message, "noreply@email.com", [email])
+        if options["queue_only"]:
+            return
 
+        for _ in range(outbox.drain()["sent"]):
             self.stdout.write("E-mail Report was sent.")
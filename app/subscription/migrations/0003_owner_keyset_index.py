@@ -0,0 +1,17 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscription', '0002_auto_20200505_2339'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['created_by', 'start_date', 'id'], name='subscription_owner_start_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.0.5 on 2026-10-18 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscription', '0003_owner_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['start_date'], name='subscription_start_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Subscription(models.Model):
@@ -21,5 +22,82 @@ class Subscription(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Backs the (start_date, id) keyset pagination of SubscriptionList;
+            # its (created_by, start_date) prefix serves per-owner date lookups.
+            models.Index(
+                fields=["created_by", "start_date", "id"],
+                name="subscription_owner_start_idx",
+            ),
+            # Reminder job looks subscriptions up by renewal date across owners.
+            models.Index(fields=["start_date"], name="subscription_start_idx"),
+            # Backs delta sync: changes of an owner since a watermark.
+            models.Index(
+                fields=["created_by", "updated"], name="subscription_owner_updated_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title}"
+
+
+class ReminderWatermark(models.Model):
+    """
+    Last date a reminder job has processed renewals for.
+    """
+
+    job = models.CharField(max_length=50, unique=True)
+    processed_on = models.DateField()
+
+    def __str__(self):
+        return f"{self.job} through {self.processed_on}"
+
+
+class ReminderDelivery(models.Model):
+    """
+    Idempotency key of a reminder e-mail queued for a user and renewal date.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10)
+    renewal_date = models.DateField(db_index=True)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("user", "kind", "renewal_date")
+
+    def __str__(self):
+        return f"{self.kind} reminder for {self.renewal_date}"
+
+
+class OutboxEmail(models.Model):
+    """
+    E-mail queued for delivery by the outbox sender.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = ((PENDING, "Pending"), (SENT, "Sent"), (FAILED, "Failed"))
+
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.EmailField(max_length=254)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    send_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Sender claims due e-mails in next_attempt_at order.
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to}"
@@ -0,0 +1,221 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min
+from django.utils import timezone
+
+from app.throttling import get_store
+
+from .models import OutboxEmail
+
+
+class RateLimiter:
+    """
+    Spaces calls to wait() at least 1 / rate seconds apart across threads
+    and processes, reserving slots in the throttle store.
+
+    A rate of 0 disables the limit.
+    """
+
+    key = "throttle:email-outbox"
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        time.sleep(max(0, get_store().reserve(self.key, self.interval, time.time())))
+
+
+def enqueue(messages):
+    """
+    Adds (subject, body, from_email, to) messages to the outbox in bulk
+    """
+    return OutboxEmail.objects.bulk_create(
+        OutboxEmail(subject=subject, body=body, from_email=from_email, to=to)
+        for subject, body, from_email, to in messages
+    )
+
+
+def claim(batch_size, lease):
+    """
+    Claims up to batch_size due e-mails for `lease`.
+
+    Claimed e-mails are not due again until the lease expires, so a sender
+    that dies mid-batch has its e-mails retried instead of lost, and
+    concurrent senders skip each other's rows.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            attempts=F("attempts") + 1, next_attempt_at=now + lease
+        )
+
+    for email in emails:
+        email.attempts += 1
+
+    return emails
+
+
+def renew(emails, lease):
+    """
+    Extends the lease of claimed e-mails not recorded yet
+    """
+    OutboxEmail.objects.filter(
+        id__in=[email.id for email in emails], status=OutboxEmail.PENDING
+    ).update(next_attempt_at=timezone.now() + lease)
+
+
+def send_slice(emails, limiter):
+    """
+    Sends e-mails over one connection, returning (email, error, seconds)
+    """
+    results = []
+
+    with get_connection() as connection:
+        for email in emails:
+            limiter.wait()
+            started = time.monotonic()
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                [email.to],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                results.append((email, exc, time.monotonic() - started))
+            else:
+                results.append((email, None, time.monotonic() - started))
+
+    return results
+
+
+def record(results, max_attempts, retry_delay):
+    """
+    Marks sent e-mails and schedules failed ones with exponential backoff
+    """
+    now = timezone.now()
+    stats = {"sent": 0, "retried": 0, "failed": 0}
+
+    for email, error, seconds in results:
+        if error is None:
+            email.status = OutboxEmail.SENT
+            email.sent_at = now
+            email.send_ms = round(seconds * 1000)
+            email.last_error = ""
+            stats["sent"] += 1
+        elif email.attempts >= max_attempts:
+            email.status = OutboxEmail.FAILED
+            email.last_error = str(error)
+            stats["failed"] += 1
+        else:
+            email.next_attempt_at = now + retry_delay * 2 ** (email.attempts - 1)
+            email.last_error = str(error)
+            stats["retried"] += 1
+
+    OutboxEmail.objects.bulk_update(
+        [email for email, _, _ in results],
+        ["status", "sent_at", "send_ms", "next_attempt_at", "last_error"],
+    )
+
+    return stats
+
+
+def drain(
+    batch_size=None,
+    concurrency=None,
+    rate_limit=None,
+    max_attempts=None,
+    retry_delay=None,
+    max_batches=None,
+):
+    """
+    Sends due outbox e-mails in batches until none are left.
+
+    Each batch is split across `concurrency` threads holding one mail
+    connection each, all paced by a rate limit shared with other senders.
+    The batch's lease is renewed while it is sent, so a slow mail server
+    does not let another sender claim and send it again. Settings provide
+    the defaults. Returns the number of e-mails sent, retried and failed.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    concurrency = concurrency or settings.EMAIL_OUTBOX_CONCURRENCY
+    if rate_limit is None:
+        rate_limit = settings.EMAIL_OUTBOX_RATE_LIMIT
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    retry_delay = retry_delay or timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY)
+
+    limiter = RateLimiter(rate_limit)
+    # Claims are renewed while sending, so they only outlive a dead sender.
+    lease = retry_delay
+    totals = {"sent": 0, "retried": 0, "failed": 0}
+    batches = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while max_batches is None or batches < max_batches:
+            emails = claim(batch_size, lease)
+            if not emails:
+                break
+
+            slices = [emails[index::concurrency] for index in range(concurrency)]
+            sending = [
+                pool.submit(send_slice, emails_slice, limiter)
+                for emails_slice in slices
+                if emails_slice
+            ]
+            # Renew the claim well before it runs out, until every slice is sent.
+            while wait(sending, timeout=lease.total_seconds() / 3).not_done:
+                renew(emails, lease)
+            results = [result for sent in sending for result in sent.result()]
+            for key, count in record(results, max_attempts, retry_delay).items():
+                totals[key] += count
+            batches += 1
+
+    return totals
+
+
+def prune(before):
+    """
+    Deletes e-mails sent before the given time
+    """
+    return OutboxEmail.objects.filter(
+        status=OutboxEmail.SENT, sent_at__lt=before
+    ).delete()
+
+
+def metrics(window=timedelta(hours=1)):
+    """
+    Returns outbox queue depth and the send latency of the recent window
+    """
+    now = timezone.now()
+    pending = OutboxEmail.objects.filter(status=OutboxEmail.PENDING)
+    oldest = pending.aggregate(oldest=Min("created_at"))["oldest"]
+    recent = OutboxEmail.objects.filter(
+        status=OutboxEmail.SENT, sent_at__gte=now - window
+    ).aggregate(
+        avg_send_ms=Avg("send_ms"),
+        max_send_ms=Max("send_ms"),
+        sent_in_window=Count("id"),
+    )
+
+    return {
+        "pending": pending.count(),
+        "failed": OutboxEmail.objects.filter(status=OutboxEmail.FAILED).count(),
+        "oldest_pending_seconds": (now - oldest).total_seconds() if oldest else 0,
+        **recent,
+    }
@@ -0,0 +1,247 @@
+from datetime import timedelta
+from itertools import groupby, islice
+from operator import itemgetter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from app import caching
+
+from . import outbox
+from .functions import next_renewal_after
+from .models import ReminderDelivery, ReminderWatermark, Subscription
+
+WEEK_AWAY = "week"
+TWO_DAYS_AWAY = "two_days"
+SUBJECTS = {
+    WEEK_AWAY: "Upcoming subscription renewals in one week!",
+    TWO_DAYS_AWAY: "REMINDER!!! Upcoming subscription renewals in two days!",
+}
+WATERMARK_JOB = "email_reminder"
+
+
+def render_reminder(renewals):
+    """
+    Renders one reminder from (title, start_date) renewals
+    """
+    return "Upcoming payment dates: \n" + "".join(
+        f"Your {title} will be renewed on {start_date} \n"
+        for title, start_date in renewals
+    )
+
+
+def last_processed(today, catch_up):
+    """
+    Returns the last date reminders were processed for.
+
+    Without catch-up, or before the first catch-up run, the job behaves as
+    if yesterday was processed.
+    """
+    if catch_up:
+        watermark = ReminderWatermark.objects.filter(job=WATERMARK_JOB).first()
+        if watermark is not None:
+            return watermark.processed_on
+    return today - timedelta(days=1)
+
+
+def mark_processed(today):
+    """
+    Moves the watermark to today and forgets deliveries it makes obsolete
+    """
+    ReminderWatermark.objects.update_or_create(
+        job=WATERMARK_JOB, defaults={"processed_on": today}
+    )
+    ReminderDelivery.objects.filter(renewal_date__lt=today).delete()
+
+
+def renewal_windows(last_run, today):
+    """
+    Returns the (after, until] renewal date window of each reminder kind.
+
+    Renewals entering the two-day window since the last run get the two-day
+    reminder; those entering only the one-week window get the one-week one.
+    """
+    two_days = today + timedelta(days=2)
+
+    return {
+        WEEK_AWAY: (
+            max(last_run + timedelta(weeks=1), two_days),
+            today + timedelta(weeks=1),
+        ),
+        TWO_DAYS_AWAY: (last_run + timedelta(days=2), two_days),
+    }
+
+
+def renewing_between(subscriptions, after, until):
+    return subscriptions.filter(start_date__gt=after, start_date__lte=until)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def renewal_rows(subscriptions):
+    """
+    Returns (user_id, email, title, start_date) rows of renewals, joined to
+    the owner and ordered by owner, so each user's renewals are adjacent
+    """
+    return subscriptions.order_by("created_by_id", "start_date", "id").values_list(
+        "created_by_id", "created_by__email", "title", "start_date"
+    )
+
+
+def user_renewals(subscriptions, chunk_size):
+    """
+    Streams (user_id, email, [(title, start_date), ...]) per user from a
+    single query
+    """
+    rows = renewal_rows(subscriptions).iterator(chunk_size=chunk_size)
+
+    for (user_id, email), renewals in groupby(rows, key=itemgetter(0, 1)):
+        yield user_id, email, [(title, day) for _, _, title, day in renewals]
+
+
+def enqueue_reminders(subscriptions, kind, window, chunk_size=2000, batch_size=500):
+    """
+    Queues one `kind` reminder per user for renewals in the window.
+
+    Work happens in batches of users: each batch locks its users, looks up
+    which (user, renewal date) reminders were already queued, writes the
+    rest to the outbox and records them. A retried run therefore only
+    queues what a failed batch did not, and an overlapping run waits for
+    this one's transaction and then finds its deliveries. Returns the
+    number of e-mails queued.
+    """
+    queued = 0
+    renewals = user_renewals(renewing_between(subscriptions, *window), chunk_size)
+
+    for batch in batched(renewals, batch_size):
+        user_ids = [user_id for user_id, _, _ in batch]
+        # Held until the run commits; ordered so runs cannot deadlock.
+        list(
+            get_user_model()
+            .objects.select_for_update()
+            .filter(id__in=user_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        delivered = set(
+            ReminderDelivery.objects.filter(
+                user_id__in=user_ids,
+                kind=kind,
+                renewal_date__gt=window[0],
+                renewal_date__lte=window[1],
+            ).values_list("user_id", "renewal_date")
+        )
+        messages = []
+        deliveries = []
+
+        for user_id, email, renewals_due in batch:
+            pending = [
+                (title, day)
+                for title, day in renewals_due
+                if (user_id, day) not in delivered
+            ]
+            if not pending:
+                continue
+
+            messages.append(
+                (
+                    SUBJECTS[kind],
+                    render_reminder(pending),
+                    settings.DEFAULT_FROM_EMAIL,
+                    email,
+                )
+            )
+            deliveries.extend(
+                ReminderDelivery(user_id=user_id, kind=kind, renewal_date=day)
+                for day in {day for _, day in pending}
+            )
+
+        if messages:
+            queued += len(outbox.enqueue(messages))
+            ReminderDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+
+    return queued
+
+
+def advance_renewals(subscriptions, date, batch_size=500):
+    """
+    Moves subscriptions renewing on or before the given date to their first
+    renewal date after it, with one UPDATE per batch of owners
+    """
+    subscriptions = subscriptions.filter(start_date__lte=date)
+    owners = (
+        subscriptions.order_by("created_by_id")
+        .values_list("created_by_id", flat=True)
+        .distinct()
+    )
+    advanced = 0
+    batch = list(owners[:batch_size])
+
+    while batch:
+        advanced += subscriptions.filter(created_by_id__in=batch).update(
+            start_date=next_renewal_after(date), updated=timezone.now()
+        )
+        # Queryset updates send no signals; invalidate the owners' responses.
+        caching.bump_versions(batch)
+        # Advanced subscriptions no longer match, so the next owners are first.
+        batch = list(owners[:batch_size]) if len(batch) == batch_size else []
+
+    return advanced
+
+
+@transaction.atomic
+def process_reminders(subscriptions, today, last_run, catch_up, chunk_size, batch_size):
+    """
+    Queues the reminders due for `subscriptions` and advances their renewals.
+
+    Both happen in one transaction, so a crash cannot advance a renewal
+    without its reminder being queued; pass the users of one range of
+    due_user_ranges at a time to keep it short. Returns the number of
+    e-mails queued.
+    """
+    windows = renewal_windows(last_run, today)
+    queued = 0
+
+    for kind in (WEEK_AWAY, TWO_DAYS_AWAY):
+        queued += enqueue_reminders(
+            subscriptions, kind, windows[kind], chunk_size, batch_size
+        )
+
+    two_days = windows[TWO_DAYS_AWAY][1]
+    if catch_up:
+        # Subscriptions any number of cycles behind jump straight to their
+        # next renewal after the two-day window.
+        advance_renewals(subscriptions, two_days, batch_size)
+    else:
+        advance_renewals(
+            renewing_between(subscriptions, *windows[TWO_DAYS_AWAY]),
+            two_days,
+            batch_size,
+        )
+
+    return queued
+
+
+def due_user_ranges(today, users_per_chunk):
+    """
+    Partitions users with a renewal due within a week into id ranges of at
+    most `users_per_chunk` users
+    """
+    user_ids = (
+        Subscription.objects.filter(start_date__lte=today + timedelta(weeks=1))
+        .order_by("created_by_id")
+        .values_list("created_by_id", flat=True)
+        .distinct()
+        .iterator()
+    )
+
+    for chunk in batched(user_ids, users_per_chunk):
+        yield chunk[0], chunk[-1]
@@ -11,3 +11,42 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subscription
         fields = ("title", "price", "start_date", "renewal_cycle_days")
+
+
+class ForecastQuerySerializer(serializers.Serializer):
+    """ Validate forecast query parameters """
+
+    start = serializers.DateField(required=False)
+    months = serializers.IntegerField(min_value=1, max_value=120, default=12)
+
+
+class ChargesSerializer(serializers.Serializer):
+    month = serializers.DateField(format="%Y-%m")
+    charges = serializers.IntegerField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class SubscriptionForecastSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    months = ChargesSerializer(many=True)
+
+
+class ForecastSerializer(serializers.Serializer):
+    """ Serialize projected subscription charges """
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    by_month = ChargesSerializer(many=True)
+    by_subscription = SubscriptionForecastSerializer(many=True)
+
+
+class OutboxMetricsSerializer(serializers.Serializer):
+    pending = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    oldest_pending_seconds = serializers.FloatField()
+    sent_in_window = serializers.IntegerField()
+    avg_send_ms = serializers.FloatField(allow_null=True)
+    max_send_ms = serializers.IntegerField(allow_null=True)
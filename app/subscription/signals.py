@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app import caching
+
+from .models import Subscription
+
+
+@receiver(post_save, sender=Subscription)
+def invalidate_responses(sender, instance, raw=False, **kwargs):
+    if not raw:
+        caching.bump_versions([instance.created_by_id])
+
+
+@receiver(post_delete, sender=Subscription)
+def invalidate_deleted(sender, instance, **kwargs):
+    caching.bump_versions([instance.created_by_id])
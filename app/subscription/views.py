@@ -1,18 +1,32 @@
-from rest_framework import generics
+from django.utils import timezone
+from rest_framework import generics, permissions
+from rest_framework.response import Response
 
+from app.caching import CachedResponseMixin
+from app.export import ExportContentNegotiation, export_response
+from app.pagination import SubscriptionCursorPagination
 from app.permissions import IsCreator
 
+from . import outbox
+from .filters import SubscriptionQuerySerializer, filter_subscriptions
+from .forecast import forecast
 from .models import Subscription
-from .serializers import SubscriptionSerializer
+from .serializers import (
+    ForecastQuerySerializer,
+    ForecastSerializer,
+    OutboxMetricsSerializer,
+    SubscriptionSerializer,
+)
 
 
-class SubscriptionList(generics.ListCreateAPIView):
+class SubscriptionList(CachedResponseMixin, generics.ListCreateAPIView):
     """
     Lists and creates subscriptions.
     """
 
     serializer_class = SubscriptionSerializer
     permission_classes = (IsCreator,)
+    pagination_class = SubscriptionCursorPagination
 
     # Ensure a user sees only own Subscription objects.
     def get_queryset(self):
@@ -24,12 +38,80 @@ class SubscriptionList(generics.ListCreateAPIView):
         serializer.save(created_by=self.request.user)
 
 
-class SubscriptionDetail(generics.RetrieveUpdateDestroyAPIView):
+class SubscriptionDetail(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Returns a single subscription and allows updates and deletion of a subscription
     """
 
-    queryset = Subscription.objects.all()
     serializer_class = SubscriptionSerializer
     permission_classes = (IsCreator,)
     lookup_url_kwarg = "subscription_id"
+
+    # Look subscriptions up among the user's own, so others' are a 404.
+    def get_queryset(self):
+        user = self.request.user
+        return Subscription.objects.filter(created_by=user)
+
+
+class SubscriptionForecast(generics.GenericAPIView):
+    """
+    Projects a user's subscription charges per month over a horizon
+    """
+
+    serializer_class = ForecastSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        return Subscription.objects.filter(created_by=user).only(
+            "id", "title", "price", "start_date", "renewal_cycle_days"
+        )
+
+    def get(self, request):
+        params = ForecastQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        start = params.validated_data.get("start", timezone.now().date())
+        months = params.validated_data["months"]
+        serializer = self.get_serializer(forecast(self.get_queryset(), start, months))
+
+        return Response(serializer.data)
+
+
+class OutboxMetrics(generics.GenericAPIView):
+    """
+    Reports the reminder e-mail outbox queue depth and send latency
+    """
+
+    serializer_class = OutboxMetricsSerializer
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return Response(self.get_serializer(outbox.metrics()).data)
+
+
+class SubscriptionExport(generics.GenericAPIView):
+    """
+    Streams a user's filtered subscriptions as CSV or NDJSON
+    """
+
+    fields = ("id", "title", "price", "start_date", "renewal_cycle_days", "updated")
+    content_negotiation_class = ExportContentNegotiation
+    throttle_scope = "export"
+
+    def get_queryset(self):
+        user = self.request.user
+        return Subscription.objects.filter(created_by=user)
+
+    def get(self, request, file_format):
+        params = SubscriptionQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        queryset = filter_subscriptions(self.get_queryset(), params.validated_data)
+
+        return export_response(
+            request,
+            queryset.order_by(*SubscriptionCursorPagination.ordering),
+            self.fields,
+            file_format,
+            "subscriptions",
+        )
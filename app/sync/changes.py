@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from app.pagination import keyset_after
+from expense.models import Expense
+from subscription.models import Subscription
+
+from .models import Tombstone
+
+KINDS = ("expenses", "subscriptions")
+CURSOR_SALT = "sync.changes"
+
+
+def retained_since():
+    """
+    Returns the time before which tombstones may have been pruned
+    """
+    return timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def load_cursor(token):
+    """
+    Returns the state a `next` cursor continues from, raising
+    signing.BadSignature if it is invalid
+    """
+    return signing.loads(token, salt=CURSOR_SALT)
+
+
+def changed(user, since=None):
+    """
+    Returns a user's expenses and subscriptions saved since a time, or all
+    of them, by kind
+    """
+    querysets = {
+        "expenses": Expense.objects.filter(created_by=user).select_related("receipt"),
+        "subscriptions": Subscription.objects.filter(created_by=user),
+    }
+    if since is None:
+        return querysets
+    return {
+        kind: queryset.filter(updated__gte=since)
+        for kind, queryset in querysets.items()
+    }
+
+
+def following(queryset, position):
+    """
+    Returns the rows of a queryset after an (updated, id) position, or all
+    of them, in that order
+    """
+    if position:
+        updated, pk = position
+        queryset = queryset.filter(
+            keyset_after(("updated", "id"), (parse_datetime(updated), pk))
+        )
+    return queryset.order_by("updated", "id")
+
+
+def page_of(queryset, position, page_size):
+    """
+    Returns the rows following an (updated, id) position, at most
+    page_size, and the position after them, None once no rows are left
+    """
+    rows = list(following(queryset, position)[: page_size + 1])
+
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, (rows[-1].updated.isoformat(), rows[-1].id)
+
+
+def changes_since(user, since=None, cursor=None, page_size=None):
+    """
+    Returns a user's expenses and subscriptions saved since a watermark,
+    the ids of those deleted since and the watermark of the next sync.
+
+    The new watermark trails the clock by SYNC_WATERMARK_LAG, so rows saved
+    by transactions still open now are picked up next time; clients apply
+    changes by id, so seeing one twice is harmless. Without a watermark, or
+    with one older than the tombstones kept, everything is returned and
+    `reset` tells the client to drop what it has.
+
+    Objects come at most SYNC_PAGE_SIZE of each kind at a time, in (updated,
+    id) order. When more are left, `next` is a cursor returning them with
+    the same watermark; deletions and `reset` come with the first page.
+    """
+    page_size = page_size or settings.SYNC_PAGE_SIZE
+    deleted = {Tombstone.EXPENSE: [], Tombstone.SUBSCRIPTION: []}
+
+    if cursor is None:
+        now = timezone.now()
+        watermark = now - timedelta(seconds=settings.SYNC_WATERMARK_LAG)
+        reset = since is None or since < retained_since()
+        positions = {kind: () for kind in KINDS}
+        if not reset:
+            tombstones = Tombstone.objects.filter(
+                user_id=user.pk, deleted__gte=since
+            ).values_list("kind", "object_id")
+            for kind, object_id in tombstones:
+                deleted[kind].append(object_id)
+            # Never move a client's watermark backwards.
+            watermark = max(watermark, since)
+    else:
+        since = cursor["since"] and parse_datetime(cursor["since"])
+        watermark = parse_datetime(cursor["watermark"])
+        reset = cursor["reset"]
+        positions = cursor["positions"]
+
+    changes = {}
+    for kind, queryset in changed(user, None if reset else since).items():
+        if positions[kind] is None:
+            changes[kind] = []
+            continue
+        changes[kind], positions[kind] = page_of(queryset, positions[kind], page_size)
+
+    cursor_next = None
+    if any(position is not None for position in positions.values()):
+        cursor_next = signing.dumps(
+            {
+                "since": since and since.isoformat(),
+                "watermark": watermark.isoformat(),
+                "reset": reset,
+                "positions": positions,
+            },
+            salt=CURSOR_SALT,
+        )
+
+    return {
+        "watermark": watermark,
+        "reset": reset and cursor is None,
+        "next": cursor_next,
+        **changes,
+        "deleted": {
+            "expenses": deleted[Tombstone.EXPENSE],
+            "subscriptions": deleted[Tombstone.SUBSCRIPTION],
+        },
+    }
+
+
+def prune(before):
+    """
+    Deletes tombstones recorded before the given time
+    """
+    return Tombstone.objects.filter(deleted__lt=before).delete()
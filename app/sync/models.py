@@ -0,0 +1,31 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of a user's expense or subscription for delta sync
+    """
+
+    EXPENSE = "expense"
+    SUBSCRIPTION = "subscription"
+    KINDS = ((EXPENSE, "Expense"), (SUBSCRIPTION, "Subscription"))
+
+    # Not a foreign key: deleting a user cascades to their expenses, whose
+    # tombstones would otherwise point at the user being deleted.
+    user_id = models.IntegerField()
+    kind = models.CharField(max_length=20, choices=KINDS)
+    object_id = models.IntegerField()
+    deleted = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user_id", "deleted"], name="tombstone_user_deleted_idx"
+            ),
+            # Pruning removes tombstones older than the retention period.
+            models.Index(fields=["deleted"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
@@ -0,0 +1,46 @@
+from django.core import signing
+from rest_framework import serializers
+
+from expense.serializers import ExpenseSerializer
+from subscription.serializers import SubscriptionSerializer
+
+from .changes import load_cursor
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    """ Validate the watermark or the cursor of a delta sync """
+
+    since = serializers.DateTimeField(required=False)
+    cursor = serializers.CharField(required=False)
+
+    def validate_cursor(self, value):
+        try:
+            return load_cursor(value)
+        except signing.BadSignature:
+            raise serializers.ValidationError("Invalid cursor.")
+
+
+class SyncExpenseSerializer(ExpenseSerializer):
+    class Meta(ExpenseSerializer.Meta):
+        fields = ExpenseSerializer.Meta.fields + ("updated",)
+
+
+class SyncSubscriptionSerializer(SubscriptionSerializer):
+    class Meta(SubscriptionSerializer.Meta):
+        fields = ("id",) + SubscriptionSerializer.Meta.fields + ("updated",)
+
+
+class DeletedSerializer(serializers.Serializer):
+    expenses = serializers.ListField(child=serializers.IntegerField())
+    subscriptions = serializers.ListField(child=serializers.IntegerField())
+
+
+class SyncSerializer(serializers.Serializer):
+    """ Serialize the changes of a delta sync """
+
+    watermark = serializers.DateTimeField()
+    reset = serializers.BooleanField()
+    next = serializers.CharField(allow_null=True)
+    expenses = SyncExpenseSerializer(many=True)
+    subscriptions = SyncSubscriptionSerializer(many=True)
+    deleted = DeletedSerializer()
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from expense.models import Expense
+from expense.signals import expenses_deleted
+from subscription.models import Subscription
+
+from .models import Tombstone
+
+
+@receiver(post_delete, sender=Expense)
+def record_expense_deletion(sender, instance, **kwargs):
+    if getattr(instance, "_deleted_in_batch", False):
+        return
+    Tombstone.objects.create(
+        user_id=instance.created_by_id, kind=Tombstone.EXPENSE, object_id=instance.pk
+    )
+
+
+@receiver(expenses_deleted, sender=Expense)
+def record_expense_batch_deletion(sender, ids, expenses, **kwargs):
+    Tombstone.objects.bulk_create(
+        Tombstone(
+            user_id=expense.created_by_id, kind=Tombstone.EXPENSE, object_id=expense_id
+        )
+        for expense_id, expense in zip(ids, expenses)
+    )
+
+
+@receiver(post_delete, sender=Subscription)
+def record_subscription_deletion(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        user_id=instance.created_by_id,
+        kind=Tombstone.SUBSCRIPTION,
+        object_id=instance.pk,
+    )
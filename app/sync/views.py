@@ -0,0 +1,30 @@
+from rest_framework import generics
+from rest_framework.response import Response
+
+from .changes import changes_since
+from .serializers import SyncQuerySerializer, SyncSerializer
+
+
+class Sync(generics.GenericAPIView):
+    """
+    Returns a user's expenses and subscriptions changed since a watermark.
+
+    Pass the `watermark` of the previous response as `since`; deletions
+    come back as ids under `deleted`. While `next` is set, more changes are
+    left: pass it as `cursor` to get them.
+    """
+
+    serializer_class = SyncSerializer
+
+    def get(self, request):
+        params = SyncQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        changes = changes_since(
+            request.user,
+            params.validated_data.get("since"),
+            params.validated_data.get("cursor"),
+        )
+        serializer = self.get_serializer(changes)
+
+        return Response(serializer.data)
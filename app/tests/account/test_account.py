@@ -1,12 +1,19 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.reverse import reverse
 from rest_framework import status
 
 from expense.models import Expense
+from account.blacklist import get_blacklist
+from account.models import LazyTokenUser
 from account.serializers import UserSerializer
 
 import base64
 import json
+import time
 
 import pytest
 
@@ -89,6 +96,31 @@ class TestAuthentication:
         assert payload_data["email"] == user.email
         assert payload_data["first_name"] == user.first_name
         assert payload_data["last_name"] == user.last_name
+        assert payload_data["is_active"] is True
+
+    def test_log_in_rehashes_password(self, client, create_user, settings):
+        """
+        Test logging in upgrades a hash made by an older hasher or with
+        other costs to the current policy
+        """
+        user = create_user
+        user.password = make_password(PASSWORD, hasher="pbkdf2_sha256")
+        user.save()
+
+        client.post(reverse("log_in"), data={"email": user.email, "password": PASSWORD})
+        user.refresh_from_db()
+
+        assert user.password.startswith("argon2$")
+        assert f"m={settings.PASSWORD_ARGON2_MEMORY_COST}," in user.password
+
+        settings.PASSWORD_ARGON2_MEMORY_COST = 1024
+        previous = user.password
+        client.post(reverse("log_in"), data={"email": user.email, "password": PASSWORD})
+        user.refresh_from_db()
+
+        assert user.password != previous
+        assert "m=1024," in user.password
+        assert user.check_password(PASSWORD)
 
     def test_create_superuser(self, client):
         """
@@ -156,3 +188,129 @@ class TestAuthentication:
                 last_name="",
                 password=PASSWORD,
             )
+
+
+def bearer(client, user):
+    """
+    Logs a user in and returns the Authorization header of its access token
+    """
+    response = client.post(
+        reverse("log_in"), data={"email": user.email, "password": PASSWORD}
+    )
+    return f"Bearer {response.data['access']}"
+
+
+@pytest.mark.django_db
+class TestTokenAuthentication:
+    def test_token_user_not_loaded(self, client, create_user):
+        """
+        Test token requests only look the user up when its cached state
+        expired, and can still create objects owned by the user
+        """
+        user = create_user
+        auth = bearer(client, user)
+        client.get(reverse("expense"), HTTP_AUTHORIZATION=auth)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                reverse("expense"),
+                data={
+                    "title": "Lunch",
+                    "amount": "5.00",
+                    "category": "Lunch",
+                    "incurred_on": "2020-05-02",
+                },
+                HTTP_AUTHORIZATION=auth,
+            )
+
+        assert status.HTTP_201_CREATED == response.status_code
+        assert Expense.objects.get().created_by == user
+        assert all('FROM "account_customuser"' not in q["sql"] for q in context)
+
+    def test_token_user_loads_fields_once(self, create_user, django_assert_num_queries):
+        """
+        Test reading a field of a token user loads all its fields in one query
+        """
+        user = LazyTokenUser.from_claims(create_user.pk)
+
+        with django_assert_num_queries(1):
+            assert str(user) == str(create_user)
+            assert user.is_staff is False
+        assert user == create_user
+
+    def test_deactivated_user_refused(self, client, create_user):
+        """
+        Test tokens of users deactivated or deleted through the ORM are
+        refused at once, and otherwise once their cached state expires
+        """
+        user = create_user
+        auth = bearer(client, user)
+        assert (
+            client.get(reverse("expense"), HTTP_AUTHORIZATION=auth).status_code == 200
+        )
+
+        get_user_model().objects.filter(pk=user.pk).update(is_active=False)
+        assert (
+            client.get(reverse("expense"), HTTP_AUTHORIZATION=auth).status_code == 200
+        )
+        cache.clear()
+        assert (
+            client.get(reverse("expense"), HTTP_AUTHORIZATION=auth).status_code == 401
+        )
+
+        user.is_active = True
+        user.save()
+        assert (
+            client.get(reverse("expense"), HTTP_AUTHORIZATION=auth).status_code == 200
+        )
+        user.is_active = False
+        user.save()
+        assert (
+            client.get(reverse("expense"), HTTP_AUTHORIZATION=auth).status_code == 401
+        )
+
+        user.is_active = True
+        user.save()
+        client.get(reverse("expense"), HTTP_AUTHORIZATION=auth)
+        user.delete()
+        assert (
+            client.get(reverse("expense"), HTTP_AUTHORIZATION=auth).status_code == 401
+        )
+
+
+@pytest.mark.django_db
+class TestTokenRotation:
+    def test_rotated_refresh_token_refused(self, client, create_user):
+        """
+        Test a refresh token gives new tokens once and is refused after
+        """
+        user = create_user
+        refresh = client.post(
+            reverse("log_in"), data={"email": user.email, "password": PASSWORD}
+        ).data["refresh"]
+
+        response = client.post(reverse("token_refresh"), data={"refresh": refresh})
+        assert status.HTTP_200_OK == response.status_code
+        assert response.data["access"]
+        assert response.data["refresh"] != refresh
+
+        replayed = client.post(reverse("token_refresh"), data={"refresh": refresh})
+        assert status.HTTP_401_UNAUTHORIZED == replayed.status_code
+
+        rotated = client.post(
+            reverse("token_refresh"), data={"refresh": response.data["refresh"]}
+        )
+        assert status.HTTP_200_OK == rotated.status_code
+
+    def test_revoked_once(self):
+        """
+        Test a token is revoked once, its revocation being the only check
+        """
+        blacklist = get_blacklist()
+        exp = time.time() + 60
+
+        assert blacklist.revoke("revoked", exp) is True
+        assert blacklist.revoke("revoked", exp) is False
+        assert blacklist.revoke("other", exp) is True
+        # Expired tokens are refused before they reach the blacklist.
+        assert blacklist.revoke("expired", time.time() - 1) is True
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+
+from subscription.models import Subscription
+
+import os
+import time
+
+import pytest
+
+SUBSCRIPTIONS_PER_USER = 10
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run"
+)
+
+
+@pytest.fixture()
+def seed_subscriptions():
+    """
+    Seed subscriptions renewing in one week and in two days
+    """
+
+    def _seed_subscriptions(rows):
+        today = timezone.localdate()
+        renewal_dates = (today + timedelta(weeks=1), today + timedelta(days=2))
+
+        get_user_model().objects.bulk_create(
+            (
+                get_user_model()(
+                    email=f"user{num}@example.com", first_name="Test", last_name="User"
+                )
+                for num in range(rows // SUBSCRIPTIONS_PER_USER)
+            ),
+            batch_size=500,
+        )
+        user_ids = list(get_user_model().objects.values_list("id", flat=True))
+
+        Subscription.objects.bulk_create(
+            (
+                Subscription(
+                    title=f"Subscription {num}",
+                    price="9.99",
+                    start_date=renewal_dates[num % 2],
+                    renewal_cycle_days=30,
+                    created_by_id=user_ids[num // SUBSCRIPTIONS_PER_USER],
+                )
+                for num in range(rows)
+            ),
+            batch_size=500,
+        )
+
+    return _seed_subscriptions
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("rows", [10_000, 100_000, 1_000_000])
+def test_bench_email_reminder(settings, seed_subscriptions, record_property, rows):
+    """
+    Benchmark query count and wall time of the reminder job
+    """
+    settings.EMAIL_BACKEND = "django.core.mail.backends.dummy.EmailBackend"
+    seed_subscriptions(rows)
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        call_command("email_reminder", stdout=StringIO())
+        elapsed = time.perf_counter() - started
+
+    record_property("rows", rows)
+    record_property("queries", len(queries))
+    record_property("seconds", round(elapsed, 3))
+    print(f"email_reminder rows={rows} queries={len(queries)} seconds={elapsed:.3f}")
+
+    assert (
+        Subscription.objects.filter(start_date__lte=timezone.localdate()).count() == 0
+    )
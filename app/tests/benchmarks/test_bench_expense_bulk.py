@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from expense.models import Expense
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+import os
+import time
+
+import pytest
+
+EXPENSES = 1000
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run"
+)
+
+
+@pytest.fixture()
+def jwt_client():
+    """
+    Create a test user and an API client authenticated with its access token
+    """
+    user = get_user_model().objects.create_user(
+        email="user@example.com",
+        first_name="Test",
+        last_name="User",
+        password="pAssw0rd!",
+    )
+    client = APIClient()
+    response = client.post(
+        reverse("log_in"), data={"email": user.email, "password": "pAssw0rd!"}
+    )
+    client.credentials(HTTP_AUTHORIZATION="Bearer " + response.data["access"])
+
+    return client
+
+
+def expense(num):
+    return {
+        "title": f"Expense {num}",
+        "amount": "10.00",
+        "category": ("Dinner", "Lunch", "Travel")[num % 3],
+        "incurred_on": f"2020-{num % 12 + 1:02}-01",
+    }
+
+
+@pytest.mark.django_db
+def test_bench_single_posts(jwt_client, record_property):
+    """
+    Benchmark creating expenses with one POST each
+    """
+    started = time.perf_counter()
+    for num in range(EXPENSES):
+        resp = jwt_client.post(reverse("expense"), expense(num), format="json")
+        assert resp.status_code == 201
+    elapsed = time.perf_counter() - started
+
+    record_property("seconds", round(elapsed, 3))
+    print(f"single posts expenses={EXPENSES} seconds={elapsed:.3f}")
+
+    assert Expense.objects.count() == EXPENSES
+
+
+@pytest.mark.django_db
+def test_bench_batch_post(jwt_client, record_property):
+    """
+    Benchmark creating the same expenses with one batch POST
+    """
+    started = time.perf_counter()
+    resp = jwt_client.post(
+        reverse("expense_bulk"),
+        [expense(num) for num in range(EXPENSES)],
+        format="json",
+    )
+    elapsed = time.perf_counter() - started
+
+    record_property("seconds", round(elapsed, 3))
+    print(f"batch post expenses={EXPENSES} seconds={elapsed:.3f}")
+
+    assert resp.status_code == 201
+    assert Expense.objects.count() == EXPENSES
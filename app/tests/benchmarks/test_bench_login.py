@@ -0,0 +1,73 @@
+from account.serializers import LogInSerializer, UserSerializer
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+import os
+import time
+
+import pytest
+
+LOGINS = 50
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run"
+)
+
+
+def serialized_claims(cls, user):
+    """
+    Builds token claims the way login did before: serializing the user
+    """
+    token = TokenObtainPairSerializer.get_token.__func__(cls, user)
+    for key, value in UserSerializer(user).data.items():
+        if key != "id":
+            token[key] = value
+    return token
+
+
+def logins_per_second(user):
+    """
+    Returns the rate of sequential logins; the test client serves them in
+    this process, so it is the rate of one core
+    """
+    client = APIClient()
+    started = time.perf_counter()
+    for _ in range(LOGINS):
+        resp = client.post(
+            reverse("log_in"), {"email": user.email, "password": "pAssw0rd!"}
+        )
+        assert resp.status_code == 200
+    return LOGINS / (time.perf_counter() - started)
+
+
+@pytest.mark.django_db
+def test_bench_login(settings, monkeypatch, record_property):
+    """
+    Benchmark login throughput with PBKDF2 and serialized claims against
+    the current hashing policy and claim builder
+    """
+    hashers = settings.PASSWORD_HASHERS
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.PBKDF2PasswordHasher"]
+    monkeypatch.setattr(LogInSerializer, "get_token", classmethod(serialized_claims))
+    user = get_user_model().objects.create_user(
+        email="user@example.com",
+        first_name="Test",
+        last_name="User",
+        password="pAssw0rd!",
+    )
+    before = logins_per_second(user)
+
+    monkeypatch.undo()
+    settings.PASSWORD_HASHERS = hashers
+    user.set_password("pAssw0rd!")
+    user.save()
+    after = logins_per_second(user)
+
+    record_property("before_rps_per_core", round(before, 1))
+    record_property("after_rps_per_core", round(after, 1))
+    print(
+        f"login logins={LOGINS} before_rps_per_core={before:.1f} "
+        f"after_rps_per_core={after:.1f}"
+    )
@@ -0,0 +1,65 @@
+from account.blacklist import load_blacklist
+from app.throttling import load_store
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def unlimited_outbox(settings):
+    """
+    Send outbox e-mails without the production rate limit
+    """
+    settings.EMAIL_OUTBOX_RATE_LIMIT = 0
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """
+    Cache in process memory instead of Redis, emptied after each test
+    """
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def local_blacklist(settings):
+    """
+    Revoke tokens in process memory instead of Redis, forgotten after each
+    test
+    """
+    settings.JWT_BLACKLIST_BACKEND = "account.blacklist.LocalBlacklist"
+    yield
+    load_blacklist.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def local_throttle_store(settings):
+    """
+    Throttle in process memory instead of Redis, with full buckets for each
+    test
+    """
+    settings.THROTTLE_STORE = "app.throttling.LocalThrottleStore"
+    yield
+    load_store.cache_clear()
+
+
+@pytest.fixture()
+def api_client():
+    """
+    Authenticate as a test user without any queries per request
+    """
+    client = APIClient()
+    client.user = get_user_model().objects.create_user(
+        email="user@example.com",
+        first_name="Test",
+        last_name="User",
+        password="pAssw0rd!",
+    )
+    client.force_authenticate(client.user)
+    return client
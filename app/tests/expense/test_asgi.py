@@ -0,0 +1,119 @@
+import asyncio
+import threading
+
+from app.asgi import application
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+from django.core.signals import request_finished, request_started
+from expense.models import Expense
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+import pytest
+
+
+@pytest.fixture()
+def token():
+    """
+    Create a test user with an expense and return an access token of theirs
+    """
+    user = get_user_model().objects.create_user(
+        email="user@example.com",
+        first_name="Test",
+        last_name="User",
+        password="pAssw0rd!",
+    )
+    Expense.objects.create(
+        title="Chipotle",
+        amount="9.99",
+        category="Dinner",
+        incurred_on="2020-05-02",
+        created_by=user,
+    )
+    return str(AccessToken.for_user(user))
+
+
+def get(path, token):
+    """
+    Serves a GET through the ASGI application, returning the status and body
+    """
+
+    async def request():
+        communicator = ApplicationCommunicator(
+            application,
+            {
+                "type": "http",
+                "method": "GET",
+                "path": path,
+                "query_string": b"",
+                "headers": [(b"authorization", f"Bearer {token}".encode())],
+                "server": ("testserver", 80),
+            },
+        )
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(5)
+        body = b""
+        while True:
+            message = await communicator.receive_output(5)
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        await communicator.wait(5)
+        return start["status"], body
+
+    return asyncio.run(request())
+
+
+@pytest.mark.django_db(transaction=True)
+class TestASGI:
+    def test_list_and_detail(self, token):
+        """
+        Test the list, detail and summary reads are served through the ASGI
+        application
+        """
+        status, body = get(reverse("expense"), token)
+
+        assert status == 200
+        assert b'"title":"Chipotle"' in body
+
+        expense = Expense.objects.get()
+        status, body = get(
+            reverse("expense_detail", kwargs={"expense_id": expense.id}), token
+        )
+
+        assert status == 200
+        assert f'"id":{expense.id}'.encode() in body
+        assert b'"title":"Chipotle"' in body
+
+        status, body = get(reverse("expense_summary"), token)
+
+        assert status == 200
+        assert b'"category":"Dinner"' in body
+
+    def test_export_streams_on_pool_thread(self, token):
+        """
+        Test a streamed export reads rows on the thread that started and
+        finishes the request, not on the event loop
+        """
+        threads = []
+
+        @receiver(request_started, weak=False)
+        @receiver(request_finished, weak=False)
+        def record(sender, **kwargs):
+            threads.append(threading.current_thread().name)
+
+        try:
+            status, body = get(
+                reverse("expense_export", kwargs={"file_format": "csv"}), token
+            )
+        finally:
+            request_started.disconnect(record)
+            request_finished.disconnect(record)
+
+        assert status == 200
+        assert b"Chipotle" in body
+        assert len(threads) == 2
+        assert threads[0] == threads[1]
+        assert threads[0].startswith("asgi")
@@ -0,0 +1,250 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from expense import bulk
+from expense.models import Expense, MonthlySpend
+from rest_framework.reverse import reverse
+from sync.models import Tombstone
+
+import pytest
+
+
+@pytest.fixture()
+def create_user():
+    """
+    Create a test user
+    """
+
+    def _create_user(email="user@example.com"):
+        return get_user_model().objects.create_user(
+            email=email, first_name="Test", last_name="User", password="pAssw0rd!"
+        )
+
+    return _create_user
+
+
+@pytest.fixture()
+def add_expenses():
+    """
+    Create test expenses of 10.00 each
+    """
+
+    def _add_expenses(count, created_by, category="Dinner"):
+        return [
+            Expense.objects.create(
+                title=f"Expense {num}",
+                amount="10.00",
+                category=category,
+                incurred_on="2020-05-01",
+                created_by=created_by,
+            )
+            for num in range(count)
+        ]
+
+    return _add_expenses
+
+
+def item(num, **fields):
+    return {
+        "title": f"Expense {num}",
+        "amount": "10.00",
+        "category": "Dinner",
+        "incurred_on": "2020-05-01",
+        **fields,
+    }
+
+
+@pytest.mark.django_db
+class TestExpenseBulk:
+    def test_bulk_create(self, client, create_user):
+        """
+        Test a batch of expenses is created and rolled up
+        """
+        user = create_user()
+        client.force_login(user)
+
+        resp = client.post(
+            reverse("expense_bulk"),
+            [item(num) for num in range(3)],
+            content_type="application/json",
+        )
+
+        assert resp.status_code == 201
+        assert [row["title"] for row in resp.data] == [
+            "Expense 0",
+            "Expense 1",
+            "Expense 2",
+        ]
+        assert Expense.objects.filter(created_by=user).count() == 3
+        assert MonthlySpend.objects.get(user=user).total == Decimal("30.00")
+
+    def test_bulk_create_is_all_or_nothing(self, client, create_user):
+        """
+        Test one invalid item rejects the batch with per-item errors
+        """
+        client.force_login(create_user())
+
+        resp = client.post(
+            reverse("expense_bulk"),
+            [item(0), item(1, amount="abc"), item(2)],
+            content_type="application/json",
+        )
+
+        assert resp.status_code == 400
+        assert resp.data[0] == {}
+        assert "amount" in resp.data[1]
+        assert resp.data[2] == {}
+        assert not Expense.objects.exists()
+
+    @pytest.mark.parametrize(
+        "payload", [[], {"title": "x"}, [{}] * (bulk.MAX_ITEMS + 1)]
+    )
+    def test_bulk_rejects_invalid_batches(self, client, create_user, payload):
+        """
+        Test a batch must be a list of 1 to MAX_ITEMS items
+        """
+        client.force_login(create_user())
+
+        resp = client.post(
+            reverse("expense_bulk"), payload, content_type="application/json"
+        )
+
+        assert resp.status_code == 400
+        assert "non_field_errors" in resp.data
+
+    def test_bulk_update(self, client, create_user, add_expenses):
+        """
+        Test a batch of expenses is updated by id and moved in the rollup
+        """
+        user = create_user()
+        first, second = add_expenses(2, user)
+        client.force_login(user)
+
+        resp = client.patch(
+            reverse("expense_bulk"),
+            [
+                {"id": first.id, "amount": "15.00"},
+                {"id": second.id, "category": "Lunch"},
+            ],
+            content_type="application/json",
+        )
+
+        assert resp.status_code == 200
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert first.amount == Decimal("15.00")
+        assert second.category == "Lunch"
+        assert {
+            row.category: row.total for row in MonthlySpend.objects.filter(user=user)
+        } == {"Dinner": Decimal("15.00"), "Lunch": Decimal("10.00")}
+
+    def test_bulk_update_checks_owner(self, client, create_user, add_expenses):
+        """
+        Test expenses of other users are reported as not found
+        """
+        user = create_user()
+        (own,) = add_expenses(1, user)
+        (other,) = add_expenses(1, create_user("other@example.com"))
+        client.force_login(user)
+
+        resp = client.patch(
+            reverse("expense_bulk"),
+            [
+                {"id": own.id, "amount": "15.00"},
+                {"id": other.id, "amount": "15.00"},
+                {"id": own.id, "amount": "20.00"},
+                {"amount": "15.00"},
+            ],
+            content_type="application/json",
+        )
+
+        assert resp.status_code == 400
+        assert resp.data == [
+            {},
+            {"id": ["Not found."]},
+            {"id": ["Duplicate id."]},
+            {"id": ["A valid integer is required."]},
+        ]
+        own.refresh_from_db()
+        other.refresh_from_db()
+        assert own.amount == other.amount == Decimal("10.00")
+
+    def test_bulk_update_ignores_file(self, client, create_user, add_expenses):
+        """
+        Test a batch cannot change files, which are released one at a time
+        """
+        user = create_user()
+        (expense,) = add_expenses(1, user)
+        Expense.objects.filter(pk=expense.pk).update(file="media/receipt.pdf")
+        client.force_login(user)
+
+        resp = client.patch(
+            reverse("expense_bulk"),
+            [{"id": expense.id, "amount": "15.00", "file": None}],
+            content_type="application/json",
+        )
+
+        assert resp.status_code == 200
+        expense.refresh_from_db()
+        assert expense.amount == Decimal("15.00")
+        assert expense.file.name == "media/receipt.pdf"
+
+    def test_bulk_delete(self, client, create_user, add_expenses):
+        """
+        Test a batch of the user's expenses is deleted by id
+        """
+        user = create_user()
+        expenses = add_expenses(3, user)
+        (other,) = add_expenses(1, create_user("other@example.com"))
+        client.force_login(user)
+
+        resp = client.delete(
+            reverse("expense_bulk"),
+            [expenses[0].id, other.id],
+            content_type="application/json",
+        )
+
+        assert resp.status_code == 400
+        assert resp.data == [{}, {"id": ["Not found."]}]
+        assert Expense.objects.count() == 4
+
+        resp = client.delete(
+            reverse("expense_bulk"),
+            [expenses[0].id, expenses[1].id],
+            content_type="application/json",
+        )
+
+        assert resp.status_code == 200
+        assert resp.data == [
+            {"id": expenses[0].id, "deleted": True},
+            {"id": expenses[1].id, "deleted": True},
+        ]
+        assert list(Expense.objects.filter(created_by=user)) == [expenses[2]]
+        assert MonthlySpend.objects.get(user=user).count == 1
+
+    def test_bulk_delete_whole_bucket(
+        self, client, create_user, add_expenses, django_assert_max_num_queries
+    ):
+        """
+        Test deleting every expense of a rollup bucket drops the bucket, with
+        the same queries however many expenses are deleted
+        """
+        user = create_user()
+        expenses = add_expenses(20, user)
+        client.force_login(user)
+
+        with django_assert_max_num_queries(15):
+            resp = client.delete(
+                reverse("expense_bulk"),
+                [expense.id for expense in expenses],
+                content_type="application/json",
+            )
+
+        assert resp.status_code == 200
+        assert not Expense.objects.exists()
+        assert not MonthlySpend.objects.exists()
+        assert sorted(
+            Tombstone.objects.filter(user_id=user.id).values_list(
+                "object_id", flat=True
+            )
+        ) == sorted(expense.id for expense in expenses)
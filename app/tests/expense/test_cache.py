@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from expense.models import Expense
+from rest_framework.reverse import reverse
+from subscription.models import Subscription
+
+import pytest
+
+
+@pytest.fixture()
+def create_user():
+    """
+    Create a test user
+    """
+
+    def _create_user(email="user@example.com"):
+        return get_user_model().objects.create_user(
+            email=email, first_name="Test", last_name="User", password="pAssw0rd!"
+        )
+
+    return _create_user
+
+
+def add_expense(user, title="Chipotle"):
+    return Expense.objects.create(
+        title=title,
+        amount="9.99",
+        category="Dinner",
+        incurred_on="2020-05-01",
+        created_by=user,
+    )
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    def test_unchanged_list_not_modified(self, api_client, django_assert_num_queries):
+        """
+        Test a matching If-None-Match is answered 304 without any query
+        """
+        add_expense(api_client.user)
+        resp = api_client.get(reverse("expense"))
+        etag = resp["ETag"]
+
+        with django_assert_num_queries(0):
+            resp = api_client.get(reverse("expense"), HTTP_IF_NONE_MATCH=etag)
+
+        assert resp.status_code == 304
+        assert resp["ETag"] == etag
+        assert not resp.content
+
+    def test_repeated_get_served_from_cache(
+        self, api_client, django_assert_num_queries
+    ):
+        """
+        Test repeated list and detail requests run no queries
+        """
+        expense = add_expense(api_client.user)
+        urls = (
+            reverse("expense"),
+            reverse("expense_detail", kwargs={"expense_id": expense.id}),
+        )
+        first = [api_client.get(url) for url in urls]
+
+        with django_assert_num_queries(0):
+            second = [api_client.get(url) for url in urls]
+
+        assert [resp.data for resp in first] == [resp.data for resp in second]
+        assert second[1].data["title"] == "Chipotle"
+
+    def test_changes_invalidate(self, api_client):
+        """
+        Test saving, bulk creating and deleting expenses invalidate responses
+        """
+        expense = add_expense(api_client.user)
+        etag = api_client.get(reverse("expense"))["ETag"]
+
+        expense.title = "Renamed"
+        expense.save()
+        resp = api_client.get(reverse("expense"), HTTP_IF_NONE_MATCH=etag)
+
+        assert resp.status_code == 200
+        assert resp.data["results"][0]["title"] == "Renamed"
+
+        api_client.post(
+            reverse("expense_bulk"),
+            [
+                {
+                    "title": "Lunch",
+                    "amount": "5.00",
+                    "category": "Lunch",
+                    "incurred_on": "2020-05-02",
+                }
+            ],
+            format="json",
+        )
+        assert len(api_client.get(reverse("expense")).data["results"]) == 2
+
+        expense.delete()
+        assert len(api_client.get(reverse("expense")).data["results"]) == 1
+
+    def test_subscription_changes_invalidate(self, api_client):
+        """
+        Test saving a subscription invalidates the subscription list
+        """
+        etag = api_client.get(reverse("subscription"))["ETag"]
+
+        Subscription.objects.create(
+            title="Spotify",
+            price="9.99",
+            start_date="2020-06-01",
+            renewal_cycle_days=30,
+            created_by=api_client.user,
+        )
+        resp = api_client.get(reverse("subscription"), HTTP_IF_NONE_MATCH=etag)
+
+        assert resp.status_code == 200
+        assert len(resp.data["results"]) == 1
+
+    def test_cache_is_per_user(self, api_client, create_user):
+        """
+        Test cached responses and ETags are not shared between users
+        """
+        expense = add_expense(api_client.user)
+        url = reverse("expense_detail", kwargs={"expense_id": expense.id})
+        etag = api_client.get(url)["ETag"]
+
+        api_client.force_authenticate(create_user("other@example.com"))
+
+        assert api_client.get(url).status_code == 404
+        assert api_client.get(reverse("expense")).data["results"] == []
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import http_date
+from expense.models import Expense
+from expense.views import ExpenseDetail
+from rest_framework.reverse import reverse
+
+import pytest
+
+
+@pytest.fixture()
+def expense(api_client):
+    """
+    Create an expense of the test user
+    """
+    return Expense.objects.create(
+        title="Chipotle",
+        amount="9.99",
+        category="Dinner",
+        incurred_on="2020-05-01",
+        created_by=api_client.user,
+    )
+
+
+def detail_url(expense):
+    return reverse("expense_detail", kwargs={"expense_id": expense.id})
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    def test_detail_validators(self, api_client, expense, django_assert_num_queries):
+        """
+        Test a detail's ETag and Last-Modified come from `updated` and are
+        revalidated with one query when the response is not cached
+        """
+        resp = api_client.get(detail_url(expense))
+
+        assert resp["Last-Modified"] == http_date(expense.updated.timestamp())
+        etag = resp["ETag"]
+
+        cache.clear()
+        with django_assert_num_queries(1):
+            resp = api_client.get(detail_url(expense), HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 304
+
+        cache.clear()
+        since = http_date((expense.updated + timedelta(seconds=1)).timestamp())
+        resp = api_client.get(detail_url(expense), HTTP_IF_MODIFIED_SINCE=since)
+        assert resp.status_code == 304
+
+        expense.save()
+        resp = api_client.get(detail_url(expense), HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 200
+        assert resp["ETag"] != etag
+
+    def test_list_validators(self, api_client, expense, django_assert_num_queries):
+        """
+        Test a list's ETag changes with additions and deletions and is
+        revalidated with one aggregate query when not cached
+        """
+        etag = api_client.get(reverse("expense"))["ETag"]
+
+        cache.clear()
+        with django_assert_num_queries(1):
+            resp = api_client.get(reverse("expense"), HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == 304
+
+        other = Expense.objects.create(
+            title="Lunch",
+            amount="5.00",
+            category="Lunch",
+            incurred_on="2020-05-02",
+            created_by=api_client.user,
+        )
+        added = api_client.get(reverse("expense"), HTTP_IF_NONE_MATCH=etag)
+        assert added.status_code == 200
+
+        other.delete()
+        removed = api_client.get(reverse("expense"), HTTP_IF_NONE_MATCH=added["ETag"])
+        assert removed.status_code == 200
+        # Back to the list as it was before the addition.
+        assert removed["ETag"] == etag
+
+    def test_list_revalidated_after_delete(self, api_client, expense):
+        """
+        Test a list is not answered 304 after one of its rows was deleted,
+        whether revalidated by date or by ETag
+        """
+        Expense.objects.create(
+            title="Lunch",
+            amount="5.00",
+            category="Lunch",
+            incurred_on="2020-05-02",
+            created_by=api_client.user,
+        )
+        resp = api_client.get(reverse("expense"))
+        assert not resp.has_header("Last-Modified")
+
+        expense.delete()
+        since = http_date((timezone.now() + timedelta(seconds=1)).timestamp())
+        by_date = api_client.get(reverse("expense"), HTTP_IF_MODIFIED_SINCE=since)
+        by_etag = api_client.get(reverse("expense"), HTTP_IF_NONE_MATCH=resp["ETag"])
+
+        for resp_two in (by_date, by_etag):
+            assert resp_two.status_code == 200
+            assert len(resp_two.data["results"]) == 1
+
+    def test_if_match(self, api_client, expense):
+        """
+        Test writes with a current ETag succeed and return the new one,
+        while writes with a stale ETag are refused
+        """
+        etag = api_client.get(detail_url(expense))["ETag"]
+
+        resp = api_client.patch(
+            detail_url(expense), {"title": "Renamed"}, HTTP_IF_MATCH=etag
+        )
+        assert resp.status_code == 200
+        assert resp["ETag"] != etag
+
+        stale = api_client.patch(
+            detail_url(expense), {"title": "Lost"}, HTTP_IF_MATCH=etag
+        )
+        assert stale.status_code == 412
+        assert (
+            api_client.delete(detail_url(expense), HTTP_IF_MATCH=etag).status_code
+            == 412
+        )
+        expense.refresh_from_db()
+        assert expense.title == "Renamed"
+
+        current = api_client.delete(detail_url(expense), HTTP_IF_MATCH=resp["ETag"])
+        assert current.status_code == 204
+
+    def test_if_match_lost_race(self, api_client, expense, monkeypatch):
+        """
+        Test a write racing another one after the object was read is refused
+        """
+        etag = api_client.get(detail_url(expense))["ETag"]
+        claim = ExpenseDetail.claim
+
+        def concurrent_claim(self, instance):
+            # Another request saves the expense between read and write.
+            Expense.objects.filter(pk=instance.pk).update(updated=timezone.now())
+            claim(self, instance)
+
+        monkeypatch.setattr(ExpenseDetail, "claim", concurrent_claim)
+
+        resp = api_client.put(
+            detail_url(expense),
+            {
+                "title": "Lost",
+                "amount": "1.00",
+                "category": "Dinner",
+                "incurred_on": "2020-05-01",
+            },
+            HTTP_IF_MATCH=etag,
+        )
+
+        assert resp.status_code == 412
+        expense.refresh_from_db()
+        assert expense.title == "Chipotle"
@@ -238,8 +238,8 @@ def test_get_all_expenses(
     resp = client.get(f"/api/expense/", headers=headers)
 
     assert resp.status_code == 200
-    assert resp.data[0]["title"] == expense_one.title
-    assert resp.data[1]["title"] == expense_two.title
+    assert resp.data["results"][0]["title"] == expense_one.title
+    assert resp.data["results"][1]["title"] == expense_two.title
 
 
 @pytest.mark.django_db
@@ -275,7 +275,7 @@ def test_delete_expense(
 
     resp_three = client.get(f"/api/expense/", headers=headers)
     assert resp_three.status_code == 200
-    assert len(resp_three.data) == 0
+    assert len(resp_three.data["results"]) == 0
 
 
 @pytest.mark.django_db
@@ -322,3 +322,297 @@ def test_update_expense(
     assert resp_two.status_code == 200
     assert resp_two.data["category"] == "Lunch"
     assert resp_two.data["incurred_on"] == "2020-05-02"
+
+
+@pytest.mark.django_db
+def test_get_all_expenses_paginated(
+    client, create_user, login_user, add_expense, generate_headers
+):
+    """
+    Test expenses are paged by (incurred_on, id) with opaque cursors
+    """
+    user = create_user
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    for day in (3, 1, 2, 2):
+        add_expense(
+            title=f"Expense {day}",
+            amount="9.99",
+            category="Dinner",
+            incurred_on=f"2020-05-0{day}",
+            created_by=user,
+            file=None,
+        )
+
+    resp = client.get("/api/expense/", {"page_size": 3}, headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.data["previous"] is None
+    assert [e["incurred_on"] for e in resp.data["results"]] == [
+        "2020-05-01",
+        "2020-05-02",
+        "2020-05-02",
+    ]
+
+    resp_two = client.get(resp.data["next"], headers=headers)
+
+    assert resp_two.status_code == 200
+    assert resp_two.data["next"] is None
+    assert resp_two.data["previous"] is not None
+    assert [e["incurred_on"] for e in resp_two.data["results"]] == ["2020-05-03"]
+
+
+@pytest.mark.django_db
+def test_get_all_expenses_paginated_same_day(
+    client, create_user, login_user, generate_headers
+):
+    """
+    Test every expense is reached exactly once, forwards and backwards, when
+    more of them than an offset could skip share one date
+    """
+    user = create_user
+    headers = generate_headers(login_user.data["access"])
+
+    Expense.objects.bulk_create(
+        Expense(
+            title=f"Expense {i}",
+            amount="1.00",
+            category="Dinner",
+            incurred_on="2020-05-01",
+            created_by=user,
+        )
+        for i in range(2600)
+    )
+    ids = list(
+        Expense.objects.filter(created_by=user)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+    seen = []
+    url, params = "/api/expense/", {"page_size": 500}
+    while url:
+        resp = client.get(url, params, headers=headers)
+        assert resp.status_code == 200
+        seen += [e["id"] for e in resp.data["results"]]
+        url, params, previous = resp.data["next"], {}, resp.data["previous"]
+
+    assert seen == ids
+
+    seen = []
+    url = previous
+    while url:
+        resp = client.get(url, headers=headers)
+        seen = [e["id"] for e in resp.data["results"]] + seen
+        url = resp.data["previous"]
+
+    # Back from the last page, which holds the last 100.
+    assert seen == ids[:-100]
+
+
+@pytest.mark.django_db
+def test_get_all_expenses_page_size_limit(
+    client, create_user, login_user, generate_headers
+):
+    """
+    Test requested page size is capped by the pagination hard limit
+    """
+    user = create_user
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    Expense.objects.bulk_create(
+        Expense(
+            title="Coffee",
+            amount="2.50",
+            category="Drinks",
+            incurred_on="2020-05-01",
+            created_by=user,
+        )
+        for _ in range(510)
+    )
+
+    resp = client.get("/api/expense/", {"page_size": 10000}, headers=headers)
+
+    assert resp.status_code == 200
+    assert len(resp.data["results"]) == 500
+    assert resp.data["next"] is not None
+
+
+@pytest.fixture()
+def filter_expenses(create_user, add_expense):
+    """
+    Create expenses to filter
+    """
+    user = create_user
+
+    for title, amount, category, incurred_on, notes in (
+        ("Chipotle", "9.99", "Dinner", "2020-05-01", "Burrito bowl"),
+        ("Starbucks", "4.50", "Coffee", "2020-05-03", ""),
+        ("Netflix gift card", "25.00", "Gift", "2020-05-10", ""),
+        ("Wingstop", "14.25", "Dinner", "2020-06-01", "Lemon pepper"),
+    ):
+        expense = add_expense(
+            title=title,
+            amount=amount,
+            category=category,
+            incurred_on=incurred_on,
+            created_by=user,
+            file=None,
+        )
+        expense.notes = notes
+        expense.save()
+
+    return user
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params, titles",
+    [
+        ({"category": ["Dinner", "Coffee"]}, ["Chipotle", "Starbucks", "Wingstop"]),
+        (
+            {"incurred_on_after": "2020-05-02", "incurred_on_before": "2020-05-31"},
+            ["Starbucks", "Netflix gift card"],
+        ),
+        ({"amount_min": "5", "amount_max": "15"}, ["Chipotle", "Wingstop"]),
+        ({"q": "pepper"}, ["Wingstop"]),
+        ({"q": "netflix"}, ["Netflix gift card"]),
+        (
+            {"ordering": "-amount"},
+            ["Netflix gift card", "Wingstop", "Chipotle", "Starbucks"],
+        ),
+        ({"category": "Dinner", "ordering": "-incurred_on"}, ["Wingstop", "Chipotle"],),
+    ],
+)
+def test_filter_expenses(
+    client, filter_expenses, login_user, generate_headers, params, titles
+):
+    """
+    Test filtering and ordering expenses with query parameters
+    """
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    resp = client.get("/api/expense/", params, headers=headers)
+
+    assert resp.status_code == 200
+    assert [e["title"] for e in resp.data["results"]] == titles
+
+
+@pytest.mark.django_db
+def test_filter_expenses_ordering_paginated(
+    client, filter_expenses, login_user, generate_headers
+):
+    """
+    Test cursor pages follow the requested ordering
+    """
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    resp = client.get(
+        "/api/expense/", {"ordering": "amount", "page_size": 3}, headers=headers
+    )
+    assert resp.status_code == 200
+    assert [e["amount"] for e in resp.data["results"]] == ["4.50", "9.99", "14.25"]
+
+    resp_two = client.get(resp.data["next"], headers=headers)
+    assert resp_two.status_code == 200
+    assert [e["amount"] for e in resp_two.data["results"]] == ["25.00"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"ordering": "notes"},
+        {"title": "Chipotle"},
+        {"q": "ab"},
+        {"amount_min": "abc"},
+        {"incurred_on_after": "2020-06-01", "incurred_on_before": "2020-05-01"},
+        {"amount_min": "20", "amount_max": "10"},
+    ],
+)
+def test_filter_expenses_invalid(
+    client, filter_expenses, login_user, generate_headers, params
+):
+    """
+    Test invalid or unindexed query parameters are rejected
+    """
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    resp = client.get("/api/expense/", params, headers=headers)
+
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_expense_summary(client, filter_expenses, login_user, generate_headers):
+    """
+    Test expense summary groups spend by category, month and year
+    """
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    resp = client.get("/api/expense/summary/", headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.data["overall"]["total"] == "53.74"
+    assert resp.data["overall"]["count"] == 4
+    assert resp.data["overall"]["min"] == "4.50"
+    assert resp.data["overall"]["max"] == "25.00"
+
+    dinner = resp.data["by_category"][1]
+    assert dinner["category"] == "Dinner"
+    assert dinner["total"] == "24.24"
+    assert dinner["count"] == 2
+    assert dinner["average"] == "12.12"
+
+    assert [
+        (m["month"], m["total"], m["running_total"]) for m in resp.data["by_month"]
+    ] == [("2020-05", "39.49", "39.49"), ("2020-06", "14.25", "53.74")]
+
+    assert [(y["year"], y["total"]) for y in resp.data["by_year"]] == [(2020, "53.74")]
+
+
+@pytest.mark.django_db
+def test_expense_summary_filtered(
+    client, filter_expenses, login_user, generate_headers
+):
+    """
+    Test expense summary honours date range and category filters
+    """
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    resp = client.get(
+        "/api/expense/summary/",
+        {"category": "Dinner", "incurred_on_before": "2020-05-31"},
+        headers=headers,
+    )
+
+    assert resp.status_code == 200
+    assert resp.data["overall"]["total"] == "9.99"
+    assert [c["category"] for c in resp.data["by_category"]] == ["Dinner"]
+    assert [m["month"] for m in resp.data["by_month"]] == ["2020-05"]
+
+    resp_two = client.get(
+        "/api/expense/summary/", {"ordering": "amount"}, headers=headers
+    )
+    assert resp_two.status_code == 400
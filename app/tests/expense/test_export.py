@@ -0,0 +1,140 @@
+import csv
+import gzip
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from expense.models import Expense
+from rest_framework.reverse import reverse
+
+import pytest
+
+
+@pytest.fixture()
+def create_user(email="user@example.com", password="pAssw0rd!"):
+    """
+    Create a test user
+    """
+    return get_user_model().objects.create_user(
+        email=email, first_name="Test", last_name="User", password=password
+    )
+
+
+@pytest.fixture()
+def export_expenses(create_user):
+    """
+    Create expenses to export for the test user and one for another user
+    """
+    other = get_user_model().objects.create_user(
+        email="other@example.com",
+        first_name="Test",
+        last_name="User",
+        password="pAssw0rd!",
+    )
+    rows = (
+        ("Chipotle", "9.99", "Dinner", "2020-05-02", create_user),
+        ("Coffee", "3.50", "Breakfast", "2020-05-01", create_user),
+        ("Sushi", "30.00", "Dinner", "2020-06-01", create_user),
+        ("Hidden", "1.00", "Dinner", "2020-05-01", other),
+    )
+
+    for title, amount, category, incurred_on, user in rows:
+        Expense.objects.create(
+            title=title,
+            amount=amount,
+            category=category,
+            incurred_on=incurred_on,
+            created_by=user,
+        )
+
+    return create_user
+
+
+def export_url(file_format):
+    return reverse("expense_export", kwargs={"file_format": file_format})
+
+
+@pytest.mark.django_db
+class TestExpenseExport:
+    def test_export_csv(self, client, export_expenses):
+        """
+        Test expenses stream as CSV in (incurred_on, id) order
+        """
+        client.force_login(export_expenses)
+
+        resp = client.get(export_url("csv"))
+
+        assert resp.status_code == 200
+        assert resp.streaming
+        assert resp["Content-Type"] == "text/csv"
+        assert 'filename="expenses.csv"' in resp["Content-Disposition"]
+
+        rows = list(
+            csv.DictReader(b"".join(resp.streaming_content).decode().splitlines())
+        )
+        assert [row["title"] for row in rows] == ["Coffee", "Chipotle", "Sushi"]
+        assert rows[1]["amount"] == "9.99"
+        assert rows[1]["incurred_on"] == "2020-05-02"
+
+    def test_export_ndjson_with_filters(self, client, export_expenses):
+        """
+        Test NDJSON export applies the expense list filters and ordering
+        """
+        client.force_login(export_expenses)
+
+        resp = client.get(
+            export_url("ndjson"), {"category": "Dinner", "ordering": "-amount"}
+        )
+
+        assert resp.status_code == 200
+        assert resp["Content-Type"] == "application/x-ndjson"
+
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert [row["title"] for row in rows] == ["Sushi", "Chipotle"]
+        assert rows[0]["amount"] == "30.00"
+
+    def test_export_gzip(self, client, export_expenses):
+        """
+        Test the export is gzip-compressed when the client accepts it
+        """
+        client.force_login(export_expenses)
+
+        resp = client.get(export_url("csv"), HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        assert resp["Content-Encoding"] == "gzip"
+        body = gzip.decompress(b"".join(resp.streaming_content)).decode()
+        assert (
+            body.splitlines()[0] == "id,title,amount,category,incurred_on,notes,updated"
+        )
+        assert len(body.splitlines()) == 4
+
+    def test_export_first_byte_before_query(self, client, export_expenses):
+        """
+        Test the CSV header is sent before the expenses are queried
+        """
+        client.force_login(export_expenses)
+        resp = client.get(export_url("csv"))
+
+        with CaptureQueriesContext(connection) as queries:
+            header = next(resp.streaming_content)
+
+        assert header.startswith(b"id,title")
+        assert len(queries) == 0
+
+        with CaptureQueriesContext(connection) as queries:
+            b"".join(resp.streaming_content)
+
+        assert len(queries) == 1
+
+    def test_export_invalid_filter(self, client, export_expenses):
+        """
+        Test invalid filters are rejected before streaming starts
+        """
+        client.force_login(export_expenses)
+
+        resp = client.get(export_url("csv"), {"amount_min": "abc"})
+
+        assert resp.status_code == 400
+        assert "amount_min" in resp.json()
@@ -0,0 +1,116 @@
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from expense import imports
+from expense.models import Expense, MonthlySpend
+from rest_framework.reverse import reverse
+
+import pytest
+
+HEADER = "title,amount,category,incurred_on,notes\n"
+
+
+@pytest.fixture()
+def create_user(email="user@example.com", password="pAssw0rd!"):
+    """
+    Create a test user
+    """
+    return get_user_model().objects.create_user(
+        email=email, first_name="Test", last_name="User", password=password
+    )
+
+
+def csv_file(*lines, header=HEADER):
+    return BytesIO((header + "".join(line + "\n" for line in lines)).encode())
+
+
+@pytest.mark.django_db
+class TestExpenseImport:
+    def test_import_endpoint(self, client, create_user):
+        """
+        Test valid rows are imported and invalid ones reported by line
+        """
+        client.force_login(create_user)
+        upload = SimpleUploadedFile(
+            "expenses.csv",
+            csv_file(
+                "Chipotle,9.99,Dinner,2020-05-01,",
+                "Coffee,1.234,Breakfast,2020-05-02,",
+                "Sushi,30.00,Dinner,05/03/2020,",
+                '"Tea, green",2.50,Breakfast,2020-05-04,"Notes, quoted"',
+            ).getvalue(),
+            content_type="text/csv",
+        )
+
+        resp = client.post(reverse("expense_import"), {"file": upload})
+
+        assert resp.status_code == 200
+        assert resp.data["created"] == 2
+        assert resp.data["failed"] == 2
+        assert [error["line"] for error in resp.data["errors"]] == [3, 4]
+        assert "amount" in resp.data["errors"][0]["errors"]
+        assert "incurred_on" in resp.data["errors"][1]["errors"]
+
+        tea = Expense.objects.get(title="Tea, green")
+        assert tea.notes == "Notes, quoted"
+        assert tea.created_by == create_user
+        assert MonthlySpend.objects.get(
+            user=create_user, category="Dinner"
+        ).total == Decimal("9.99")
+
+    def test_import_missing_columns(self, client, create_user):
+        """
+        Test files without the expense columns are rejected
+        """
+        client.force_login(create_user)
+        upload = SimpleUploadedFile(
+            "expenses.csv", b"name,price\nChipotle,9.99\n", content_type="text/csv"
+        )
+
+        resp = client.post(reverse("expense_import"), {"file": upload})
+
+        assert resp.status_code == 400
+        assert "title" in resp.data["file"][0]
+
+    def test_import_inserts_per_chunk(self, create_user):
+        """
+        Test rows are inserted with one INSERT per chunk, not per row
+        """
+        rows = [f"Expense {num},1.00,Dinner,2020-05-01," for num in range(25)]
+
+        with CaptureQueriesContext(connection) as queries:
+            result = imports.import_expenses(create_user, csv_file(*rows), 10)
+
+        inserts = [
+            query
+            for query in queries
+            if query["sql"].startswith('INSERT INTO "expense_expense"')
+        ]
+        assert result["created"] == 25
+        assert len(inserts) == 3
+
+    def test_import_command(self, tmp_path, create_user):
+        """
+        Test the management command imports a file for a user
+        """
+        path = tmp_path / "expenses.csv"
+        path.write_bytes(
+            csv_file(
+                "Chipotle,9.99,Dinner,2020-05-01,", ",1.00,Dinner,2020-05-01,"
+            ).getvalue()
+        )
+        out = StringIO()
+        err = StringIO()
+
+        call_command(
+            "import_expenses", str(path), user=create_user.email, stdout=out, stderr=err
+        )
+
+        assert out.getvalue() == "Imported 1 expenses, 1 rows failed.\n"
+        assert err.getvalue().startswith("Line 3:")
+        assert Expense.objects.filter(created_by=create_user).count() == 1
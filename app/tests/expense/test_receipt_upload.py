@@ -0,0 +1,182 @@
+from botocore.stub import Stubber
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from expense import uploads
+from expense.models import Expense
+from rest_framework.reverse import reverse
+from storages.backends.s3boto3 import S3Boto3Storage
+
+import pytest
+
+
+@pytest.fixture()
+def local_uploads(settings, tmp_path):
+    """
+    Upload receipts to a filesystem storage instead of S3
+    """
+    settings.DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.EXPENSE_RECEIPT_UPLOAD_BACKEND = "expense.uploads.LocalUploadBackend"
+
+
+@pytest.fixture()
+def expense():
+    """
+    Create a test user with one expense
+    """
+    user = get_user_model().objects.create_user(
+        email="user@example.com",
+        first_name="Test",
+        last_name="User",
+        password="pAssw0rd!",
+    )
+    return Expense.objects.create(
+        title="Chipotle",
+        amount="9.99",
+        category="Dinner",
+        incurred_on="2020-05-01",
+        created_by=user,
+    )
+
+
+def request_upload(client, expense, **params):
+    return client.post(
+        reverse("expense_receipt_upload", kwargs={"expense_id": expense.id}),
+        {"filename": "receipt.png", "content_type": "image/png", "size": 4, **params},
+        content_type="application/json",
+    )
+
+
+def attach(client, expense, key):
+    return client.put(
+        reverse("expense_receipt", kwargs={"expense_id": expense.id}),
+        {"key": key},
+        content_type="application/json",
+    )
+
+
+@pytest.mark.django_db
+class TestReceiptUpload:
+    def test_upload_and_attach(self, client, local_uploads, expense):
+        """
+        Test a receipt is uploaded to its URL, then attached to the expense
+        """
+        client.force_login(expense.created_by)
+
+        resp = request_upload(client, expense)
+
+        assert resp.status_code == 201
+        assert resp.data["method"] == "PUT"
+        key = resp.data["key"]
+        assert key.startswith(f"media/receipts/{expense.created_by_id}/{expense.id}/")
+        assert key.endswith("/receipt.png")
+
+        client.logout()
+        put = client.put(resp.data["url"], b"\x89PNG", content_type="image/png")
+        assert put.status_code == 204
+
+        client.force_login(expense.created_by)
+        resp = attach(client, expense, key)
+
+        assert resp.status_code == 200
+        expense.refresh_from_db()
+        assert expense.file.name == key
+        assert expense.file.read() == b"\x89PNG"
+
+    def test_attach_requires_upload(self, client, local_uploads, expense):
+        """
+        Test only uploaded receipts of the expense can be attached
+        """
+        client.force_login(expense.created_by)
+        key = request_upload(client, expense).data["key"]
+
+        assert attach(client, expense, key).data == {"key": ["Upload not found."]}
+        assert attach(client, expense, "media/receipts/1/1/x/a.png").status_code == 400
+
+        expense.refresh_from_db()
+        assert not expense.file
+
+    def test_attach_rejects_traversal(self, client, local_uploads, expense):
+        """
+        Test a key leading out of the expense's prefix is not attached
+        """
+        default_storage.save("media/receipts/999/1/x/a.png", ContentFile(b"\x89PNG"))
+        client.force_login(expense.created_by)
+        prefix = uploads.receipt_prefix(expense)
+
+        resp = attach(client, expense, f"{prefix}../../999/1/x/a.png")
+
+        assert resp.data == {"key": ["Not a receipt upload of this expense."]}
+        expense.refresh_from_db()
+        assert not expense.file
+
+    def test_upload_url_limits(self, client, local_uploads, expense):
+        """
+        Test upload URLs reject other content types, large bodies and forgery
+        """
+        client.force_login(expense.created_by)
+        url = request_upload(client, expense).data["url"]
+
+        assert (
+            client.put(url, b"%PDF", content_type="application/pdf").status_code == 400
+        )
+        assert (
+            client.put(url + "x", b"\x89PNG", content_type="image/png").status_code
+            == 403
+        )
+
+        assert request_upload(client, expense, size=10 ** 9).status_code == 400
+        assert (
+            request_upload(client, expense, content_type="text/html").status_code == 400
+        )
+
+    def test_upload_other_users_expense(self, client, local_uploads, expense):
+        """
+        Test upload URLs are only issued for the user's own expenses
+        """
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            first_name="Test",
+            last_name="User",
+            password="pAssw0rd!",
+        )
+        client.force_login(other)
+
+        assert request_upload(client, expense).status_code == 404
+        assert attach(client, expense, "media/receipts/x").status_code == 404
+
+
+def test_s3_presigned_post(settings):
+    """
+    Test the S3 backend presigns a size and type restricted POST
+    """
+    settings.EXPENSE_RECEIPT_UPLOAD_EXPIRES = 60
+    storage = S3Boto3Storage(
+        access_key="key",
+        secret_key="secret",
+        bucket_name="receipts",
+        region_name="us-east-1",
+        default_acl="public-read",
+    )
+    backend = uploads.S3UploadBackend(storage)
+
+    upload = backend.presign(None, "media/receipts/1/2/abc/r.png", "image/png", 100)
+
+    assert upload["method"] == "POST"
+    assert "receipts" in upload["url"]
+    assert upload["fields"]["key"] == "media/receipts/1/2/abc/r.png"
+    assert upload["fields"]["Content-Type"] == "image/png"
+    assert upload["fields"]["acl"] == "public-read"
+    assert "policy" in upload["fields"]
+
+    with Stubber(backend.client) as stubber:
+        stubber.add_response(
+            "head_object",
+            {"ContentLength": 42},
+            {"Bucket": "receipts", "Key": "media/receipts/1/2/abc/r.png"},
+        )
+        stubber.add_client_error("head_object", "404")
+
+        assert backend.uploaded_size("media/receipts/1/2/abc/r.png") == 42
+        assert backend.uploaded_size("media/receipts/1/2/abc/missing.png") is None
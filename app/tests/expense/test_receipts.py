@@ -0,0 +1,165 @@
+import hashlib
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from expense import receipts
+from expense.models import Expense, Receipt
+from PIL import Image
+
+import pytest
+
+
+@pytest.fixture()
+def local_storage(settings, tmp_path):
+    """
+    Store receipts and their variants on the filesystem instead of S3
+    """
+    settings.DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture()
+def create_user(email="user@example.com", password="pAssw0rd!"):
+    """
+    Create a test user
+    """
+    return get_user_model().objects.create_user(
+        email=email, first_name="Test", last_name="User", password=password
+    )
+
+
+@pytest.fixture()
+def add_receipt(create_user):
+    """
+    Create an expense with the given receipt file contents
+    """
+
+    def _add_receipt(content, name="receipt.jpg"):
+        expense = Expense(
+            title="Chipotle",
+            amount="9.99",
+            category="Dinner",
+            incurred_on="2020-05-01",
+            created_by=create_user,
+        )
+        expense.file.save(name, ContentFile(content))
+        return expense
+
+    return _add_receipt
+
+
+def photo(width=2000, height=1500, orientation=None):
+    """
+    Returns JPEG bytes of a noisy photo, optionally with an EXIF orientation
+    """
+    image = Image.merge(
+        "RGB", [Image.effect_noise((width, height), 60) for _ in range(3)]
+    )
+    exif = Image.Exif()
+    exif[0x010F] = "Test Camera"
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=95, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+class TestReceiptProcessing:
+    def test_process_photo(self, local_storage, add_receipt):
+        """
+        Test a photo gets small EXIF-free variants and its metadata recorded
+        """
+        content = photo(orientation=6)
+        expense = add_receipt(content)
+
+        receipt = receipts.process_receipt(expense.id)
+
+        assert receipt.source == expense.file.name
+        assert receipt.content_type == "image/jpeg"
+        assert receipt.size == len(content)
+        assert receipt.sha256 == hashlib.sha256(content).hexdigest()
+        # Rotated upright from the EXIF orientation.
+        assert (receipt.width, receipt.height) == (1500, 2000)
+
+        with receipt.thumbnail.open("rb") as file:
+            thumbnail_bytes = file.read()
+        thumbnail = Image.open(BytesIO(thumbnail_bytes))
+        assert max(thumbnail.size) == 200
+        assert thumbnail.size[1] > thumbnail.size[0]
+        assert len(thumbnail_bytes) < 20 * 1024
+        assert not thumbnail.getexif()
+
+        with receipt.web.open("rb") as file:
+            web = Image.open(file)
+            assert max(web.size) == 1280
+            assert not web.getexif()
+
+    def test_process_same_content_reuses_variants(self, local_storage, add_receipt):
+        """
+        Test identical receipts share their content-addressed variants
+        """
+        content = photo(400, 300)
+        first = receipts.process_receipt(add_receipt(content).id)
+        second = receipts.process_receipt(add_receipt(content).id)
+
+        assert first.thumbnail.name == second.thumbnail.name
+        assert first.web.name == second.web.name
+
+    def test_process_pdf(self, local_storage, add_receipt):
+        """
+        Test files that are not images only get their metadata recorded
+        """
+        receipt = receipts.process_receipt(add_receipt(b"%PDF-1.4", "r.pdf").id)
+
+        assert receipt.content_type == "application/pdf"
+        assert receipt.size == 8
+        assert receipt.width is None
+        assert not receipt.thumbnail
+        assert not receipt.web
+
+    def test_process_removed_file(self, local_storage, add_receipt):
+        """
+        Test removing the file of an expense removes its receipt
+        """
+        expense = add_receipt(photo(400, 300))
+        receipts.process_receipt(expense.id)
+
+        expense.file = None
+        expense.save()
+
+        assert receipts.process_receipt(expense.id) is None
+        assert not Receipt.objects.exists()
+
+    def test_receipt_in_expense_detail(self, client, local_storage, add_receipt):
+        """
+        Test variant URLs are returned with the expense
+        """
+        expense = add_receipt(photo(400, 300))
+        receipt = receipts.process_receipt(expense.id)
+        client.force_login(expense.created_by)
+
+        resp = client.get(f"/api/expense/{expense.id}")
+
+        assert resp.status_code == 200
+        assert resp.data["receipt"]["thumbnail"].endswith(receipt.thumbnail.url)
+        assert resp.data["receipt"]["width"] == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upload_schedules_processing(local_storage, add_receipt):
+    """
+    Test a new receipt file is queued for processing once committed
+    """
+    with mock.patch("expense.tasks.process_receipt.delay") as delay:
+        expense = add_receipt(photo(40, 30))
+        delay.assert_called_once_with(expense.id)
+
+        expense.title = "Renamed"
+        expense.save()
+        delay.assert_called_once()
+
+    assert default_storage.exists(expense.file.name)
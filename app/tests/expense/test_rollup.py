@@ -0,0 +1,233 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from decimal import Decimal
+from io import StringIO
+
+from expense import rollup
+from expense.models import Expense, MonthlySpend
+from expense.reports import summarize, summarize_rollup
+
+import pytest
+
+
+@pytest.fixture()
+def create_user():
+    """
+    Create test users
+    """
+
+    def _create_user(email="user@example.com"):
+        return get_user_model().objects.create_user(
+            email=email, first_name="Test", last_name="User", password="pAssw0rd!"
+        )
+
+    return _create_user
+
+
+@pytest.fixture()
+def add_expense():
+    """
+    Create a test expense object
+    """
+
+    def _add_expense(amount, category, incurred_on, created_by):
+        return Expense.objects.create(
+            title="Expense",
+            amount=amount,
+            category=category,
+            incurred_on=incurred_on,
+            created_by=created_by,
+        )
+
+    return _add_expense
+
+
+@pytest.fixture()
+def assert_rollup_matches():
+    """
+    Assert the stored rollup equals a full recompute
+    """
+
+    def _rows(spend):
+        return sorted(
+            (s.user_id, s.year_month, s.category, s.total, s.count, s.min, s.max)
+            for s in spend
+        )
+
+    def _assert_rollup_matches(*users):
+        user_ids = [user.id for user in users]
+        stored = MonthlySpend.objects.filter(user_id__in=user_ids)
+
+        assert _rows(stored) == _rows(rollup.recompute(user_ids))
+
+    return _assert_rollup_matches
+
+
+@pytest.mark.django_db
+class TestMonthlySpend:
+    def test_create(self, create_user, add_expense, assert_rollup_matches):
+        """
+        Test new expenses are added to their month and category
+        """
+        user = create_user()
+
+        add_expense("9.99", "Dinner", "2020-05-01", user)
+        add_expense("14.25", "Dinner", "2020-05-20", user)
+        add_expense("4.50", "Coffee", "2020-05-03", user)
+        add_expense("3.00", "Coffee", "2020-06-03", user)
+
+        spend = MonthlySpend.objects.get(
+            user=user, year_month="2020-05-01", category="Dinner"
+        )
+        assert str(spend) == "2020-05 Dinner"
+        assert spend.total == Decimal("24.24")
+        assert spend.count == 2
+        assert MonthlySpend.objects.filter(user=user).count() == 3
+        assert_rollup_matches(user)
+
+    def test_update(self, create_user, add_expense, assert_rollup_matches):
+        """
+        Test updates move amounts between months and categories
+        """
+        user = create_user()
+
+        expense = add_expense("9.99", "Dinner", "2020-05-01", user)
+        add_expense("14.25", "Dinner", "2020-05-20", user)
+        assert_rollup_matches(user)
+
+        expense.amount = "19.99"
+        expense.save()
+        assert_rollup_matches(user)
+
+        expense.incurred_on = "2020-06-01"
+        expense.save()
+        assert_rollup_matches(user)
+
+        expense = Expense.objects.get(pk=expense.pk)
+        expense.category = "Lunch"
+        expense.save()
+        assert_rollup_matches(user)
+
+        expense.title = "Renamed"
+        expense.save()
+        assert_rollup_matches(user)
+        assert not MonthlySpend.objects.filter(
+            user=user, year_month="2020-06-01", category="Dinner"
+        ).exists()
+
+    def test_delete(self, create_user, add_expense, assert_rollup_matches):
+        """
+        Test deletes shrink the rollup and drop empty buckets
+        """
+        user = create_user()
+
+        low = add_expense("1.00", "Dinner", "2020-05-01", user)
+        add_expense("5.00", "Dinner", "2020-05-02", user)
+        high = add_expense("9.00", "Dinner", "2020-05-03", user)
+
+        low.delete()
+        high.delete()
+        assert_rollup_matches(user)
+
+        Expense.objects.filter(created_by=user).delete()
+        assert_rollup_matches(user)
+        assert not MonthlySpend.objects.filter(user=user).exists()
+
+    def test_delete_whole_bucket_at_once(
+        self, create_user, add_expense, assert_rollup_matches
+    ):
+        """
+        Test a queryset delete of a bucket's expenses drops the bucket,
+        though its rows are gone before any is removed from the rollup
+        """
+        user = create_user()
+
+        for amount in ("5.00", "5.00", "9.00"):
+            add_expense(amount, "Dinner", "2020-05-01", user)
+        for amount in ("1.00", "2.00", "3.00"):
+            add_expense(amount, "Lunch", "2020-05-01", user)
+
+        Expense.objects.filter(category="Dinner", amount="5.00").delete()
+        assert_rollup_matches(user)
+
+        Expense.objects.filter(category="Lunch").delete()
+        assert_rollup_matches(user)
+        assert list(MonthlySpend.objects.values_list("category", flat=True)) == [
+            "Dinner"
+        ]
+
+    def test_rebuild_command(self, create_user, add_expense, assert_rollup_matches):
+        """
+        Test the rebuild command restores a drifted rollup in batches
+        """
+        users = [create_user(f"user{num}@example.com") for num in range(3)]
+
+        for num, user in enumerate(users):
+            add_expense("9.99", "Dinner", "2020-05-01", user)
+            add_expense(f"{num}.50", "Coffee", "2020-06-01", user)
+
+        MonthlySpend.objects.filter(user=users[0]).update(total=0, count=99)
+        MonthlySpend.objects.filter(user=users[1]).delete()
+
+        out = StringIO()
+        call_command("rebuild_monthly_spend", batch_size=2, stdout=out)
+
+        assert out.getvalue() == "Rebuilt monthly spend for 3 users.\n"
+        assert_rollup_matches(*users)
+
+    def test_summary_matches_expenses(self, create_user, add_expense):
+        """
+        Test a summary read from the rollup equals one over the expenses
+        """
+        user = create_user()
+
+        for amount, category, incurred_on in (
+            ("9.99", "Dinner", "2020-05-01"),
+            ("14.25", "Dinner", "2020-06-20"),
+            ("4.50", "Coffee", "2020-05-03"),
+            ("3.00", "Coffee", "2021-01-03"),
+        ):
+            add_expense(amount, category, incurred_on, user)
+
+        from_expenses = summarize(Expense.objects.filter(created_by=user))
+        from_rollup = summarize_rollup(MonthlySpend.objects.filter(user=user))
+
+        for key in ("by_category", "by_month", "by_year"):
+            assert len(from_rollup[key]) == len(from_expenses[key])
+            for rolled, expected in zip(from_rollup[key], from_expenses[key]):
+                for field in ("total", "count", "min", "max", "average"):
+                    assert rolled[field] == pytest.approx(expected[field])
+
+        assert from_rollup["overall"]["total"] == pytest.approx(
+            from_expenses["overall"]["total"]
+        )
+
+    def test_summary_running_total(self, create_user, add_expense):
+        """
+        Test the rollup's running total by month adds up every category of
+        each month
+        """
+        user = create_user()
+
+        for amount, category, incurred_on in (
+            ("9.99", "Dinner", "2020-05-01"),
+            ("4.50", "Coffee", "2020-05-03"),
+            ("14.25", "Dinner", "2020-06-20"),
+            ("3.00", "Coffee", "2021-01-03"),
+            ("2.00", "Lunch", "2021-01-04"),
+        ):
+            add_expense(amount, category, incurred_on, user)
+
+        with CaptureQueriesContext(connection) as context:
+            summary = summarize_rollup(MonthlySpend.objects.filter(user=user))
+
+        # SQLite accepts an ungrouped column in the window; PostgreSQL does not.
+        window = next(q["sql"] for q in context if " OVER " in q["sql"])
+        assert 'SUM("expense_monthlyspend"."total") OVER' not in window
+        assert [(m["total"], m["running_total"]) for m in summary["by_month"]] == [
+            (Decimal("14.49"), Decimal("14.49")),
+            (Decimal("14.25"), Decimal("28.74")),
+            (Decimal("5.00"), Decimal("33.74")),
+        ]
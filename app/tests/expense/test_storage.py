@@ -0,0 +1,212 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import transaction
+from expense import bulk
+from expense.models import Expense, StoredFile
+
+import pytest
+
+
+@pytest.fixture()
+def local_storage(settings, tmp_path):
+    """
+    Store expense files on the filesystem instead of S3
+    """
+    settings.DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture()
+def add_expense():
+    """
+    Create an expense, optionally with a file of the given contents
+    """
+    user = get_user_model().objects.create_user(
+        email="user@example.com",
+        first_name="Test",
+        last_name="User",
+        password="pAssw0rd!",
+    )
+
+    def _add_expense(content=None, name="receipt.pdf"):
+        expense = Expense(
+            title="Chipotle",
+            amount="9.99",
+            category="Dinner",
+            incurred_on="2020-05-01",
+            created_by=user,
+        )
+        if content is None:
+            expense.save()
+        else:
+            expense.file.save(name, ContentFile(content))
+        return expense
+
+    return _add_expense
+
+
+@pytest.fixture()
+def no_processing():
+    with mock.patch("expense.tasks.process_receipt.delay"):
+        yield
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDedupedStorage:
+    def test_same_content_stored_once(self, local_storage, no_processing, add_expense):
+        """
+        Test identical uploads share one object, counted once per expense
+        """
+        first = add_expense(b"%PDF-1.4 one", "a.pdf")
+        second = add_expense(b"%PDF-1.4 one", "b.pdf")
+        other = add_expense(b"%PDF-1.4 two", "a.pdf")
+
+        assert first.file.name == second.file.name
+        assert first.file.name != other.file.name
+        assert first.file.name.endswith(".pdf")
+        assert StoredFile.objects.get(name=first.file.name).references == 2
+        assert StoredFile.objects.get(name=other.file.name).references == 1
+        assert second.file.read() == b"%PDF-1.4 one"
+
+    def test_delete_last_user_removes_file(
+        self, local_storage, no_processing, add_expense
+    ):
+        """
+        Test a shared object is only deleted with the last expense using it
+        """
+        first = add_expense(b"%PDF-1.4 one")
+        second = add_expense(b"%PDF-1.4 one")
+        name = first.file.name
+
+        first.delete()
+
+        assert default_storage.exists(name)
+        assert StoredFile.objects.get(name=name).references == 1
+
+        second.delete()
+
+        assert not default_storage.exists(name)
+        assert not StoredFile.objects.exists()
+
+    def test_replace_file_releases_previous(
+        self, local_storage, no_processing, add_expense
+    ):
+        """
+        Test replacing an expense's file releases the one it used
+        """
+        expense = add_expense(b"%PDF-1.4 one")
+        previous = expense.file.name
+
+        expense.file.save("new.pdf", ContentFile(b"%PDF-1.4 two"))
+
+        assert not default_storage.exists(previous)
+        assert StoredFile.objects.get().name == expense.file.name
+
+    def test_bulk_delete_releases_files(
+        self, local_storage, no_processing, add_expense
+    ):
+        """
+        Test a bulk delete releases each file once per expense using it
+        """
+        shared = [add_expense(b"%PDF-1.4 one") for _ in range(3)]
+        other = add_expense(b"%PDF-1.4 two")
+
+        bulk.delete(other.created_by, [shared[0].id, shared[1].id, other.id])
+
+        assert default_storage.exists(shared[2].file.name)
+        assert not default_storage.exists(other.file.name)
+        assert StoredFile.objects.get().references == 1
+
+    def test_same_content_uploaded_again(
+        self, local_storage, no_processing, add_expense
+    ):
+        """
+        Test uploading an expense's own file again still counts it once
+        """
+        expense = add_expense(b"%PDF-1.4 one")
+
+        expense.file.save("again.pdf", ContentFile(b"%PDF-1.4 one"))
+
+        assert StoredFile.objects.get(name=expense.file.name).references == 1
+
+    def test_failed_save_keeps_no_reference(
+        self, local_storage, no_processing, add_expense
+    ):
+        """
+        Test an upload whose expense is not saved is not counted
+        """
+        first = add_expense(b"%PDF-1.4 one")
+
+        with mock.patch("expense.signals.rollup.add", side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                add_expense(b"%PDF-1.4 one")
+            with pytest.raises(RuntimeError):
+                add_expense(b"%PDF-1.4 two")
+
+        assert Expense.objects.count() == 1
+        assert StoredFile.objects.get().references == 1
+
+        first.delete()
+
+        assert not default_storage.exists(first.file.name)
+        assert not StoredFile.objects.exists()
+
+    def test_released_file_reused(self, local_storage, no_processing, add_expense):
+        """
+        Test a file released and stored again before commit is kept
+        """
+        first = add_expense(b"%PDF-1.4 one")
+
+        with transaction.atomic():
+            first.delete()
+            second = add_expense(b"%PDF-1.4 one")
+
+        assert second.file.name == first.file.name
+        assert default_storage.exists(second.file.name)
+        assert StoredFile.objects.get().references == 1
+
+        second.delete()
+
+        assert not default_storage.exists(second.file.name)
+        assert not StoredFile.objects.exists()
+
+    def test_dedupe_command(self, local_storage, no_processing, add_expense):
+        """
+        Test files stored before deduplication are merged by content
+        """
+        stored = add_expense(b"%PDF-1.4 one")
+        legacy = []
+        for content in (b"%PDF-1.4 one", b"%PDF-1.4 two", b"%PDF-1.4 two"):
+            expense = add_expense()
+            expense.file.name = default_storage.save(
+                "media/legacy.pdf", ContentFile(content)
+            )
+            expense.save()
+            legacy.append(expense)
+
+        names = [expense.file.name for expense in legacy]
+
+        call_command("dedupe_receipts", "--dry-run", stdout=mock.MagicMock())
+        assert StoredFile.objects.count() == 1
+
+        call_command("dedupe_receipts", stdout=mock.MagicMock())
+
+        for expense in legacy:
+            expense.refresh_from_db()
+        assert legacy[0].file.name == stored.file.name
+        assert legacy[1].file.name == legacy[2].file.name
+        assert not default_storage.exists(names[0])
+        assert [default_storage.exists(name) for name in names[1:]].count(True) == 1
+        assert sorted(StoredFile.objects.values_list("references", flat=True)) == [
+            2,
+            2,
+        ]
+
+        legacy[1].delete()
+        legacy[2].delete()
+
+        assert not default_storage.exists(legacy[1].file.name)
@@ -0,0 +1,94 @@
+from app.throttling import ScopedBucketThrottle
+from django.contrib.auth import get_user_model
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+import pytest
+
+EXPENSE = {
+    "title": "Lunch",
+    "amount": "5.00",
+    "category": "Lunch",
+    "incurred_on": "2020-05-02",
+}
+
+
+@pytest.fixture()
+def rates(settings):
+    """
+    Sets low throttle rates
+    """
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            "login": "2/min",
+            "list": "2/min",
+            "write": "1/min",
+            "export": "1/min",
+        },
+    }
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    """
+    Stops the throttles' clock, to be moved on by hand
+    """
+    now = [1000.0]
+    monkeypatch.setattr(ScopedBucketThrottle, "timer", staticmethod(lambda: now[0]))
+    return now
+
+
+def client_of(email):
+    client = APIClient()
+    client.force_authenticate(
+        get_user_model().objects.create_user(
+            email=email, first_name="Test", last_name="User", password="pAssw0rd!"
+        )
+    )
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("rates")
+class TestThrottling:
+    def test_scopes_per_user(self, clock):
+        """
+        Test reads, writes and exports are limited apart, per user, and
+        allowed again once the bucket refilled
+        """
+        client = client_of("user@example.com")
+        assert client.get(reverse("expense")).status_code == 200
+        assert client.get(reverse("expense")).status_code == 200
+
+        limited = client.get(reverse("expense"))
+        assert limited.status_code == 429
+        assert limited["Retry-After"] == "30"
+
+        assert client.post(reverse("expense"), EXPENSE).status_code == 201
+        assert client.post(reverse("expense"), EXPENSE).status_code == 429
+        export = reverse("expense_export", kwargs={"file_format": "csv"})
+        assert client.get(export).status_code == 200
+        assert client.get(export).status_code == 429
+
+        assert client_of("other@example.com").get(reverse("expense")).status_code == 200
+
+        clock[0] += 30
+        assert client.get(reverse("expense")).status_code == 200
+        assert client.get(reverse("expense")).status_code == 429
+
+    def test_log_in_per_ip(self, clock):
+        """
+        Test logging in is limited per IP address, failed attempts included
+        """
+        data = {"email": "user@example.com", "password": "wrong"}
+        client = APIClient()
+        for _ in range(2):
+            assert client.post(reverse("log_in"), data).status_code == 401
+
+        limited = client.post(reverse("log_in"), data)
+        assert limited.status_code == 429
+        assert int(limited["Retry-After"]) == 30
+
+        other = client.post(reverse("log_in"), data, REMOTE_ADDR="10.0.0.2")
+        assert other.status_code == 401
@@ -0,0 +1,264 @@
+import io
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from expense.models import Expense
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from subscription.models import Subscription
+
+import pytest
+
+EXPENSE = {
+    "title": "Lunch",
+    "amount": "5.00",
+    "category": "Lunch",
+    "incurred_on": "2020-05-02",
+}
+SUBSCRIPTION = {
+    "title": "Netflix",
+    "price": "9.99",
+    "start_date": "2020-06-01",
+    "renewal_cycle_days": 30,
+}
+
+
+@pytest.fixture()
+def owner(settings, tmp_path, api_client):
+    """
+    Create an expense and a subscription of the test user
+    """
+    settings.DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.EXPENSE_RECEIPT_UPLOAD_BACKEND = "expense.uploads.LocalUploadBackend"
+
+    user = api_client.user
+
+    return SimpleNamespace(
+        user=user,
+        client=api_client,
+        expense=Expense.objects.create(created_by=user, **EXPENSE),
+        subscription=Subscription.objects.create(created_by=user, **SUBSCRIPTION),
+    )
+
+
+def expense_url(owner):
+    return reverse("expense_detail", kwargs={"expense_id": owner.expense.id})
+
+
+def subscription_url(owner):
+    return reverse(
+        "subscription_detail", kwargs={"subscription_id": owner.subscription.id}
+    )
+
+
+def request_upload(owner):
+    return owner.client.post(
+        reverse("expense_receipt_upload", kwargs={"expense_id": owner.expense.id}),
+        {"filename": "r.png", "content_type": "image/png", "size": 4},
+        format="json",
+    )
+
+
+def upload_receipt(owner):
+    """
+    Uploads a receipt through a local upload URL and returns its key
+    """
+    upload = request_upload(owner).data
+    owner.client.put(upload["url"], b"\x89PNG", content_type="image/png")
+    return upload["key"]
+
+
+def import_file():
+    file = io.BytesIO(
+        b"title,amount,category,incurred_on\nTea,2.00,Drinks,2020-05-03\n"
+    )
+    file.name = "expenses.csv"
+    return file
+
+
+def read(resp):
+    # Streaming responses run their queries as they are consumed.
+    if resp.streaming:
+        b"".join(resp.streaming_content)
+    return resp
+
+
+ENDPOINTS = {
+    "expense list": (2, lambda o: o.client.get(reverse("expense"))),
+    "expense create": (
+        4,
+        lambda o: o.client.post(reverse("expense"), EXPENSE, format="json"),
+    ),
+    "expense detail": (2, lambda o: o.client.get(expense_url(o))),
+    "expense update": (
+        3,
+        lambda o: o.client.put(expense_url(o), EXPENSE, format="json"),
+    ),
+    "expense partial update": (
+        3,
+        lambda o: o.client.patch(expense_url(o), {"title": "Tea"}, format="json"),
+    ),
+    "expense delete": (6, lambda o: o.client.delete(expense_url(o))),
+    "expense summary": (4, lambda o: o.client.get(reverse("expense_summary")),),
+    "expense bulk create": (
+        4,
+        lambda o: o.client.post(reverse("expense_bulk"), [EXPENSE], format="json"),
+    ),
+    "expense bulk update": (
+        7,
+        lambda o: o.client.patch(
+            reverse("expense_bulk"),
+            [{"id": o.expense.id, "title": "Tea"}],
+            format="json",
+        ),
+    ),
+    "expense bulk delete": (
+        7,
+        lambda o: o.client.delete(
+            reverse("expense_bulk"), [o.expense.id], format="json"
+        ),
+    ),
+    "expense import": (
+        3,
+        lambda o: o.client.post(
+            reverse("expense_import"), {"file": import_file()}, format="multipart"
+        ),
+    ),
+    "expense export": (
+        1,
+        lambda o: read(
+            o.client.get(reverse("expense_export", kwargs={"file_format": "csv"}))
+        ),
+    ),
+    "receipt upload URL": (1, request_upload),
+    "receipt attach": (
+        5,
+        lambda o: o.client.put(
+            reverse("expense_receipt", kwargs={"expense_id": o.expense.id}),
+            {"key": o.receipt_key},
+            format="json",
+        ),
+    ),
+    "subscription list": (2, lambda o: o.client.get(reverse("subscription"))),
+    "subscription create": (
+        1,
+        lambda o: o.client.post(reverse("subscription"), SUBSCRIPTION, format="json"),
+    ),
+    "subscription detail": (2, lambda o: o.client.get(subscription_url(o))),
+    "subscription update": (
+        2,
+        lambda o: o.client.put(subscription_url(o), SUBSCRIPTION, format="json"),
+    ),
+    "subscription delete": (3, lambda o: o.client.delete(subscription_url(o))),
+    "subscription forecast": (
+        1,
+        lambda o: o.client.get(reverse("subscription_forecast")),
+    ),
+    "subscription export": (
+        1,
+        lambda o: read(
+            o.client.get(
+                reverse("subscription_export", kwargs={"file_format": "ndjson"})
+            )
+        ),
+    ),
+    "outbox metrics": (4, lambda o: o.client.get(reverse("outbox_metrics"))),
+    "sync": (2, lambda o: o.client.get(reverse("sync"))),
+    "sign up": (
+        2,
+        lambda o: APIClient().post(
+            reverse("sign_up"),
+            {
+                "email": "new@example.com",
+                "first_name": "New",
+                "last_name": "User",
+                "password1": "pAssw0rd!",
+                "password2": "pAssw0rd!",
+            },
+            format="json",
+        ),
+    ),
+    "log in": (
+        1,
+        lambda o: APIClient().post(
+            reverse("log_in"),
+            {"email": "user@example.com", "password": "pAssw0rd!"},
+            format="json",
+        ),
+    ),
+    "token refresh": (
+        0,
+        lambda o: APIClient().post(
+            reverse("token_refresh"),
+            {"refresh": str(RefreshToken.for_user(o.user))},
+            format="json",
+        ),
+    ),
+}
+
+
+# Requests an endpoint needs made before its own, left out of its count.
+SETUP = {
+    "receipt attach": lambda o: setattr(o, "receipt_key", upload_receipt(o)),
+    "outbox metrics": lambda o: setattr(o.user, "is_staff", True),
+}
+
+
+def queries_of(request):
+    """
+    Returns the response of a request and the queries it ran, leaving out
+    the savepoints that only exist because the test runs in a transaction
+    """
+    with CaptureQueriesContext(connection) as context:
+        resp = request()
+
+    return resp, [q["sql"] for q in context if "SAVEPOINT" not in q["sql"]]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_query_count(endpoint, owner):
+    """
+    Test the number of queries of each endpoint
+    """
+    expected, request = ENDPOINTS[endpoint]
+    if endpoint in SETUP:
+        SETUP[endpoint](owner)
+
+    resp, queries = queries_of(lambda: request(owner))
+
+    assert resp.status_code < 400
+    assert len(queries) == expected, "\n".join(queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ("get", "put", "patch", "delete"))
+@pytest.mark.parametrize("url", (expense_url, subscription_url))
+def test_other_users_object(method, url, owner):
+    """
+    Test other users get a 404 from the owner-filtered lookup alone, without
+    their object or its owner being loaded
+    """
+    other = get_user_model().objects.create_user(
+        email="other@example.com",
+        first_name="Test",
+        last_name="User",
+        password="pAssw0rd!",
+    )
+    client = APIClient()
+    client.force_authenticate(other)
+    data = EXPENSE if url is expense_url else SUBSCRIPTION
+
+    resp, queries = queries_of(
+        lambda: getattr(client, method)(url(owner), data, format="json")
+    )
+
+    assert resp.status_code == 404
+    # A GET first looks for the object's validators, then the object itself.
+    assert len(queries) == (2 if method == "get" else 1)
+    assert all(f'created_by_id" = {other.pk}' in query for query in queries)
+    assert all("account_customuser" not in query for query in queries)
@@ -0,0 +1,245 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from expense.models import Expense
+from expense.views import ExpenseList
+from subscription.models import Subscription
+from subscription.views import SubscriptionList
+from subscription import reminders
+from subscription.functions import next_renewal_after
+from sync import changes
+from sync.models import Tombstone
+
+import re
+
+import pytest
+
+
+SEQUENTIAL_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (?:TABLE )?(\w+)"),
+}
+
+
+@pytest.fixture()
+def create_user():
+    """
+    Create test users
+    """
+
+    def _create_user(email):
+        return get_user_model().objects.create_user(
+            email=email, first_name="Test", last_name="User", password="pAssw0rd!"
+        )
+
+    return _create_user
+
+
+@pytest.fixture()
+def seeded_user(create_user):
+    """
+    Seed expenses and subscriptions for several users and return one of them
+    """
+    start = date(2020, 1, 1)
+    users = [create_user(f"user{num}@example.com") for num in range(5)]
+
+    for user in users:
+        Expense.objects.bulk_create(
+            Expense(
+                title=f"Expense {num}",
+                amount="9.99",
+                category=f"Category {num % 10}",
+                incurred_on=start + timedelta(days=num),
+                created_by=user,
+            )
+            for num in range(200)
+        )
+        Subscription.objects.bulk_create(
+            Subscription(
+                title=f"Subscription {num}",
+                price="9.99",
+                start_date=start + timedelta(days=num),
+                renewal_cycle_days=30,
+                created_by=user,
+            )
+            for num in range(50)
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    return users[0]
+
+
+@pytest.fixture()
+def assert_no_sequential_scan():
+    """
+    Assert a queryset's plan, or the plan of updating it with the given
+    values, never falls back to a sequential table scan
+    """
+
+    def _assert_no_sequential_scan(queryset, **values):
+        if connection.vendor not in SEQUENTIAL_SCAN:
+            pytest.skip(f"No plan check for {connection.vendor}")
+
+        if connection.vendor == "postgresql":
+            # A missing index still shows up as a Seq Scan with this disabled,
+            # while an available one is always preferred on the small dataset.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+        if values:
+            query = queryset.query.chain(UpdateQuery)
+            query.add_update_values(values)
+            statement, params = query.get_compiler(queryset.db).as_sql()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"{connection.ops.explain_query_prefix()} {statement}", params
+                )
+                plan = "\n".join(" ".join(map(str, row)) for row in cursor.fetchall())
+        else:
+            plan = queryset.explain()
+        scans = SEQUENTIAL_SCAN[connection.vendor].findall(plan)
+
+        assert not scans, f"Sequential scan on {scans}:\n{plan}"
+
+    return _assert_no_sequential_scan
+
+
+def get_view_queryset(view_class, user):
+    """
+    Returns a list view's queryset ordered as its pagination orders it
+    """
+    view = view_class()
+    view.request = SimpleNamespace(user=user)
+    ordering = view.pagination_class.ordering
+
+    return view.get_queryset().order_by(*ordering)
+
+
+@pytest.mark.django_db
+class TestQueryPlan:
+    def test_check_detects_sequential_scan(self, seeded_user):
+        """
+        Test the plan check itself flags an unindexed lookup
+        """
+        if connection.vendor not in SEQUENTIAL_SCAN:
+            pytest.skip(f"No plan check for {connection.vendor}")
+
+        plan = Expense.objects.filter(notes="unindexed").explain()
+
+        assert SEQUENTIAL_SCAN[connection.vendor].search(plan)
+
+    def test_expense_list_first_page(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test first page of the expense list uses an index
+        """
+        queryset = get_view_queryset(ExpenseList, seeded_user)
+
+        assert_no_sequential_scan(queryset[:51])
+
+    def test_expense_list_deep_page(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test a cursor page deep into the expense list uses an index
+        """
+        queryset = get_view_queryset(ExpenseList, seeded_user)
+
+        assert_no_sequential_scan(
+            queryset.filter(incurred_on__gt=date(2020, 6, 1))[:51]
+        )
+
+    def test_expense_category_filter(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test filtering a user's expenses by category uses an index
+        """
+        queryset = Expense.objects.filter(created_by=seeded_user, category="Category 1")
+
+        assert_no_sequential_scan(queryset)
+
+    def test_expense_date_range(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test a date-range report over a user's expenses uses an index
+        """
+        queryset = Expense.objects.filter(
+            created_by=seeded_user,
+            incurred_on__range=(date(2020, 2, 1), date(2020, 2, 29)),
+        )
+
+        assert_no_sequential_scan(queryset)
+
+    def test_expense_amount_range(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test an amount range over a user's expenses uses an index
+        """
+        queryset = Expense.objects.filter(
+            created_by=seeded_user, amount__gte=5, amount__lte=15
+        ).order_by("amount", "id")
+
+        assert_no_sequential_scan(queryset[:51])
+
+    def test_expense_detail(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test the expense detail lookup uses an index
+        """
+        expense = Expense.objects.filter(created_by=seeded_user).first()
+
+        assert_no_sequential_scan(Expense.objects.filter(pk=expense.pk))
+
+    def test_subscription_list(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test pages of the subscription list use an index
+        """
+        queryset = get_view_queryset(SubscriptionList, seeded_user)
+
+        assert_no_sequential_scan(queryset[:51])
+        assert_no_sequential_scan(
+            queryset.filter(start_date__gt=date(2020, 1, 20))[:51]
+        )
+
+    def test_subscription_detail(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test the subscription detail lookup uses an index
+        """
+        subscription = Subscription.objects.filter(created_by=seeded_user).first()
+
+        assert_no_sequential_scan(Subscription.objects.filter(pk=subscription.pk))
+
+    def test_email_reminder_lookup(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test the reminder job's renewal lookup and renewal UPDATE use indexes
+        """
+        after, until = date(2020, 1, 8), date(2020, 1, 10)
+        subscriptions = Subscription.objects.filter(
+            created_by__gte=seeded_user.pk, created_by__lte=seeded_user.pk + 1
+        )
+
+        assert_no_sequential_scan(
+            reminders.renewal_rows(
+                reminders.renewing_between(subscriptions, after, until)
+            )
+        )
+        assert_no_sequential_scan(
+            subscriptions.filter(
+                start_date__lte=until, created_by__in=[seeded_user.pk]
+            ),
+            start_date=next_renewal_after(until),
+            updated=timezone.now(),
+        )
+
+    def test_sync_changes(self, seeded_user, assert_no_sequential_scan):
+        """
+        Test a delta sync's lookups of changes and deletions use indexes
+        """
+        since = timezone.now() - timedelta(hours=1)
+        position = (since.isoformat(), 1)
+
+        for queryset in changes.changed(seeded_user, since).values():
+            assert_no_sequential_scan(changes.following(queryset, ())[:501])
+            assert_no_sequential_scan(changes.following(queryset, position)[:501])
+        assert_no_sequential_scan(
+            Tombstone.objects.filter(user_id=seeded_user.pk, deleted__gte=date.today())
+        )
@@ -0,0 +1,146 @@
+import time
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from subscription import outbox
+from subscription.models import OutboxEmail
+
+import pytest
+
+
+@pytest.fixture()
+def queue_emails():
+    """
+    Queue test e-mails in the outbox
+    """
+
+    def _queue_emails(count):
+        return outbox.enqueue(
+            ("Reminder", f"Body {num}", "noreply@email.com", f"user{num}@example.com")
+            for num in range(count)
+        )
+
+    return _queue_emails
+
+
+@pytest.mark.django_db
+class TestOutbox:
+    def test_drain_sends_every_email(self, queue_emails):
+        """
+        Test the sender drains the outbox in batches across connections
+        """
+        queue_emails(7)
+
+        stats = outbox.drain(batch_size=3, concurrency=2)
+
+        assert stats == {"sent": 7, "retried": 0, "failed": 0}
+        assert sorted(m.to[0] for m in mail.outbox) == sorted(
+            f"user{num}@example.com" for num in range(7)
+        )
+        assert not OutboxEmail.objects.exclude(status=OutboxEmail.SENT).exists()
+        assert outbox.drain() == {"sent": 0, "retried": 0, "failed": 0}
+
+    def test_drain_retries_with_backoff(self, queue_emails):
+        """
+        Test failed e-mails are retried later, then given up on
+        """
+        queue_emails(1)
+        email = OutboxEmail.objects.get()
+        fail = mock.patch.object(
+            EmailBackend, "send_messages", side_effect=SMTPServerDisconnected("down")
+        )
+
+        with fail:
+            assert outbox.drain(max_attempts=2)["retried"] == 1
+
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.PENDING
+        assert email.attempts == 1
+        assert email.last_error == "down"
+        assert email.next_attempt_at > timezone.now() + timedelta(seconds=50)
+        # Not due again until the backoff has passed.
+        assert outbox.drain() == {"sent": 0, "retried": 0, "failed": 0}
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        with fail:
+            assert outbox.drain(max_attempts=2)["failed"] == 1
+
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.FAILED
+        assert len(mail.outbox) == 0
+
+    def test_claimed_emails_are_leased(self, queue_emails):
+        """
+        Test a claimed batch is not claimed again while it is being sent
+        """
+        queue_emails(2)
+
+        assert len(outbox.claim(10, timedelta(minutes=1))) == 2
+        assert outbox.claim(10, timedelta(minutes=1)) == []
+
+    def test_slow_batch_keeps_its_claim(self, queue_emails):
+        """
+        Test a batch's claim is renewed while a slow mail server sends it
+        """
+        queue_emails(2)
+        send = EmailBackend.send_messages
+
+        def slow_send(backend, messages):
+            time.sleep(0.5)
+            return send(backend, messages)
+
+        with mock.patch.object(EmailBackend, "send_messages", slow_send):
+            with mock.patch.object(outbox, "renew", wraps=outbox.renew) as renew:
+                stats = outbox.drain(concurrency=1, retry_delay=timedelta(seconds=0.3))
+
+        assert stats == {"sent": 2, "retried": 0, "failed": 0}
+        assert renew.call_count >= 3
+        assert len(mail.outbox) == 2
+
+    def test_rate_limiter_spaces_calls(self):
+        """
+        Test rate limiters of one outbox hold calls to the configured rate
+        together, as in separate senders
+        """
+        limiters = [outbox.RateLimiter(100), outbox.RateLimiter(100)]
+
+        with mock.patch("subscription.outbox.time.sleep") as sleep:
+            for limiter in (*limiters, limiters[0]):
+                limiter.wait()
+
+        delays = [call.args[0] for call in sleep.call_args_list]
+        assert delays[0] == 0
+        assert delays[2] == pytest.approx(0.02, abs=0.005)
+
+    def test_metrics(self, client, queue_emails):
+        """
+        Test outbox metrics are reported to staff only
+        """
+        queue_emails(3)
+        outbox.drain(max_batches=1, batch_size=2)
+
+        user = get_user_model().objects.create_user(
+            email="user@example.com",
+            first_name="Test",
+            last_name="User",
+            password="pAssw0rd!",
+        )
+        client.force_login(user)
+        assert client.get(reverse("outbox_metrics")).status_code == 403
+
+        user.is_staff = True
+        user.save()
+        resp = client.get(reverse("outbox_metrics"))
+
+        assert resp.status_code == 200
+        assert resp.data["pending"] == 1
+        assert resp.data["failed"] == 0
+        assert resp.data["sent_in_window"] == 2
+        assert resp.data["max_send_ms"] is not None
@@ -1,6 +1,13 @@
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
 from django.contrib.auth import get_user_model
+from subscription.forecast import forecast
 from subscription.models import Subscription
 from rest_framework.reverse import reverse
+from types import SimpleNamespace
+
+import json
 
 import pytest
 
@@ -181,8 +188,8 @@ def test_get_all_subscription(
     resp = client.get(f"/api/subscription/", headers=headers)
 
     assert resp.status_code == 200
-    assert resp.data[0]["title"] == subscription_one.title
-    assert resp.data[1]["title"] == subscription_two.title
+    assert resp.data["results"][0]["title"] == subscription_one.title
+    assert resp.data["results"][1]["title"] == subscription_two.title
 
 
 @pytest.mark.django_db
@@ -216,7 +223,7 @@ def test_delete_subscription(
 
     resp_three = client.get(f"/api/subscription/", headers=headers)
     assert resp_three.status_code == 200
-    assert len(resp_three.data) == 0
+    assert len(resp_three.data["results"]) == 0
 
 
 @pytest.mark.django_db
@@ -260,3 +267,180 @@ def test_update_subscription(
     assert resp_two.status_code == 200
     assert resp_two.data["title"] == "Netflix"
     assert resp_two.data["start_date"] == "2020-06-05"
+
+
+@pytest.mark.django_db
+def test_get_all_subscription_paginated(
+    client, create_user, login_user, add_subscription, generate_headers
+):
+    """
+    Test subscriptions are paged by (start_date, id) with opaque cursors
+    """
+    user = create_user
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    for title, start_date in (
+        ("Spotify", "2020-06-03"),
+        ("Netflix", "2020-06-01"),
+        ("Hulu", "2020-06-02"),
+    ):
+        add_subscription(
+            title=title,
+            price="9.99",
+            start_date=start_date,
+            renewal_cycle_days=30,
+            created_by=user,
+        )
+
+    resp = client.get("/api/subscription/", {"page_size": 2}, headers=headers)
+
+    assert resp.status_code == 200
+    assert [s["title"] for s in resp.data["results"]] == ["Netflix", "Hulu"]
+
+    resp_two = client.get(resp.data["next"], headers=headers)
+
+    assert resp_two.status_code == 200
+    assert resp_two.data["next"] is None
+    assert [s["title"] for s in resp_two.data["results"]] == ["Spotify"]
+
+
+@pytest.mark.django_db
+def test_subscription_forecast(
+    client, create_user, login_user, add_subscription, generate_headers
+):
+    """
+    Test forecast buckets renewals by month and by subscription
+    """
+    user = create_user
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    add_subscription(
+        title="Spotify",
+        price="9.99",
+        start_date="2020-06-01",
+        renewal_cycle_days=30,
+        created_by=user,
+    )
+    add_subscription(
+        title="Netflix",
+        price="15.00",
+        start_date="2020-06-20",
+        renewal_cycle_days=90,
+        created_by=user,
+    )
+
+    resp = client.get(
+        "/api/subscription/forecast/",
+        {"start": "2020-06-01", "months": 3},
+        headers=headers,
+    )
+
+    assert resp.status_code == 200
+    assert resp.data["end"] == "2020-09-01"
+    assert resp.data["total"] == "54.96"
+    assert [(m["month"], m["charges"], m["total"]) for m in resp.data["by_month"]] == [
+        ("2020-06", 2, "24.99"),
+        ("2020-07", 2, "19.98"),
+        ("2020-08", 1, "9.99"),
+    ]
+
+    spotify, netflix = resp.data["by_subscription"]
+    assert spotify["title"] == "Spotify"
+    assert spotify["total"] == "39.96"
+    assert [m["charges"] for m in netflix["months"]] == [1, 0, 0]
+
+
+@pytest.mark.django_db
+def test_subscription_forecast_invalid(client, login_user, generate_headers):
+    """
+    Test forecast rejects horizons out of range
+    """
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    resp = client.get("/api/subscription/forecast/", {"months": 0}, headers=headers)
+
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_subscription_export(
+    client, create_user, login_user, add_subscription, generate_headers
+):
+    """
+    Test subscriptions stream as filtered NDJSON in renewal date order
+    """
+    user = create_user
+    response = login_user
+
+    access = response.data["access"]
+    headers = generate_headers(access)
+
+    for title, start_date, cycle in (
+        ("Spotify", "2020-06-20", 30),
+        ("Netflix", "2020-06-01", 90),
+        ("Hulu", "2020-08-01", 30),
+    ):
+        add_subscription(
+            title=title,
+            price="9.99",
+            start_date=start_date,
+            renewal_cycle_days=cycle,
+            created_by=user,
+        )
+
+    resp = client.get(
+        "/api/subscription/export.ndjson",
+        {"start_date_before": "2020-07-01"},
+        headers=headers,
+    )
+
+    assert resp.status_code == 200
+    rows = [json.loads(line) for line in b"".join(resp.streaming_content).splitlines()]
+    assert [(row["title"], row["start_date"]) for row in rows] == [
+        ("Netflix", "2020-06-01"),
+        ("Spotify", "2020-06-20"),
+    ]
+
+    resp = client.get("/api/subscription/export.csv", {"sort": "title"})
+
+    assert resp.status_code == 400
+
+
+def test_forecast_matches_daily_schedule():
+    """
+    Test closed-form monthly counts equal walking the schedule day by day
+    """
+    subscriptions = [
+        SimpleNamespace(
+            id=cycle,
+            title=str(cycle),
+            price=Decimal("1.00"),
+            start_date=date(2019, 11, 17) + timedelta(days=cycle // 3),
+            renewal_cycle_days=cycle,
+        )
+        for cycle in (30, 60, 90, 120, 150, 180)
+    ]
+    start = date(2020, 1, 15)
+
+    result = forecast(subscriptions, start, months=24)
+
+    for sub, projected in zip(subscriptions, result["by_subscription"]):
+        expected = Counter()
+        renewal = sub.start_date
+        while renewal < result["end"]:
+            if renewal >= start:
+                expected[renewal.replace(day=1)] += 1
+            renewal += timedelta(days=sub.renewal_cycle_days)
+
+        assert {
+            m["month"]: m["charges"] for m in projected["months"] if m["charges"]
+        } == dict(expected)
@@ -0,0 +1,171 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from expense.models import Expense
+from rest_framework.reverse import reverse
+from subscription.models import Subscription
+from sync import changes
+from sync.models import Tombstone
+
+import pytest
+
+
+@pytest.fixture()
+def synced(api_client):
+    """
+    Create an expense and a subscription last saved an hour ago, and return
+    a watermark taken after that
+    """
+    Expense.objects.create(
+        title="Chipotle",
+        amount="9.99",
+        category="Dinner",
+        incurred_on="2020-05-01",
+        created_by=api_client.user,
+    )
+    Subscription.objects.create(
+        title="Spotify",
+        price="9.99",
+        start_date="2020-06-01",
+        renewal_cycle_days=30,
+        created_by=api_client.user,
+    )
+    now = timezone.now()
+    Expense.objects.update(updated=now - timedelta(hours=1))
+    Subscription.objects.update(updated=now - timedelta(hours=1))
+
+    return (now - timedelta(minutes=30)).isoformat()
+
+
+def sync(client, since=None):
+    return client.get(reverse("sync"), {"since": since} if since else {})
+
+
+@pytest.mark.django_db
+class TestSync:
+    def test_full_sync(self, api_client, synced):
+        """
+        Test a sync without a watermark returns everything
+        """
+        resp = sync(api_client)
+
+        assert resp.status_code == 200
+        assert resp.data["reset"] is True
+        assert [e["title"] for e in resp.data["expenses"]] == ["Chipotle"]
+        assert [s["title"] for s in resp.data["subscriptions"]] == ["Spotify"]
+        assert resp.data["subscriptions"][0]["id"]
+        assert resp.data["watermark"]
+
+    def test_no_changes(self, api_client, synced, django_assert_num_queries):
+        """
+        Test a sync with nothing new runs one indexed query per table
+        """
+        with django_assert_num_queries(3):
+            resp = sync(api_client, synced)
+
+        assert resp.data["reset"] is False
+        assert resp.data["expenses"] == []
+        assert resp.data["subscriptions"] == []
+        assert resp.data["deleted"] == {"expenses": [], "subscriptions": []}
+
+    def test_changes_since(self, api_client, synced):
+        """
+        Test only saved objects and ids of deleted ones are returned
+        """
+        expense = Expense.objects.get()
+        expense.title = "Renamed"
+        expense.save()
+        subscription = Subscription.objects.get()
+        subscription_id = subscription.id
+        subscription.delete()
+
+        resp = sync(api_client, synced)
+
+        assert [e["id"] for e in resp.data["expenses"]] == [expense.id]
+        assert resp.data["expenses"][0]["title"] == "Renamed"
+        assert resp.data["subscriptions"] == []
+        assert resp.data["deleted"] == {
+            "expenses": [],
+            "subscriptions": [subscription_id],
+        }
+
+    def test_expired_watermark(self, api_client, synced, settings):
+        """
+        Test a watermark older than the tombstones kept resets the client
+        """
+        since = timezone.now() - timedelta(
+            days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1
+        )
+
+        resp = sync(api_client, since.isoformat())
+
+        assert resp.data["reset"] is True
+        assert len(resp.data["expenses"]) == 1
+
+    def test_other_users_changes(self, api_client, synced):
+        """
+        Test a sync only returns the user's own changes
+        """
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            first_name="Test",
+            last_name="User",
+            password="pAssw0rd!",
+        )
+        api_client.force_authenticate(other)
+
+        resp = sync(api_client, synced)
+
+        assert resp.data["expenses"] == []
+        assert resp.data["subscriptions"] == []
+
+    def test_full_sync_paged(self, api_client, synced, settings):
+        """
+        Test a sync returns a page of each kind at a time, continuing from
+        `next` with the first page's watermark
+        """
+        settings.SYNC_PAGE_SIZE = 2
+        for num in range(4):
+            Expense.objects.create(
+                title=f"Expense {num}",
+                amount="9.99",
+                category="Dinner",
+                incurred_on="2020-05-01",
+                created_by=api_client.user,
+            )
+        # Saved at the same time, as bulk updates save them.
+        Expense.objects.update(updated=timezone.now())
+
+        pages = [sync(api_client).data]
+        while pages[-1]["next"]:
+            resp = api_client.get(reverse("sync"), {"cursor": pages[-1]["next"]})
+            pages.append(resp.data)
+
+        assert len(pages) == 3
+        assert [page["reset"] for page in pages] == [True, False, False]
+        assert {page["watermark"] for page in pages} == {pages[0]["watermark"]}
+        assert sorted(e["id"] for page in pages for e in page["expenses"]) == sorted(
+            Expense.objects.values_list("id", flat=True)
+        )
+        assert [len(page["subscriptions"]) for page in pages] == [1, 0, 0]
+
+    def test_invalid_watermark(self, api_client):
+        assert sync(api_client, "yesterday").status_code == 400
+        resp = api_client.get(reverse("sync"), {"cursor": "forged"})
+        assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_deleting_user_and_pruning(api_client, synced):
+    """
+    Test deleting a user keeps tombstones of their objects until pruned
+    """
+    api_client.user.delete()
+
+    assert Tombstone.objects.count() == 2
+
+    Tombstone.objects.update(deleted=changes.retained_since() - timedelta(days=1))
+    changes.prune(changes.retained_since())
+
+    assert not Tombstone.objects.exists()
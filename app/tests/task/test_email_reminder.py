@@ -1,10 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.core import mail
 from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from datetime import timedelta, datetime
 from io import StringIO
 
-from subscription.models import Subscription
-from subscription.management.commands.email_reminder import Command
+from app import caching
+from subscription.models import OutboxEmail, ReminderWatermark, Subscription
+from subscription import reminders
 
 import pytest
 
@@ -19,6 +23,26 @@ def create_user(email="user@example.com", password="pAssw0rd!"):
     )
 
 
+@pytest.fixture()
+def create_users():
+    """
+    Create several test users
+    """
+
+    def _create_users(count):
+        return [
+            get_user_model().objects.create_user(
+                email=f"user{num}@example.com",
+                first_name="Test",
+                last_name="User",
+                password="pAssw0rd!",
+            )
+            for num in range(count)
+        ]
+
+    return _create_users
+
+
 @pytest.fixture()
 def add_subscription():
     """
@@ -39,22 +63,24 @@ def add_subscription():
 
 
 @pytest.fixture()
-def get_subcriptions_by_date():
+def get_reminders():
     """
-    Get all subscriptions by length from current date
+    Get the reminder each user gets for their subscriptions
     """
 
-    def _get_subcriptions_by_date(self, subsction_days_length):
-        subs = Command.check_subscriptions(self, subsction_days_length)
-        return subs
+    def _get_reminders(subscriptions):
+        return {
+            email: reminders.render_reminder(renewals)
+            for _, email, renewals in reminders.user_renewals(subscriptions, 100)
+        }
 
-    return _get_subcriptions_by_date
+    return _get_reminders
 
 
 @pytest.mark.django_db
 class TestEmailReminder:
     def test_command_output_one_week_away(
-        self, create_user, add_subscription, get_subcriptions_by_date
+        self, create_user, add_subscription, get_reminders
     ):
         """
         Test custom admin command for subscriptions one week away
@@ -73,11 +99,13 @@ class TestEmailReminder:
             created_by=user,
         )
 
-        subs = get_subcriptions_by_date(self, subscriptions_week_away)
+        subs = get_reminders(subscriptions_week_away)
         assert len(subs) is not None
         assert (
             subs["user@example.com"]
-            == "Your Spotify will be renewed on " + str(date_one_week)[:10] + " \n"
+            == "Upcoming payment dates: \nYour Spotify will be renewed on "
+            + str(date_one_week)[:10]
+            + " \n"
         )
 
         out = StringIO()
@@ -85,7 +113,7 @@ class TestEmailReminder:
         assert out.getvalue() == "E-mail Report was sent.\n"
 
     def test_command_output_two_days_away(
-        self, create_user, add_subscription, get_subcriptions_by_date
+        self, create_user, add_subscription, get_reminders
     ):
         """
         Test custom admin command for subscriptions two days away
@@ -106,11 +134,13 @@ class TestEmailReminder:
             created_by=user,
         )
 
-        subs = get_subcriptions_by_date(self, subscriptions_two_days_away)
+        subs = get_reminders(subscriptions_two_days_away)
         assert len(subs) is not None
         assert (
             subs["user@example.com"]
-            == "Your Spotify will be renewed on " + str(date_two_days)[:10] + " \n"
+            == "Upcoming payment dates: \nYour Spotify will be renewed on "
+            + str(date_two_days)[:10]
+            + " \n"
         )
 
         out = StringIO()
@@ -120,3 +150,178 @@ class TestEmailReminder:
         updated_sub = Subscription.objects.filter(created_by=user)
         assert_date = date_two_days + timedelta(days=30)
         assert updated_sub[0].start_date == datetime.date(assert_date)
+
+    def test_command_one_email_per_user(self, create_users, add_subscription):
+        """
+        Test each user gets one e-mail listing all of their renewals
+        """
+        date_two_days = datetime.now() + timedelta(days=2)
+        users = create_users(3)
+
+        for user in users:
+            for title, cycle in (("Spotify", 30), ("Netflix", 90)):
+                add_subscription(
+                    title=title,
+                    price="9.99",
+                    start_date=date_two_days,
+                    renewal_cycle_days=cycle,
+                    created_by=user,
+                )
+
+        out = StringIO()
+        call_command("email_reminder", batch_size=2, stdout=out)
+
+        assert out.getvalue() == "E-mail Report was sent.\n" * 3
+        assert sorted(m.to[0] for m in mail.outbox) == sorted(u.email for u in users)
+        assert mail.outbox[0].body.count("will be renewed on") == 2
+
+        renewed = {
+            sub.renewal_cycle_days: sub.start_date
+            for sub in Subscription.objects.filter(created_by=users[0])
+        }
+        assert renewed[30] == datetime.date(date_two_days + timedelta(days=30))
+        assert renewed[90] == datetime.date(date_two_days + timedelta(days=90))
+
+    def test_command_advances_owners_in_batches(self, create_users, add_subscription):
+        """
+        Test renewals are advanced, and their owners' responses invalidated,
+        one batch of owners at a time
+        """
+        date_two_days = datetime.now() + timedelta(days=2)
+        users = create_users(5)
+
+        for user in users:
+            add_subscription(
+                title="Spotify",
+                price="9.99",
+                start_date=date_two_days,
+                renewal_cycle_days=30,
+                created_by=user,
+            )
+        versions = {user.pk: caching.get_version(user.pk) for user in users}
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command(
+                "email_reminder", batch_size=2, queue_only=True, stdout=StringIO()
+            )
+
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        assert len(updates) == 3
+        assert set(Subscription.objects.values_list("start_date", flat=True)) == {
+            datetime.date(date_two_days + timedelta(days=30))
+        }
+        assert all(
+            caching.get_version(user_id) != version
+            for user_id, version in versions.items()
+        )
+
+    def test_command_query_count(self, create_users, add_subscription):
+        """
+        Test the number of queries does not grow with the number of users
+        """
+        date_one_week = datetime.now() + timedelta(weeks=1)
+        date_two_days = datetime.now() + timedelta(days=2)
+
+        for user in create_users(10):
+            for start_date in (date_one_week, date_two_days):
+                add_subscription(
+                    title="Spotify",
+                    price="9.99",
+                    start_date=start_date,
+                    renewal_cycle_days=30,
+                    created_by=user,
+                )
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command("email_reminder", queue_only=True, stdout=StringIO())
+
+        # One SELECT of the users due; per reminder kind: one joined SELECT,
+        # one locking the users, one SELECT of deliveries, one INSERT into
+        # the outbox and one of deliveries; then one SELECT of the owners
+        # whose cached responses go stale and one UPDATE.
+        assert len([q for q in queries if "SAVEPOINT" not in q["sql"]]) == 13
+        assert OutboxEmail.objects.count() == 20
+        assert len(mail.outbox) == 0
+
+    def test_command_catch_up(self, create_users, add_subscription):
+        """
+        Test catch-up mode processes every renewal due since the watermark
+        """
+        today = datetime.now().date()
+        ReminderWatermark.objects.create(
+            job="email_reminder", processed_on=today - timedelta(days=5)
+        )
+        user_one, user_two = create_users(2)
+
+        missed = add_subscription(
+            title="Spotify",
+            price="9.99",
+            start_date=today - timedelta(days=1),
+            renewal_cycle_days=30,
+            created_by=user_one,
+        )
+        behind = add_subscription(
+            title="Hulu",
+            price="9.99",
+            start_date=today - timedelta(days=100),
+            renewal_cycle_days=30,
+            created_by=user_one,
+        )
+        upcoming = add_subscription(
+            title="Netflix",
+            price="9.99",
+            start_date=today + timedelta(days=4),
+            renewal_cycle_days=30,
+            created_by=user_two,
+        )
+
+        call_command("email_reminder", catch_up=True, stdout=StringIO())
+
+        reminders = {m.to[0]: m for m in mail.outbox}
+        assert len(mail.outbox) == 2
+        assert "Spotify" in reminders[user_one.email].body
+        assert "Hulu" not in reminders[user_one.email].body
+        assert "two days" in reminders[user_one.email].subject
+        assert "one week" in reminders[user_two.email].subject
+
+        missed.refresh_from_db()
+        behind.refresh_from_db()
+        upcoming.refresh_from_db()
+        assert missed.start_date == today + timedelta(days=29)
+        assert behind.start_date == today + timedelta(days=20)
+        assert upcoming.start_date == today + timedelta(days=4)
+        assert ReminderWatermark.objects.get(job="email_reminder").processed_on == today
+
+        call_command("email_reminder", catch_up=True, stdout=StringIO())
+        assert len(mail.outbox) == 2
+
+    def test_command_catch_up_first_run(self, create_user, add_subscription):
+        """
+        Test catch-up mode without a watermark only processes today
+        """
+        today = datetime.now().date()
+        user = create_user
+
+        for days in (1, 2, 7):
+            add_subscription(
+                title=f"Renews in {days}",
+                price="9.99",
+                start_date=today + timedelta(days=days),
+                renewal_cycle_days=30,
+                created_by=user,
+            )
+
+        call_command("email_reminder", catch_up=True, stdout=StringIO())
+
+        reminders = {m.subject: m for m in mail.outbox}
+        assert sorted(reminders) == [
+            "REMINDER!!! Upcoming subscription renewals in two days!",
+            "Upcoming subscription renewals in one week!",
+        ]
+        assert (
+            "Renews in 1"
+            not in reminders[
+                "REMINDER!!! Upcoming subscription renewals in two days!"
+            ].body
+        )
+        assert ReminderWatermark.objects.get().processed_on == today
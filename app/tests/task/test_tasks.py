@@ -1,8 +1,119 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core import mail
+from django.utils import timezone
+
 from app import tasks
+from app.celery import app as celery_app
+from subscription.models import (
+    OutboxEmail,
+    ReminderDelivery,
+    ReminderWatermark,
+    Subscription,
+)
 
 import pytest
 
 
+@pytest.fixture()
+def eager_celery():
+    """
+    Run tasks, groups and chords in-process
+    """
+    celery_app.conf.task_always_eager = True
+    celery_app.conf.task_eager_propagates = True
+    yield
+    celery_app.conf.task_always_eager = False
+    celery_app.conf.task_eager_propagates = False
+
+
+@pytest.fixture()
+def renewing_users():
+    """
+    Create users with a subscription renewing in two days
+    """
+
+    def _renewing_users(count):
+        start_date = timezone.localdate() + timedelta(days=2)
+        users = []
+
+        for num in range(count):
+            user = get_user_model().objects.create_user(
+                email=f"user{num}@example.com",
+                first_name="Test",
+                last_name="User",
+                password="pAssw0rd!",
+            )
+            Subscription.objects.create(
+                title="Spotify",
+                price="9.99",
+                start_date=start_date,
+                renewal_cycle_days=30,
+                created_by=user,
+            )
+            users.append(user)
+
+        return users
+
+    return _renewing_users
+
+
+def test_reminder_runs_once_a_day():
+    """
+    Test the reminder run is scheduled at midnight only, not every minute of
+    its hour
+    """
+    schedule = settings.CELERY_BEAT_SCHEDULE["send_email_reminder"]["schedule"]
+
+    assert (schedule.hour, schedule.minute) == ({0}, {0})
+
+
 @pytest.mark.django_db
-def test_task():
+def test_task(eager_celery):
     assert tasks.send_email_reminder.run()
+
+
+@pytest.mark.django_db
+def test_task_fans_out_chunks(eager_celery, renewing_users):
+    """
+    Test each user range is sent from its own chunk task
+    """
+    users = renewing_users(5)
+    run = tasks.send_reminder_chunk.run
+
+    with mock.patch.object(tasks.send_reminder_chunk, "run", wraps=run) as chunk:
+        assert tasks.send_email_reminder.delay(users_per_chunk=2).get()
+
+    today = timezone.localdate()
+    assert chunk.call_count == 3
+    assert sorted(m.to[0] for m in mail.outbox) == sorted(u.email for u in users)
+    assert ReminderWatermark.objects.get().processed_on == today
+    assert set(Subscription.objects.values_list("start_date", flat=True)) == {
+        today + timedelta(days=32)
+    }
+
+
+@pytest.mark.django_db
+def test_chunk_retry_skips_delivered_reminders(renewing_users):
+    """
+    Test a retried chunk does not queue reminders already queued
+    """
+    delivered, pending = renewing_users(2)
+    today = timezone.localdate()
+    ReminderDelivery.objects.create(
+        user=delivered, kind="two_days", renewal_date=today + timedelta(days=2)
+    )
+
+    queued = tasks.send_reminder_chunk.run(
+        delivered.id,
+        pending.id,
+        today.isoformat(),
+        (today - timedelta(days=1)).isoformat(),
+    )
+
+    assert queued == 1
+    assert list(OutboxEmail.objects.values_list("to", flat=True)) == [pending.email]
+    assert ReminderDelivery.objects.count() == 2